@@ -0,0 +1,417 @@
+"""
+Headless, faster-than-real-time session generator.
+
+Runs the same physics, sensors and GPS as run_simulator_with_recommender.py,
+but without time.sleep(dt) and without rewriting realtime.json / the whole
+session log on every tick. Each session is streamed to an append-only
+NDJSON log (utils.session_log) as it runs.
+
+  - default: as fast as the CPU allows
+  - --realtime: pace to wall clock (dt per step), like the live runners
+  - --live: also publish packets on the telemetry bus, the shared-memory
+    history ring and sim_progress.json while running (--realtime-file adds
+    the realtime.json fallback)
+
+Usage:
+    # 200 sessions, 5 laps each, rotating through three drivers
+    python -m simulator.batch_run --sessions 200 --target-laps 5 \\
+        --driver-ids driver_fast driver_smooth driver_aggressive --seed 1
+
+    # one live-paced session (drop-in for the dashboard)
+    python -m simulator.batch_run --realtime --live --target-laps 3
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.json_writer import write_realtime_json, atomic_write
+from utils.telemetry_bus import TelemetryPublisher
+from utils.telemetry_ring import TelemetryRing
+from utils.session_log import SessionLogWriter
+from utils.config_loader import load_yaml
+
+from simulator.driver_profiles import simple_lap_profile
+from simulator.driver_manager import load_drivers
+from simulator.recommender import load_driver_policy, GlobalPolicyModel
+from simulator.policy_inference import PolicyInference
+from simulator.track_loader import load_track_csv, generate_oval_track
+
+from simulator.new_sensors.wheel_speed_sensor import WheelSpeedSensor
+from simulator.new_sensors.brake_pressure_sensor import BrakePressureSensor
+from simulator.new_sensors.coolant_temp_sensor import CoolantTempSensor
+from simulator.new_sensors.imu_sensor import IMUSensor
+
+from simulator.physics.simple.dynamics import update_speed
+from simulator.physics.simple.thermal import update_coolant_temp
+from simulator.physics.simple.steering_yaw import compute_yaw_rate
+from simulator.physics.simple.gps_simulator import GPSMock
+from simulator.physics.simple.tire_model import TireModel
+from simulator.physics.simple.fuel_model import FuelModel
+from simulator.physics.simple.aero import AeroModel
+
+DATA_DIR = os.path.join(ROOT, "data")
+LOG_DIR = os.path.join(DATA_DIR, "logs")
+TRACK_DIR = os.path.join(DATA_DIR, "tracks")
+STOP_FILE = os.path.join(DATA_DIR, "stop_signal.txt")
+
+
+# ---------------------------------------------------------------------------
+#  SINGLE SESSION
+# ---------------------------------------------------------------------------
+
+def run_session(
+    track: list,
+    car_cfg: dict,
+    sensor_cfg: dict,
+    dt: float = 0.1,
+    target_laps: int = 5,
+    driver_id: str = "driver_normal",
+    driver=None,
+    policy: dict = None,
+    models=None,
+    realtime: bool = False,
+    live_path: str = None,
+    bus=None,
+    ring=None,
+    progress_path: str = None,
+    max_sim_time: float = None,
+    stop_file: str = STOP_FILE,
+    log_path: str = None,
+) -> tuple:
+    """
+    Simulate one session and return its packets.
+
+    Parameters
+    ----------
+    track : list[(x, y)]
+        Closed-loop waypoints.
+    car_cfg, sensor_cfg : dict
+        Contents of car_simple.yaml / sensors.yaml.
+    dt : float
+        Simulation timestep (s).
+    target_laps : int
+        Stop once this many laps are completed.
+    driver_id : str
+        Written into every packet.
+    driver : DriverProfile, optional
+        If given, perturbs the base lap profile actions.
+    policy : dict, optional
+        Policy from load_driver_policy(); replaces the lap profile.
+    models : GlobalPolicyModel or dict, optional
+        Trained models for an "ml" policy (see train_models()).
+    realtime : bool
+        Sleep so simulated time tracks wall-clock time.
+    live_path : str, optional
+        If set, publish each packet to this realtime.json path.
+    bus : TelemetryPublisher, optional
+        If set, publish each packet on the telemetry bus instead.
+    ring : TelemetryRing, optional
+        If set, also append each packet to this shared-memory history ring.
+        Rows from earlier sessions are hidden from its readers.
+    progress_path : str, optional
+        If set, write {lap, target} whenever the lap counter changes.
+    max_sim_time : float, optional
+        Safety cap on simulated seconds (default: 120 s per target lap).
+    stop_file : str
+        Abort early if this file exists (same contract as the live runners).
+    log_path : str, optional
+        If set, stream every packet to this NDJSON session log.
+
+    Returns
+    -------
+    tuple[list[dict], dict] — (packets, stats) where stats has
+        steps, sim_time_s, wall_time_s, steps_per_s, realtime_factor, laps
+        (+ policy_p50_us, policy_p99_us when driven by a policy)
+    """
+    if max_sim_time is None:
+        max_sim_time = 120.0 * max(target_laps, 1)
+
+    gps = GPSMock(track)
+    # Seeded from `random` so --seed keeps policy-driven sessions reproducible.
+    infer = PolicyInference(policy, models=models, seed=random.getrandbits(32)) if policy is not None else None
+
+    wheel_sensor = WheelSpeedSensor(sensor_cfg["wheel_speed"]["std"],
+                                    sensor_cfg["wheel_speed"]["dropout_prob"])
+    brake_sensor = BrakePressureSensor(sensor_cfg["brake_pressure"]["std"],
+                                       sensor_cfg["brake_pressure"]["dropout_prob"])
+    coolant_sensor = CoolantTempSensor(sensor_cfg["coolant_temp"]["std"],
+                                       sensor_cfg["coolant_temp"]["dropout_prob"])
+    imu_sensor = IMUSensor(
+        accel_std=sensor_cfg["imu"]["accel_std"],
+        yaw_std=sensor_cfg["imu"]["yaw_std"],
+        dropout_prob=sensor_cfg["imu"]["dropout_prob"],
+    )
+
+    tire = TireModel(
+        compound=car_cfg.get("tire_compound", "medium"),
+        initial_wear=car_cfg.get("tire_initial_wear", 0.0),
+    )
+    fuel = FuelModel(
+        initial_fuel_kg=car_cfg.get("fuel_initial_kg", 80.0),
+        max_fuel_kg=car_cfg.get("fuel_capacity_kg", 100.0),
+        consumption_rate=car_cfg.get("fuel_consumption_rate", 0.5),
+    )
+    aero = AeroModel(
+        downforce_coeff=car_cfg.get("downforce_coeff", 1.2),
+        aero_balance=car_cfg.get("aero_balance", 0.5),
+        drag_coeff=car_cfg.get("drag_coeff"),
+        frontal_area=car_cfg.get("frontal_area"),
+        air_density=car_cfg.get("air_density"),
+    )
+    mass_kg = car_cfg.get("mass", 210.0)
+
+    v_ms = 0.0
+    coolant = car_cfg.get("initial_coolant_temp", 60.0)
+    yaw_deg = 0.0
+
+    packets = []
+    t = 0.0
+    laps = 0
+    last_lap = -1
+    steps = 0
+
+    log = SessionLogWriter(log_path, flush_every=200) if log_path else None
+    if ring is not None:
+        ring.start_session()
+
+    wall_start = time.time()
+    perf_start = time.perf_counter()
+
+    while t < max_sim_time:
+        if stop_file and steps % 50 == 0 and os.path.exists(stop_file):
+            print("🛑 Stop signal detected — ending session early.")
+            break
+
+        # Driver
+        if infer is not None:
+            lap_progress = gps.index / max(gps.N - 1, 1)
+            throttle, brake_cmd, steering = infer.act(
+                gps.index, (v_ms * 3.6, coolant, yaw_deg, lap_progress)
+            )
+        else:
+            throttle, brake_cmd, steering = simple_lap_profile(t=t, lap_time=25.0)
+            if driver is not None:
+                throttle, brake_cmd, steering = driver.perturb_action(throttle, brake_cmd, steering)
+
+        # Physics
+        v_ms = update_speed(v_ms, throttle, brake_cmd, dt)
+        speed_kmh = v_ms * 3.6
+        coolant = update_coolant_temp(coolant, throttle, speed_kmh, dt)
+        yaw_deg = compute_yaw_rate(steering, speed_kmh)
+
+        total_mass = mass_kg + fuel.fuel_load_kg
+        grip_mult = aero.effective_grip_multiplier(v_ms, total_mass)
+        tire.step(speed_kmh, throttle, brake_cmd, 0.0, dt)
+        fuel.step(throttle, dt)
+
+        (x, y), idx, laps = gps.advance(v_ms * dt)
+
+        if progress_path and laps != last_lap:
+            atomic_write(progress_path, {"lap": laps, "target": target_laps})
+        last_lap = laps
+
+        if laps >= target_laps:
+            break
+
+        packet = {
+            "timestamp": wall_start + t,
+            "t": t,
+            "lap": laps,
+            "track_index": idx,
+            "driver_id": driver_id,
+            "gps": {"x": float(x), "y": float(y)},
+            "true": {
+                "speed_kmh": speed_kmh,
+                "coolant_temp": coolant,
+                "brake_cmd": brake_cmd,
+                "throttle": throttle,
+                "yaw_deg": yaw_deg,
+                "steering": steering,
+            },
+            "sensors": {
+                "wheel_speed": wheel_sensor.read(speed_kmh),
+                "brake_pressure": brake_sensor.read(brake_cmd * 100.0),
+                "coolant_temp": coolant_sensor.read(coolant),
+                "imu": imu_sensor.read(true_ax=0.0, true_ay=0.0, true_yaw=yaw_deg),
+            },
+            "vehicle_state": {
+                "mass_kg": round(total_mass, 1),
+                "aero_grip_multiplier": round(grip_mult, 3),
+            },
+            "tire_state": tire.get_state(),
+            "fuel_state": fuel.get_state(),
+        }
+        packets.append(packet)
+        if log is not None:
+            log.append(packet)
+
+        if bus is not None:
+            bus.publish(packet)
+        elif live_path:
+            write_realtime_json(live_path, packet)
+        if ring is not None:
+            ring.push(packet)
+
+        t += dt
+        steps += 1
+
+        if realtime:
+            lag = (perf_start + t) - time.perf_counter()
+            if lag > 0:
+                time.sleep(lag)
+
+    if log is not None:
+        log.close()
+
+    wall = time.perf_counter() - perf_start
+    stats = {
+        "steps": steps,
+        "sim_time_s": round(t, 3),
+        "wall_time_s": round(wall, 3),
+        "steps_per_s": round(steps / wall, 1) if wall > 0 else float("inf"),
+        "realtime_factor": round(t / wall, 1) if wall > 0 else float("inf"),
+        "laps": laps,
+    }
+    if infer is not None:
+        lat = infer.latency()
+        stats.update(policy_p50_us=lat["p50_us"], policy_p99_us=lat["p99_us"])
+    return packets, stats
+
+
+# ---------------------------------------------------------------------------
+#  CLI
+# ---------------------------------------------------------------------------
+
+def _resolve(path: str, default: str) -> str:
+    if path is None:
+        return default
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Headless batch session generator")
+    parser.add_argument("--sessions", type=int, default=1, help="Number of sessions to generate")
+    parser.add_argument("--target-laps", type=int, default=5)
+    parser.add_argument("--driver-ids", type=str, nargs="+", default=["driver_normal"],
+                        help="Driver ids, assigned round-robin across sessions")
+    parser.add_argument("--use-policy", action="store_true",
+                        help="Drive with load_driver_policy() instead of the lap profile")
+    parser.add_argument("--model-path", type=str, default=None,
+                        help="Global policy model for --use-policy (python -m simulator.recommender)")
+    parser.add_argument("--track", type=str, default=None,
+                        help="Track CSV filename inside the track dir (default: oval)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Base RNG seed; session k uses seed + k")
+    parser.add_argument("--realtime", action="store_true", help="Pace to wall clock")
+    parser.add_argument("--live", action="store_true",
+                        help="Publish packets on the telemetry bus and sim_progress.json while running")
+    parser.add_argument("--realtime-file", action="store_true",
+                        help="With --live, also write realtime.json every tick")
+    parser.add_argument("--ring-seconds", type=float, default=120.0,
+                        help="With --live, seconds of history in the shared-memory ring (0 = off)")
+    parser.add_argument("--max-sim-time", type=float, default=None,
+                        help="Cap on simulated seconds per session")
+    parser.add_argument("--data-dir", type=str, default=None)
+    parser.add_argument("--track-dir", type=str, default=None)
+    parser.add_argument("--log-dir", type=str, default=None)
+    args = parser.parse_args()
+
+    data_dir = _resolve(args.data_dir, DATA_DIR)
+    track_dir = _resolve(args.track_dir, os.path.join(data_dir, "tracks"))
+    log_dir = _resolve(args.log_dir, os.path.join(data_dir, "logs"))
+    os.makedirs(log_dir, exist_ok=True)
+
+    sim_cfg = load_yaml(os.path.join(ROOT, "configs", "simulation.yaml"))
+    car_cfg = load_yaml(os.path.join(ROOT, "configs", "car_simple.yaml"))
+    sensor_cfg = load_yaml(os.path.join(ROOT, "configs", "sensors.yaml"))
+    dt = sim_cfg.get("dt", 0.1)
+
+    if args.track:
+        track_path = os.path.join(track_dir, args.track)
+        if os.path.exists(track_path):
+            print(f"📌 Loading track: {track_path}")
+            track = load_track_csv(track_path)
+        else:
+            print(f"⚠ Track not found: {track_path}, falling back to oval")
+            track = generate_oval_track()
+    else:
+        track = generate_oval_track()
+
+    drivers = load_drivers()
+    models = GlobalPolicyModel.load(_resolve(args.model_path, None)) if args.model_path else None
+    bus = None
+    ring = None
+    if args.live:
+        bus = TelemetryPublisher(fallback_path=os.path.join(data_dir, "realtime.json") if args.realtime_file else None)
+        if args.ring_seconds > 0:
+            ring = TelemetryRing.create(capacity=int(args.ring_seconds / dt))
+    progress_path = os.path.join(data_dir, "sim_progress.json") if args.live else None
+    stop_file = os.path.join(data_dir, "stop_signal.txt")
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    total_steps = 0
+    total_wall = 0.0
+
+    print(f"🏁 Generating {args.sessions} session(s) × {args.target_laps} laps "
+          f"({'real-time' if args.realtime else 'headless'})…")
+
+    for k in range(args.sessions):
+        if os.path.exists(stop_file):
+            print("🛑 Stop signal detected — stopping batch.")
+            break
+
+        if args.seed is not None:
+            random.seed(args.seed + k)
+            np.random.seed(args.seed + k)
+
+        driver_id = args.driver_ids[k % len(args.driver_ids)]
+        policy = load_driver_policy(driver_id) if args.use_policy else None
+        suffix = f"_{k:04d}" if args.sessions > 1 else ""
+        session_path = os.path.join(log_dir, f"race_session_{stamp}{suffix}.ndjson")
+
+        packets, stats = run_session(
+            track, car_cfg, sensor_cfg, dt=dt,
+            target_laps=args.target_laps,
+            driver_id=driver_id,
+            driver=drivers.get(driver_id),
+            policy=policy,
+            models=models,
+            realtime=args.realtime,
+            bus=bus,
+            ring=ring,
+            progress_path=progress_path,
+            max_sim_time=args.max_sim_time,
+            stop_file=stop_file,
+            log_path=session_path,
+        )
+
+        total_steps += stats["steps"]
+        total_wall += stats["wall_time_s"]
+        print(f"  [{k + 1}/{args.sessions}] {driver_id}: {stats['laps']} laps, "
+              f"{stats['steps']} steps in {stats['wall_time_s']:.2f}s "
+              f"({stats['steps_per_s']:.0f} steps/s, {stats['realtime_factor']:.0f}× real-time"
+              + (f", policy p99 {stats['policy_p99_us']:.0f} µs" if "policy_p99_us" in stats else "")
+              + f") → {session_path}")
+
+    if bus is not None:
+        bus.close()
+    if ring is not None:
+        ring.close()
+
+    if total_wall > 0:
+        print(f"✅ {total_steps} steps in {total_wall:.2f}s — "
+              f"{total_steps / total_wall:.0f} steps/s overall")
+
+
+if __name__ == "__main__":
+    cli()
@@ -7,18 +7,28 @@ Strategy:
   3. Optimize parameters to minimize error vs real telemetry
   4. Save calibrated parameters back to config
 
+The optimiser works in bound-normalised coordinates. Each step costs
+one simulation: run_simulated_lap(..., return_sensitivities=True) also
+returns the exact derivative of the speed trace with respect to every
+car parameter (forward mode). With --gradient fd, the gradient comes
+from one batched run of forward differences instead
+(run_simulated_lap_batch). Evaluated parameter vectors are memoised,
+and several random starts can run in parallel worker processes
+(--starts / --n-jobs).
+
 Usage:
     python simulator/calibrate_from_f1.py --lap-file data/logs/f1_VER_*.json --train
     python simulator/calibrate_from_f1.py --lap-file data/logs/f1_VER_*.json --calibrate
+    python simulator/calibrate_from_f1.py --lap-file data/logs/f1_VER_*.json --calibrate \
+        --starts 8 --n-jobs 4 --seed 1
 """
 
 import os
 import sys
-import json
-import copy
 import math
 import yaml
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 ROOT = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(ROOT)
@@ -31,9 +41,29 @@ from simulator.physics.simple.thermal import update_coolant_temp
 
 # Config
 from utils.config_loader import load_yaml
+from utils.session_log import load_session_packets
+from simulator.lap_alignment import speed_distance
 
 CAR_CONFIG_PATH = os.path.join(ROOT, "configs", "car_simple.yaml")
 
+# Calibrated parameters and their bounds.
+PARAM_CONFIG = [
+    ("mass", 150, 400),
+    ("drag_coeff", 0.3, 1.5),
+    ("frontal_area", 0.5, 2.0),
+    ("rolling_resistance", 0.005, 0.04),
+    ("max_engine_force", 3000, 12000),
+    ("max_brake_force", 500, 3000),
+]
+
+# car_params keys used by run_simulated_lap.
+SIM_PARAMS = ("mass", "drag_coeff", "frontal_area", "air_density",
+              "rolling_resistance", "max_engine_force", "max_brake_force")
+
+# Above this many parameter sets, one numpy step over all of them beats
+# a float loop per set.
+BATCH_NUMPY_MIN = 16
+
 OPTIM_AVAILABLE = False
 try:
     from scipy.optimize import minimize
@@ -47,9 +77,8 @@ except ImportError:
 # ---------------------------------------------------------------------------
 
 def load_lap_file(path: str):
-    """Load a project session log JSON file."""
-    with open(path, "r") as f:
-        return json.load(f)
+    """Load a project session log (JSON array or NDJSON)."""
+    return load_session_packets(path)
 
 
 def extract_lap_packets(packets: list, lap_number: int = 1):
@@ -69,16 +98,122 @@ def extract_throttle_brake_trace(packets: list):
     return throttles, brakes
 
 
+def extract_lap_traces(packets: list, dt: float = 0.1):
+    """
+    Throttle, brake and speed of one lap on a uniform dt time grid.
+
+    run_simulated_lap advances dt per input sample, so a log recorded at
+    another rate (e.g. ~4 Hz OpenF1) is resampled in time first; logs
+    already sampled every dt are returned unchanged.
+    """
+    throttles, brakes = extract_throttle_brake_trace(packets)
+    speeds = extract_speed_trace(packets)
+    t = np.array([p.get("t", i * dt) for i, p in enumerate(packets)], dtype=float)
+    if len(t) < 2 or np.allclose(np.diff(t), dt, rtol=0.05, atol=1e-6):
+        return throttles, brakes, speeds
+    grid = np.arange(t[0], t[-1] + 1e-9, dt)
+    return np.interp(grid, t, throttles), np.interp(grid, t, brakes), np.interp(grid, t, speeds)
+
+
 # ---------------------------------------------------------------------------
 #  SIMULATOR WRAPPER
 # ---------------------------------------------------------------------------
 
+def _step_terms(car_params: dict, throttle_trace, brake_trace, dt: float) -> tuple:
+    """
+    Per-step velocity increments without drag, and the drag factor, so
+    that one step of the model is v ← max(0, v + inc[i] - k·v²).
+
+    car_params values may be scalars or arrays of shape (K,); inc is then
+    (n, K) and k is (K,).
+    """
+    mass = np.asarray(car_params["mass"], dtype=float)
+    engine = np.asarray(car_params["max_engine_force"], dtype=float)
+    brake = np.asarray(car_params["max_brake_force"], dtype=float)
+    roll = np.asarray(car_params["rolling_resistance"], dtype=float) * mass * 9.81
+    k = (0.5 * np.asarray(car_params["air_density"], dtype=float)
+         * np.asarray(car_params["drag_coeff"], dtype=float)
+         * np.asarray(car_params["frontal_area"], dtype=float)) / mass * dt
+
+    th = np.asarray(throttle_trace, dtype=float)
+    br = np.asarray(brake_trace, dtype=float)
+    if mass.ndim:
+        th, br = th[:, None], br[:, None]
+    inc = (engine * th - brake * br - roll) / mass * dt
+    return inc, k
+
+
+def _integrate(inc: list, k: float, v: float) -> list:
+    """Scalar time loop over precomputed increments (plain floats)."""
+    out = [0.0] * len(inc)
+    for i, d in enumerate(inc):
+        v = v + d - k * v * v
+        if v < 0.0:
+            v = 0.0
+        out[i] = v
+    return out
+
+
+def _term_derivatives(car_params: dict, throttle_trace, brake_trace, dt: float, inc: np.ndarray, k: float) -> tuple:
+    """
+    d(inc)/dθ of shape (n, P) and dk/dθ of shape (P,), θ = SIM_PARAMS.
+    """
+    p = {name: float(car_params[name]) for name in SIM_PARAMS}
+    m = p["mass"]
+    th = np.asarray(throttle_trace, dtype=float)
+    br = np.asarray(brake_trace, dtype=float)
+    n = len(inc)
+
+    d_inc = np.zeros((n, len(SIM_PARAMS)))
+    d_k = np.zeros(len(SIM_PARAMS))
+    col = {name: j for j, name in enumerate(SIM_PARAMS)}
+
+    # inc = dt·(E·th - B·br)/m - dt·crr·g ;  k = dt·½·rho·Cd·A/m
+    d_inc[:, col["mass"]] = -(inc + dt * p["rolling_resistance"] * 9.81) / m
+    d_inc[:, col["rolling_resistance"]] = -dt * 9.81
+    d_inc[:, col["max_engine_force"]] = dt * th / m
+    d_inc[:, col["max_brake_force"]] = -dt * br / m
+    d_k[col["mass"]] = -k / m
+    d_k[col["drag_coeff"]] = dt * 0.5 * p["air_density"] * p["frontal_area"] / m
+    d_k[col["frontal_area"]] = dt * 0.5 * p["air_density"] * p["drag_coeff"] / m
+    d_k[col["air_density"]] = dt * 0.5 * p["drag_coeff"] * p["frontal_area"] / m
+    return d_inc, d_k
+
+
+def _propagate_sensitivities(a: np.ndarray, b: np.ndarray, block: int = 256) -> np.ndarray:
+    """
+    Solve S[i] = a[i]·S[i-1] + b[i] (S[-1] = 0) for all i.
+
+    Within a block the recurrence is linear with known coefficients, so
+    S = C·(S0 + cumsum(b / C)) with C = cumprod(a). Blocks keep C far
+    from underflow; a block containing a non-positive a (the car stopped
+    and the speed was clamped) is stepped through one row at a time.
+    """
+    S = np.empty_like(b)
+    s0 = np.zeros(b.shape[1])
+    for i0 in range(0, len(a), block):
+        ab, bb = a[i0:i0 + block], b[i0:i0 + block]
+        if np.all(ab > 0):
+            C = np.cumprod(ab)[:, None]
+            Sb = C * (s0 + np.cumsum(bb / C, axis=0))
+        else:
+            Sb = np.empty_like(bb)
+            s = s0
+            for j in range(len(ab)):
+                s = ab[j] * s + bb[j]
+                Sb[j] = s
+        S[i0:i0 + block] = Sb
+        s0 = Sb[-1]
+    return S
+
+
 def run_simulated_lap(
     car_params: dict,
     throttle_trace: np.ndarray,
     brake_trace: np.ndarray,
     dt: float = 0.1,
     initial_speed: float = 0.0,
+    return_sensitivities: bool = False,
 ):
     """
     Run the FSAE physics model with given throttle/brake traces.
@@ -92,28 +227,70 @@ def run_simulated_lap(
     brake_trace : np.ndarray
     dt : float
     initial_speed : float
+    return_sensitivities : bool
+        Also return d(speed_kmh)/d(param) for every step, by forward-mode
+        propagation through the Euler update (no extra simulations).
 
     Returns
     -------
     speeds_kmh : np.ndarray
+        or (speeds_kmh, sensitivities) with sensitivities of shape
+        (n, len(SIM_PARAMS)), columns in SIM_PARAMS order.
     """
-    n = len(throttle_trace)
-    speeds = np.zeros(n)
-    v_ms = initial_speed
-
-    for i in range(n):
-        engine_force = car_params["max_engine_force"] * throttle_trace[i]
-        brake_force = car_params["max_brake_force"] * brake_trace[i]
-        drag = 0.5 * car_params["air_density"] * car_params["drag_coeff"] * car_params["frontal_area"] * (v_ms ** 2)
-        roll = car_params["rolling_resistance"] * car_params["mass"] * 9.81
-
-        net_F = engine_force - brake_force - drag - roll
-        a = net_F / car_params["mass"]
-        v_ms = max(0.0, v_ms + a * dt)
+    inc, k = _step_terms(car_params, throttle_trace, brake_trace, dt)
+    k = float(k)
+    v = np.asarray(_integrate(inc.tolist(), k, float(initial_speed)))
+    if not return_sensitivities:
+        return v * 3.6
+
+    # v[i] = max(0, v_prev + inc[i] - k·v_prev²)  ⇒  where not clamped:
+    #   S[i] = (1 - 2k·v_prev)·S[i-1] + d_inc[i] - v_prev²·d_k
+    d_inc, d_k = _term_derivatives(car_params, throttle_trace, brake_trace, dt, inc, k)
+    v_prev = np.concatenate(([float(initial_speed)], v[:-1]))
+    alive = v > 0.0
+    a = np.where(alive, 1.0 - 2.0 * k * v_prev, 0.0)
+    b = np.where(alive[:, None], d_inc - (v_prev ** 2)[:, None] * d_k, 0.0)
+    return v * 3.6, _propagate_sensitivities(a, b) * 3.6
+
+
+def run_simulated_lap_batch(
+    param_sets: dict,
+    throttle_trace: np.ndarray,
+    brake_trace: np.ndarray,
+    dt: float = 0.1,
+    initial_speed: float = 0.0,
+):
+    """
+    run_simulated_lap for K parameter sets over the same traces.
 
-        speeds[i] = v_ms * 3.6
+    Parameters
+    ----------
+    param_sets : dict
+        Same keys as run_simulated_lap's car_params; each value is a
+        scalar or an array of shape (K,).
 
-    return speeds
+    Returns
+    -------
+    speeds_kmh : np.ndarray of shape (n, K)
+    """
+    K = max(np.size(v) for v in param_sets.values())
+    params = {name: np.broadcast_to(np.asarray(param_sets[name], dtype=float), (K,))
+              for name in SIM_PARAMS}
+    inc, k = _step_terms(params, throttle_trace, brake_trace, dt)
+    n = inc.shape[0]
+
+    if K < BATCH_NUMPY_MIN:
+        speeds = np.empty((n, K))
+        for j in range(K):
+            speeds[:, j] = _integrate(inc[:, j].tolist(), float(k[j]), float(initial_speed))
+    else:
+        speeds = np.empty((n, K))
+        v = np.full(K, float(initial_speed))
+        for i in range(n):
+            v = v + inc[i] - k * v * v
+            np.maximum(v, 0.0, out=v)
+            speeds[i] = v
+    return speeds * 3.6
 
 
 # ---------------------------------------------------------------------------
@@ -136,16 +313,26 @@ def compute_errors(sim_speeds: np.ndarray, real_speeds: np.ndarray):
     return {"mae": mae, "rmse": rmse, "max_error": max_err}
 
 
-def compute_sector_errors(sim_speeds: np.ndarray, real_speeds: np.ndarray, n_sectors: int = 3):
-    """Compute per-sector MAE."""
+def compute_sector_errors(sim_speeds: np.ndarray, real_speeds: np.ndarray, n_sectors: int = 3, dt: float = None):
+    """
+    Compute per-sector MAE.
+
+    With dt, sectors are equal thirds of the real lap's distance
+    (integrated from its speed); otherwise equal thirds of the samples.
+    """
     n = min(len(sim_speeds), len(real_speeds))
     if n == 0:
         return {}
-    sector_size = n // n_sectors
+    if dt is not None:
+        dist = speed_distance(real_speeds[:n], np.arange(n) * dt)
+        bounds = np.searchsorted(dist, dist[-1] * np.arange(n_sectors + 1) / n_sectors)
+        bounds[-1] = n
+    else:
+        sector_size = n // n_sectors
+        bounds = [s * sector_size for s in range(n_sectors)] + [n]
     errors = {}
     for s in range(n_sectors):
-        start = s * sector_size
-        end = start + sector_size if s < n_sectors - 1 else n
+        start, end = bounds[s], max(bounds[s + 1], bounds[s] + 1)
         errors[f"sector_{s+1}_mae"] = float(np.mean(np.abs(sim_speeds[start:end] - real_speeds[start:end])))
     return errors
 
@@ -154,25 +341,221 @@ def compute_sector_errors(sim_speeds: np.ndarray, real_speeds: np.ndarray, n_sec
 #  PARAMETER OPTIMIZATION
 # ---------------------------------------------------------------------------
 
-def _objective(
-    params: np.ndarray,
-    param_names: list,
-    base_params: dict,
+class CalibrationObjective:
+    """
+    Speed RMSE as a function of bound-normalised parameters u ∈ [0, 1]^P.
+
+    value_and_grad(u) costs one simulation: the gradient comes from the
+    forward-mode sensitivities of run_simulated_lap. With gradient="fd"
+    it simulates u and its P forward-difference perturbations in one
+    run_simulated_lap_batch call instead. Results are memoised by
+    parameter vector, so repeated points (line searches, restarts from
+    the same point, the final re-evaluation) are free.
+    """
+
+    def __init__(
+        self,
+        throttle_trace: np.ndarray,
+        brake_trace: np.ndarray,
+        real_speeds: np.ndarray,
+        base_params: dict,
+        param_config: list = None,
+        dt: float = 0.1,
+        fd_step: float = 1e-6,
+        gradient: str = "analytic",
+    ):
+        if gradient not in ("analytic", "fd"):
+            raise ValueError(f"Unknown gradient: {gradient}. Choose 'analytic' or 'fd'")
+        self.param_config = param_config or PARAM_CONFIG
+        self.names = [name for name, _, _ in self.param_config]
+        unknown = [name for name in self.names if name not in SIM_PARAMS]
+        if unknown:
+            raise ValueError(f"Cannot calibrate {unknown}: not used by run_simulated_lap")
+        self.gradient = gradient
+        self._cols = [SIM_PARAMS.index(name) for name in self.names]
+        self.lo = np.array([lo for _, lo, _ in self.param_config], dtype=float)
+        self.hi = np.array([hi for _, _, hi in self.param_config], dtype=float)
+
+        n = min(len(throttle_trace), len(brake_trace), len(real_speeds))
+        self.throttle = np.asarray(throttle_trace, dtype=float)[:n]
+        self.brake = np.asarray(brake_trace, dtype=float)[:n]
+        self.real = np.asarray(real_speeds, dtype=float)[:n]
+        self.base_params = dict(base_params)
+        self.dt = dt
+        self.fd_step = fd_step
+
+        self._cache = {}
+        self.n_evals = 0        # parameter vectors simulated
+        self.n_calls = 0
+        self.cache_hits = 0
+
+    def to_params(self, u: np.ndarray) -> dict:
+        """Normalised vector → full car_params dict."""
+        x = self.lo + np.asarray(u, dtype=float) * (self.hi - self.lo)
+        params = dict(self.base_params)
+        params.update({name: float(v) for name, v in zip(self.names, x)})
+        return params
+
+    def to_unit(self, params: dict) -> np.ndarray:
+        x = np.array([params.get(name, (lo + hi) / 2) for name, lo, hi in self.param_config], dtype=float)
+        return np.clip((x - self.lo) / (self.hi - self.lo), 0.0, 1.0)
+
+    def _rmse(self, U: np.ndarray) -> np.ndarray:
+        """RMSE for each row of U (K, P)."""
+        if len(self.real) == 0:
+            return np.full(len(U), 1e10)
+        X = self.lo + U * (self.hi - self.lo)
+        sets = {name: self.base_params[name] for name in SIM_PARAMS}
+        sets.update({name: X[:, j] for j, name in enumerate(self.names)})
+        sim = run_simulated_lap_batch(sets, self.throttle, self.brake, self.dt)
+        self.n_evals += len(U)
+        return np.sqrt(np.mean((sim - self.real[:, None]) ** 2, axis=0))
+
+    def _rmse_and_grad(self, u: np.ndarray) -> tuple:
+        """RMSE and exact dRMSE/du from one simulation with sensitivities."""
+        if len(self.real) == 0:
+            return 1e10, np.zeros(len(u))
+        sim, sens = run_simulated_lap(self.to_params(u), self.throttle, self.brake, self.dt,
+                                      return_sensitivities=True)
+        self.n_evals += 1
+        r = sim - self.real
+        f = float(np.sqrt(np.mean(r ** 2)))
+        if f == 0.0:
+            return f, np.zeros(len(u))
+        # d sqrt(mean r²)/dx = Σ r·dr/dx / (n·f);  dx/du = hi - lo
+        grad_x = sens[:, self._cols].T @ r / (len(r) * f)
+        return f, grad_x * (self.hi - self.lo)
+
+    def value_and_grad(self, u: np.ndarray) -> tuple:
+        """(RMSE, dRMSE/du) — memoised."""
+        self.n_calls += 1
+        u = np.asarray(u, dtype=float)
+        key = u.tobytes()
+        hit = self._cache.get(key)
+        if hit is not None:
+            self.cache_hits += 1
+            return hit[0], hit[1].copy()
+
+        if self.gradient == "analytic":
+            f, grad = self._rmse_and_grad(u)
+        else:
+            # Step away from the upper bound so every perturbation stays in range.
+            h = np.where(u + self.fd_step <= 1.0, self.fd_step, -self.fd_step)
+            fs = self._rmse(np.vstack([u, u + np.diag(h)]))
+            f, grad = float(fs[0]), (fs[1:] - fs[0]) / h
+        self._cache[key] = (f, grad)
+        return f, grad.copy()
+
+    def __call__(self, u: np.ndarray) -> float:
+        return self.value_and_grad(u)[0]
+
+    def stats(self) -> dict:
+        return {"calls": self.n_calls, "simulated": self.n_evals, "cache_hits": self.cache_hits}
+
+
+def _optimize_from(objective: CalibrationObjective, u0: np.ndarray, maxiter: int = 200) -> dict:
+    result = minimize(
+        objective.value_and_grad,
+        x0=u0,
+        jac=True,
+        method="L-BFGS-B",
+        bounds=[(0.0, 1.0)] * len(u0),
+        options={"maxiter": maxiter, "ftol": 1e-10},
+    )
+    return {
+        "u": result.x,
+        "rmse": float(result.fun),
+        "success": bool(result.success),
+        "message": str(result.message),
+        "nit": int(result.nit),
+        "u0": np.asarray(u0, dtype=float),
+    }
+
+
+def _calibrate_start(args: tuple) -> dict:
+    """Process-pool task: one L-BFGS-B run from one start."""
+    objective_kwargs, u0, maxiter = args
+    objective = CalibrationObjective(**objective_kwargs)
+    out = _optimize_from(objective, u0, maxiter)
+    out["stats"] = objective.stats()
+    return out
+
+
+def start_points(objective: CalibrationObjective, base_params: dict, n_starts: int, seed: int = None) -> list:
+    """Base parameters first, then n_starts - 1 Latin-hypercube starts in [0, 1]^P."""
+    rng = np.random.default_rng(seed)
+    starts = [objective.to_unit(base_params)]
+    m, P = n_starts - 1, len(objective.names)
+    if m > 0:
+        u = (np.argsort(rng.random((m, P)), axis=0) + rng.random((m, P))) / m
+        starts.extend(u)
+    return starts
+
+
+def calibrate_multistart(
     throttle_trace: np.ndarray,
     brake_trace: np.ndarray,
     real_speeds: np.ndarray,
-    dt: float,
-) -> float:
-    """Objective function for optimization: minimize RMSE."""
-    car_params = copy.deepcopy(base_params)
-    for name, value in zip(param_names, params):
-        car_params[name] = value
-
-    sim_speeds = run_simulated_lap(car_params, throttle_trace, brake_trace, dt)
-    n = min(len(sim_speeds), len(real_speeds))
-    if n == 0:
-        return 1e10
-    return float(np.sqrt(np.mean((sim_speeds[:n] - real_speeds[:n]) ** 2)))
+    car_params: dict,
+    dt: float = 0.1,
+    n_starts: int = 1,
+    n_jobs: int = 1,
+    seed: int = None,
+    maxiter: int = 200,
+    param_config: list = None,
+    gradient: str = "analytic",
+) -> dict:
+    """
+    L-BFGS-B from several starts, optionally across worker processes.
+
+    Returns
+    -------
+    dict with:
+      - params: best-fit car_params
+      - rmse: best objective value (km/h)
+      - starts: per-start {rmse, success, nit, stats, ...}, best first
+    """
+    kwargs = {
+        "throttle_trace": np.asarray(throttle_trace, dtype=float),
+        "brake_trace": np.asarray(brake_trace, dtype=float),
+        "real_speeds": np.asarray(real_speeds, dtype=float),
+        "base_params": dict(car_params),
+        "param_config": param_config,
+        "dt": dt,
+        "gradient": gradient,
+    }
+    objective = CalibrationObjective(**kwargs)
+    starts = start_points(objective, car_params, max(1, n_starts), seed)
+
+    if n_jobs > 1 and len(starts) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(starts))) as pool:
+            runs = list(pool.map(_calibrate_start, [(kwargs, u0, maxiter) for u0 in starts]))
+    else:
+        # One process: starts share the memo cache.
+        runs = []
+        for u0 in starts:
+            before = objective.stats()
+            run = _optimize_from(objective, u0, maxiter)
+            run["stats"] = {k: v - before[k] for k, v in objective.stats().items()}
+            runs.append(run)
+
+    runs.sort(key=lambda r: r["rmse"])
+    best = runs[0]
+    return {
+        "params": objective.to_params(best["u"]),
+        "rmse": best["rmse"],
+        "starts": [
+            {
+                "rmse": r["rmse"],
+                "success": r["success"],
+                "message": r["message"],
+                "nit": r["nit"],
+                "stats": r["stats"],
+                "start": {n: objective.to_params(r["u0"])[n] for n in objective.names},
+            }
+            for r in runs
+        ],
+    }
 
 
 def calibrate_parameters(
@@ -180,6 +563,10 @@ def calibrate_parameters(
     car_params: dict = None,
     dt: float = 0.1,
     optimize: bool = True,
+    n_starts: int = 1,
+    n_jobs: int = 1,
+    seed: int = None,
+    gradient: str = "analytic",
 ):
     """
     Calibrate car parameters against real telemetry data.
@@ -193,6 +580,14 @@ def calibrate_parameters(
     dt : float
     optimize : bool
         If True, run scipy optimization. If False, just evaluate current params.
+    n_starts : int
+        Optimisation starts: the base params plus n_starts - 1 random ones.
+    n_jobs : int
+        Worker processes for the starts.
+    seed : int, optional
+        Seed for the random starts.
+    gradient : str
+        "analytic" (forward-mode sensitivities) or "fd" (batched finite differences).
 
     Returns
     -------
@@ -219,13 +614,12 @@ def calibrate_parameters(
     all_speeds = []
 
     for ln, lap_packets in sorted(laps.items()):
-        throttles, brakes = extract_throttle_brake_trace(lap_packets)
-        speeds = extract_speed_trace(lap_packets)
+        throttles, brakes, speeds = extract_lap_traces(lap_packets, dt)
 
         # Run sim with current params
         sim_speeds = run_simulated_lap(car_params, throttles, brakes, dt)
         errors = compute_errors(sim_speeds, speeds)
-        errors.update(compute_sector_errors(sim_speeds, speeds))
+        errors.update(compute_sector_errors(sim_speeds, speeds, dt=dt))
         per_lap_errors[ln] = errors
 
         all_throttles.extend(throttles)
@@ -247,45 +641,26 @@ def calibrate_parameters(
     if optimize and OPTIM_AVAILABLE:
         print("\n[Calibration] Running scipy optimization...")
 
-        # Parameter bounds and scaling
-        param_config = [
-            ("mass", 150, 400),
-            ("drag_coeff", 0.3, 1.5),
-            ("frontal_area", 0.5, 2.0),
-            ("rolling_resistance", 0.005, 0.04),
-            ("max_engine_force", 3000, 12000),
-            ("max_brake_force", 500, 3000),
-        ]
-
-        x0 = []
-        bounds = []
-        param_names = []
-        for name, lo, hi in param_config:
-            param_names.append(name)
-            x0.append(car_params.get(name, (lo + hi) / 2))
-            bounds.append((lo, hi))
-
-        result = minimize(
-            _objective,
-            x0=x0,
-            args=(param_names, car_params, all_throttles, all_brakes, all_speeds, dt),
-            method="L-BFGS-B",
-            bounds=bounds,
-            options={"maxiter": 200, "ftol": 1e-6},
+        result = calibrate_multistart(
+            all_throttles, all_brakes, all_speeds, car_params, dt=dt,
+            n_starts=n_starts, n_jobs=n_jobs, seed=seed, gradient=gradient,
         )
+        best = result["starts"][0]
+        print(f"  {len(result['starts'])} start(s), best RMSE {result['rmse']:.3f} km/h "
+              f"({best['stats']['simulated']} parameter sets simulated, "
+              f"{best['stats']['cache_hits']} cache hits)")
 
-        if result.success:
-            for name, value in zip(param_names, result.x):
-                best_params[name] = float(value)
+        if best["success"]:
+            for name, _, _ in PARAM_CONFIG:
+                best_params[name] = float(result["params"][name])
 
             # Re-evaluate
             per_lap_errors = {}
             for ln, lap_packets in sorted(laps.items()):
-                throttles, brakes = extract_throttle_brake_trace(lap_packets)
-                speeds = extract_speed_trace(lap_packets)
+                throttles, brakes, speeds = extract_lap_traces(lap_packets, dt)
                 sim_speeds = run_simulated_lap(best_params, throttles, brakes, dt)
                 errors = compute_errors(sim_speeds, speeds)
-                errors.update(compute_sector_errors(sim_speeds, speeds))
+                errors.update(compute_sector_errors(sim_speeds, speeds, dt=dt))
                 per_lap_errors[ln] = errors
 
             new_avg_mae = np.mean([e["mae"] for e in per_lap_errors.values()])
@@ -293,7 +668,7 @@ def calibrate_parameters(
             print(f"  Optimized Avg MAE:  {new_avg_mae:.2f} km/h (was {avg_mae:.2f})")
             print(f"  Optimized Avg RMSE: {new_avg_rmse:.2f} km/h (was {avg_rmse:.2f})")
         else:
-            print(f"  Optimization failed: {result.message}")
+            print(f"  Optimization failed: {best['message']}")
 
     return {
         "calibrated_params": best_params,
@@ -343,11 +718,10 @@ def generate_validation_report(packets: list, calibrated_params: dict, dt: float
 
     rows = []
     for ln, lap_packets in sorted(laps.items()):
-        throttles, brakes = extract_throttle_brake_trace(lap_packets)
-        real_speeds = extract_speed_trace(lap_packets)
+        throttles, brakes, real_speeds = extract_lap_traces(lap_packets, dt)
         sim_speeds = run_simulated_lap(calibrated_params, throttles, brakes, dt)
         errors = compute_errors(sim_speeds, real_speeds)
-        errors.update(compute_sector_errors(sim_speeds, real_speeds))
+        errors.update(compute_sector_errors(sim_speeds, real_speeds, dt=dt))
         errors["lap"] = ln
         errors["real_mean_speed"] = float(np.mean(real_speeds))
         errors["sim_mean_speed"] = float(np.mean(sim_speeds))
@@ -373,6 +747,11 @@ def cli():
     parser.add_argument("--apply", action="store_true", help="Apply params to car_simple.yaml")
     parser.add_argument("--report", action="store_true", help="Print validation report")
     parser.add_argument("--dt", type=float, default=0.1)
+    parser.add_argument("--starts", type=int, default=1, help="Optimisation starts (base params + random)")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Worker processes for the starts")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the random starts")
+    parser.add_argument("--gradient", type=str, default="analytic", choices=["analytic", "fd"],
+                        help="analytic = forward-mode sensitivities, fd = batched finite differences")
 
     args = parser.parse_args()
 
@@ -389,6 +768,8 @@ def cli():
     result = calibrate_parameters(
         packets, car_params=car_params, dt=args.dt,
         optimize=args.calibrate,
+        n_starts=args.starts, n_jobs=args.n_jobs, seed=args.seed,
+        gradient=args.gradient,
     )
 
     print("\nCalibrated params:")
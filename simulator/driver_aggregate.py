@@ -1,42 +1,21 @@
 # simulator/driver_aggregate.py
 
-import os
 import json
 from typing import Dict, Any, List
 from simulator.driver_features import load_session, compute_driver_metrics
-
-
-def extract_driver_id(session: List[Dict[str, Any]]) -> str:
-    """Pull driver_id from first valid packet."""
-    for r in session:
-        if "driver_id" in r:
-            return r["driver_id"]
-    return "unknown_driver"
+from utils.session_catalog import SessionCatalog
 
 
 def load_all_sessions(log_dir: str) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Loads all logs and groups them by driver_id.
+    Groups all logs by driver_id via the session catalog (only new or
+    changed files are parsed; unreadable files are skipped).
     Returns:
         { driver_id: [session_path1, session_path2, ...] }
     """
-    files = sorted([f for f in os.listdir(log_dir) if f.endswith(".json")])
-    mapping = {}
-
-    for fn in files:
-        try:
-            session = load_session(os.path.join(log_dir, fn))
-        except:
-            continue
-
-        driver = extract_driver_id(session)
-
-        if driver not in mapping:
-            mapping[driver] = []
-
-        mapping[driver].append(os.path.join(log_dir, fn))
-
-    return mapping
+    with SessionCatalog(log_dir) as catalog:
+        catalog.update()
+        return catalog.drivers()
 
 
 def aggregate_driver_profile(session_paths: List[str]) -> Dict[str, Any]:
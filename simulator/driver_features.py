@@ -1,28 +1,62 @@
 # simulator/driver_features.py
 
 import os
-import json
 import math
 from typing import Dict, Any, List, Tuple, Optional
 import statistics as stats
 
 import numpy as np
 
+from utils.session_log import load_session_packets
+
 
 def load_session(path: str) -> List[Dict[str, Any]]:
-    """Load a single JSON session file (list of packets)."""
-    with open(path, "r") as f:
-        data = json.load(f)
+    """Load a single session file (JSON array or NDJSON log) as a list of packets."""
+    data = load_session_packets(path)
     if not isinstance(data, list):
         raise ValueError(f"Session {path} is not a list of packets.")
     return data
 
 
+def time_series_from_columns(cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Same output as extract_time_series(), built from columnar store
+    channels (utils.session_store.load_session_columns) with the same
+    fallbacks for missing values.
+    """
+    def filled(name, default):
+        arr = np.asarray(cols[name], dtype=float)
+        return np.where(np.isnan(arr), default, arr)
+
+    speed = filled("true_speed_kmh", 0.0)
+    coolant_true = filled("true_coolant_temp", 0.0)
+    yaw_true = filled("true_yaw_deg", 0.0)
+
+    return {
+        "t": filled("t", filled("timestamp", 0.0)),
+        "lap": np.maximum(np.asarray(cols["lap"], dtype=int), 0),
+        "speed": speed,
+        "throttle": filled("true_throttle", 0.0),
+        "brake_cmd": filled("true_brake_cmd", 0.0),
+        "brake_pressure": filled("brake_pressure", 0.0),
+        "coolant_true": coolant_true,
+        "coolant_sensor": filled("coolant_temp", coolant_true),
+        "yaw_true": yaw_true,
+        "yaw_sensor": filled("imu_yaw", yaw_true),
+        "steering": filled("true_steering", 0.0),
+    }
+
+
 def extract_time_series(session: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
     """
     Extract core 1D time-series from a session into numpy arrays.
     Assumes Stage-1 physics packet structure.
+
+    `session` may also be a dict of columnar store channels, in which
+    case no per-packet parsing is done.
     """
+    if isinstance(session, dict):
+        return time_series_from_columns(session)
 
     ts = []
     laps = []
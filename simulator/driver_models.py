@@ -78,6 +78,7 @@ class AdaptiveDriver:
 
         return {
             "aggressiveness": eff_aggressiveness,
+            "corner_aggressiveness": self.corner_aggressiveness,
             "braking_consistency": eff_consistency,
             "reaction_time": eff_reaction,
             "steering_noise": eff_steering_noise,
@@ -244,9 +245,8 @@ BUILTIN_ADAPTIVE_DRIVERS = {
     "adaptive_aggressive": AdaptiveDriver(
         driver_id="adaptive_aggressive", name="Aggressive Adaptive",
         throttle_bias=1.10, aggressiveness=0.30,
-        braking_consistency=0.70, corner_aggressiveness=0.9,
+        braking_consistency=0.60, corner_aggressiveness=0.9,
         steering_noise=0.04, fatigue_rate=0.03,
-        braking_consistency=0.6,
     ),
     "adaptive_novice": AdaptiveDriver(
         driver_id="adaptive_novice", name="Novice Adaptive",
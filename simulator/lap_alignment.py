@@ -0,0 +1,216 @@
+"""
+Distance-based lap resampling and alignment.
+
+Comparing two laps sample by sample (truncating to the shorter one) only
+works when both were logged at the same rate from the same start — not
+for a 10 Hz sim against ~4 Hz OpenF1 data, or two laps that spent
+different times in the same corner. This module maps laps onto a common
+track-distance grid instead:
+
+  - lap_columns(packets)            packet fields → {channel: np.ndarray}
+  - lap_distance(cols)              cumulative distance from GPS (or speed)
+  - resample(dist, values, grid)    np.interp of one array or a dict of them
+  - align_traces(...)               two traces on one shared grid
+  - LapResampler                    the above, cached per lap key
+
+With normalize=True each lap is scaled to a common length, so laps of the
+same track line up at start and finish even when their GPS path lengths
+differ by a few metres; with normalize=False the grid covers the distance
+both traces share (e.g. a time-driven sim that drifted from the real lap).
+
+Usage:
+    from simulator.lap_alignment import LapResampler, align_traces
+
+    resampler = LapResampler()
+    aligned = resampler.align({"lap 5": packets_5, "lap 6": packets_6}, step_m=5.0)
+    aligned["speed_kmh"]          # (2, G) speeds at aligned["distance_m"]
+
+    grid, sim_v, real_v = align_traces(sim_dist, sim_speed, real_dist, real_speed)
+"""
+
+import numpy as np
+
+# Channels resampled by default.
+DEFAULT_CHANNELS = ("t", "speed_kmh", "throttle", "brake_cmd", "yaw_deg", "steering", "gps_x", "gps_y")
+
+
+# ---------------------------------------------------------------------------
+#  PACKETS → COLUMNS → DISTANCE
+# ---------------------------------------------------------------------------
+
+def lap_columns(packets: list) -> dict:
+    """
+    Pull a lap's packet fields into {channel: np.ndarray}.
+
+    Missing fields take the defaults the per-packet code used (0, mass
+    210); "speed_kmh" is NaN where the packet has no speed.
+    """
+    trues = [p.get("true") or {} for p in packets]
+    gps = [p.get("gps") or {} for p in packets]
+
+    def _col(rows, key, default):
+        return np.array([r.get(key, default) for r in rows], dtype=float)
+
+    return {
+        "t": _col(packets, "t", 0),
+        "track_index": _col(packets, "track_index", 0),
+        "speed_kmh": _col(trues, "speed_kmh", np.nan),
+        "throttle": _col(trues, "throttle", 0),
+        "brake_cmd": _col(trues, "brake_cmd", 0),
+        "yaw_deg": _col(trues, "yaw_deg", 0),
+        "steering": _col(trues, "steering", 0),
+        "gps_x": _col(gps, "x", 0),
+        "gps_y": _col(gps, "y", 0),
+        "mass_kg": np.array([(p.get("vehicle_state") or {}).get("mass_kg", 210) for p in packets], dtype=float),
+    }
+
+
+def speed_distance(speed_kmh: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Cumulative distance (m) from a speed trace (trapezoidal in time)."""
+    v = np.nan_to_num(np.asarray(speed_kmh, dtype=float), nan=0.0) / 3.6
+    d = 0.5 * (v[1:] + v[:-1]) * np.diff(np.asarray(t, dtype=float))
+    return np.concatenate(([0.0], np.cumsum(np.maximum(d, 0.0))))
+
+
+def lap_distance(cols: dict) -> np.ndarray:
+    """
+    Cumulative distance (m) along a lap from its GPS trace, or from
+    integrated speed when the lap has no usable GPS.
+    """
+    d = np.hypot(np.diff(cols["gps_x"]), np.diff(cols["gps_y"]))
+    if not np.isfinite(d).all() or d.sum() <= 0:
+        return speed_distance(cols["speed_kmh"], cols["t"])
+    return np.concatenate(([0.0], np.cumsum(d)))
+
+
+# ---------------------------------------------------------------------------
+#  RESAMPLING
+# ---------------------------------------------------------------------------
+
+def distance_grid(length_m: float, step_m: float = 5.0) -> np.ndarray:
+    """0, step, 2·step, ..., length_m (the lap end is always included)."""
+    return np.append(np.arange(0.0, length_m, step_m), length_m)
+
+
+def resample(dist: np.ndarray, values, grid: np.ndarray, length_m: float = None):
+    """
+    Interpolate values sampled at `dist` onto `grid`.
+
+    Parameters
+    ----------
+    dist : np.ndarray
+        Non-decreasing distance of each sample (m).
+    values : np.ndarray or dict[str, np.ndarray]
+        One channel or several.
+    length_m : float, optional
+        Scale `dist` so the lap ends at this length first (normalised
+        alignment); default uses `dist` as is.
+
+    Returns
+    -------
+    np.ndarray or dict — same shape as `values`, on `grid`. NaN samples
+    are treated as 0.
+    """
+    dist = np.asarray(dist, dtype=float)
+    if length_m is not None and dist[-1] > 0:
+        dist = dist * (length_m / dist[-1])
+    if isinstance(values, dict):
+        return {k: np.interp(grid, dist, np.nan_to_num(np.asarray(v, dtype=float), nan=0.0))
+                for k, v in values.items()}
+    return np.interp(grid, dist, np.nan_to_num(np.asarray(values, dtype=float), nan=0.0))
+
+
+def align_traces(dist_a, values_a, dist_b, values_b, step_m: float = 5.0, normalize: bool = True) -> tuple:
+    """
+    Put two traces on one distance grid.
+
+    normalize=True scales both to the mean of their lengths (two complete
+    laps of the same track); normalize=False keeps real distances and
+    covers the stretch both traces reach.
+
+    Returns
+    -------
+    (grid, values_a_on_grid, values_b_on_grid)
+    """
+    la, lb = float(dist_a[-1]), float(dist_b[-1])
+    if normalize:
+        length = 0.5 * (la + lb)
+        grid = distance_grid(length, step_m)
+        return grid, resample(dist_a, values_a, grid, length), resample(dist_b, values_b, grid, length)
+    grid = distance_grid(min(la, lb), step_m)
+    return grid, resample(dist_a, values_a, grid), resample(dist_b, values_b, grid)
+
+
+# ---------------------------------------------------------------------------
+#  CACHED RESAMPLER
+# ---------------------------------------------------------------------------
+
+class LapResampler:
+    """
+    Distance resampling of many laps, cached per lap key.
+
+    Columns and distance are extracted once per (key, packet list); the
+    same list object with the same length is a hit. Pass a new list, or
+    call invalidate(key), when a lap's packets change.
+    """
+
+    def __init__(self):
+        self._laps = {}     # key → (packets, n, cols, dist)
+
+    def lap(self, key, packets: list) -> tuple:
+        """(cols, dist) for one lap."""
+        entry = self._laps.get(key)
+        if entry is None or entry[0] is not packets or entry[1] != len(packets):
+            cols = lap_columns(packets)
+            entry = (packets, len(packets), cols, lap_distance(cols))
+            self._laps[key] = entry
+        return entry[2], entry[3]
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._laps.clear()
+        else:
+            self._laps.pop(key, None)
+
+    def align(self, laps: dict, step_m: float = 5.0, length_m: float = None,
+              channels: tuple = DEFAULT_CHANNELS) -> dict:
+        """
+        Resample every lap onto one normalised distance grid.
+
+        Parameters
+        ----------
+        laps : dict
+            {key: packets}; laps with fewer than two packets are skipped.
+        length_m : float, optional
+            Common lap length (default: median of the laps' distances).
+
+        Returns
+        -------
+        dict with "keys", "distance_m" (G,), "lap_distance_m" (N,), "cols"
+        (each lap's raw columns, for index-based work) and one (N, G)
+        array per channel; "t" is elapsed time from the lap start.
+        """
+        keys = [k for k, p in laps.items() if len(p) >= 2]
+        lapdata = [self.lap(k, laps[k]) for k in keys]
+        if not keys:
+            return {"keys": [], "distance_m": np.zeros(0), "lap_distance_m": np.zeros(0), "cols": []}
+
+        dists = [d for _, d in lapdata]
+        if length_m is None:
+            length_m = float(np.median([d[-1] for d in dists]))
+        grid = distance_grid(length_m, step_m)
+
+        out = {name: np.empty((len(keys), len(grid))) for name in channels}
+        for i, (cols, dist) in enumerate(lapdata):
+            if dist[-1] <= 0:
+                # Stationary lap: spread samples evenly rather than stacking them at 0.
+                dist = np.linspace(0.0, 1.0, len(dist))
+            on_grid = resample(dist, {name: cols[name] for name in channels}, grid, length_m)
+            for name in channels:
+                out[name][i] = on_grid[name]
+        if "t" in out:
+            out["t"] -= np.array([cols["t"][0] for cols, _ in lapdata])[:, None]
+
+        out.update(keys=keys, distance_m=grid, lap_distance_m=np.array([d[-1] for d in dists]),
+                   cols=[cols for cols, _ in lapdata])
+        return out
@@ -13,6 +13,14 @@ Approach:
 
 This provides a "gold standard" lap time for comparison with actual simulation runs.
 
+Two solvers are available (LapTimeSimulator(..., solver=...)):
+  - "segments" (default): corner/straight heuristics above, dt=0.01 integration
+  - "qss": quasi-steady-state profile — one forward (traction-limited) and
+    one backward (braking-limited) pass over the distance-resampled track,
+    capped by AeroModel.max_corner_speed at every station. Each step uses
+    the closed-form solution of m·dv/dt = F - k·v² over a distance step,
+    and every pass can run N setups at once (qss_speed_profile).
+
 Usage:
     from simulator.lap_time_simulator import LapTimeSimulator
     from simulator.track_loader import generate_oval_track
@@ -29,110 +37,222 @@ import math
 
 from simulator.physics.simple.vehicle_model import CAR
 from simulator.physics.simple.aero import AeroModel
+from simulator.lap_alignment import resample, speed_distance
 
 
 class TrackGeometry:
-    """Analyze track waypoints to extract geometry features."""
-
-    def __init__(self, points: list):
-        self.points = np.array(points)
-        self.n = len(points)
+    """
+    Analyze track waypoints to extract geometry features.
 
-    def compute_curvatures(self) -> np.ndarray:
-        """Compute curvature at each track point (1/radius, signed)."""
-        curvatures = np.zeros(self.n)
-        for i in range(self.n):
-            prev = self.points[(i - 1) % self.n]
-            curr = self.points[i]
-            next_p = self.points[(i + 1) % self.n]
+    Segment lengths, the cumulative-distance index and curvatures are
+    computed once with array ops; arc_length() between any two indices is
+    then O(1), and corner/straight segmentation is cached per threshold.
+    """
 
-            v1 = curr - prev
-            v2 = next_p - curr
-            v1_len = np.linalg.norm(v1)
-            v2_len = np.linalg.norm(v2)
-            if v1_len < 1e-6 or v2_len < 1e-6:
-                continue
+    def __init__(self, points: list):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.n = len(self.points)
 
-            cross_z = v1[0] * v2[1] - v1[1] * v2[0]
-            dot = np.dot(v1, v2)
-            angle = np.arctan2(abs(cross_z), dot)
-            curvature = 2.0 * np.sin(angle / 2.0) / max(v1_len, v2_len)
+        # seg_lengths[i] = |p[i+1] - p[i]| (closing segment n-1 → 0 included)
+        self.seg_lengths = np.linalg.norm(np.roll(self.points, -1, axis=0) - self.points, axis=1)
+        # cumulative_distance[i] = distance from point 0 to point i; [n] = lap length
+        self.cumulative_distance = np.concatenate(([0.0], np.cumsum(self.seg_lengths)))
 
-            sign = 1.0 if cross_z > 0 else -1.0
-            curvatures[i] = curvature * sign
+        self._curvatures = None
+        self._segments = {}
 
-        return curvatures
+    def compute_curvatures(self) -> np.ndarray:
+        """Compute curvature at each track point (1/radius, signed)."""
+        if self._curvatures is None:
+            v1 = self.points - np.roll(self.points, 1, axis=0)
+            v2 = np.roll(self.points, -1, axis=0) - self.points
+            v1_len = np.linalg.norm(v1, axis=1)
+            v2_len = np.linalg.norm(v2, axis=1)
+
+            cross_z = v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+            dot = np.einsum("ij,ij->i", v1, v2)
+            angle = np.arctan2(np.abs(cross_z), dot)
+
+            valid = (v1_len >= 1e-6) & (v2_len >= 1e-6)
+            longest = np.where(valid, np.maximum(v1_len, v2_len), 1.0)
+            curvature = 2.0 * np.sin(angle / 2.0) / longest
+            sign = np.where(cross_z > 0, 1.0, -1.0)
+            self._curvatures = np.where(valid, curvature * sign, 0.0)
+        return self._curvatures.copy()
+
+    def _runs(self, mask: np.ndarray) -> list:
+        """
+        (start, end) of each run of True in mask, end exclusive. Runs still
+        open at the last point are dropped, and only runs longer than 3
+        points are kept.
+        """
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        keep = (ends < self.n) & (ends - starts > 3)
+        return list(zip(starts[keep].tolist(), ends[keep].tolist()))
 
     def compute_corner_radii(self, curvature_threshold: float = 0.005) -> list:
         """Extract corner segments with radius and arc length."""
-        curvatures = self.compute_curvatures()
-        corners = []
-        in_corner = False
-        start = 0
-        peak_curv = 0.0
-        peak_idx = 0
-
-        for i in range(self.n):
-            abs_curv = abs(curvatures[i])
-            if abs_curv > curvature_threshold and not in_corner:
-                start = i
-                peak_curv = abs_curv
-                peak_idx = i
-                in_corner = True
-            elif abs_curv > curvature_threshold and in_corner:
-                if abs_curv > peak_curv:
-                    peak_curv = abs_curv
-                    peak_idx = i
-            elif abs_curv <= curvature_threshold and in_corner:
-                if i - start > 3:
-                    arc_length = self._arc_length(start, i)
-                    radius = 1.0 / peak_curv if peak_curv > 0 else float("inf")
-                    corners.append({
-                        "start_idx": start,
-                        "end_idx": i,
-                        "peak_idx": peak_idx,
-                        "radius": radius,
-                        "arc_length": arc_length,
-                        "direction": "L" if curvatures[peak_idx] > 0 else "R",
-                    })
-                in_corner = False
-
-        return corners
+        key = ("corners", curvature_threshold)
+        if key not in self._segments:
+            curvatures = self.compute_curvatures()
+            abs_curv = np.abs(curvatures)
+            corners = []
+            for start, end in self._runs(abs_curv > curvature_threshold):
+                peak_idx = start + int(np.argmax(abs_curv[start:end]))
+                peak_curv = abs_curv[peak_idx]
+                corners.append({
+                    "start_idx": start,
+                    "end_idx": end,
+                    "peak_idx": peak_idx,
+                    "radius": 1.0 / peak_curv if peak_curv > 0 else float("inf"),
+                    "arc_length": self.arc_length(start, end),
+                    "direction": "L" if curvatures[peak_idx] > 0 else "R",
+                })
+            self._segments[key] = corners
+        return [dict(c) for c in self._segments[key]]
 
     def compute_straights(self, curvature_threshold: float = 0.005) -> list:
         """Extract straight segments."""
-        curvatures = self.compute_curvatures()
-        straights = []
-        in_straight = False
-        start = 0
-
-        for i in range(self.n):
-            abs_curv = abs(curvatures[i])
-            if abs_curv <= curvature_threshold and not in_straight:
-                start = i
-                in_straight = True
-            elif abs_curv > curvature_threshold and in_straight:
-                if i - start > 3:
-                    length = self._arc_length(start, i)
-                    straights.append({"start_idx": start, "end_idx": i, "length": length})
-                in_straight = False
-
-        return straights
-
-    def _arc_length(self, start: int, end: int) -> float:
-        """Arc length between two track indices."""
+        key = ("straights", curvature_threshold)
+        if key not in self._segments:
+            abs_curv = np.abs(self.compute_curvatures())
+            self._segments[key] = [
+                {"start_idx": start, "end_idx": end, "length": self.arc_length(start, end)}
+                for start, end in self._runs(abs_curv <= curvature_threshold)
+            ]
+        return [dict(s) for s in self._segments[key]]
+
+    def distance_at(self, idx: int) -> float:
+        """Distance along the track from point 0 to point idx (idx may exceed n)."""
+        laps, i = divmod(int(idx), self.n)
+        return laps * self.cumulative_distance[-1] + self.cumulative_distance[i]
+
+    def index_at_distance(self, distance_m):
+        """Index of the last point at or before distance_m (wrapped to one lap)."""
+        d = np.mod(distance_m, self.cumulative_distance[-1])
+        return np.searchsorted(self.cumulative_distance, d, side="right") - 1
+
+    def arc_length(self, start: int, end: int) -> float:
+        """Arc length between two track indices (wraps if start >= end)."""
         if start >= end:
             end += self.n
-        length = 0.0
-        for i in range(start, end):
-            i1 = i % self.n
-            i2 = (i + 1) % self.n
-            length += np.linalg.norm(self.points[i2] - self.points[i1])
-        return length
+        return float(self.distance_at(end) - self.distance_at(start))
+
+    # Kept for existing callers.
+    _arc_length = arc_length
 
     def track_length(self) -> float:
         """Total track length."""
-        return self._arc_length(0, self.n)
+        return float(self.cumulative_distance[-1])
+
+
+def _qss_passes(lim2, e, acc, brk, terminal2, standing_start, mn, mx):
+    """
+    Forward then backward pass in v² space. Works on lists of floats
+    (mn/mx = min/max) or on (n, m) arrays row by row (np.minimum/np.maximum).
+    """
+    n = len(lim2)
+    w = lim2
+
+    # Forward: traction-limited. A flying lap goes round twice so the
+    # start speed is the one carried over the line.
+    w[0] = 0.0 if standing_start else mn(lim2[0], terminal2)
+    for lap in range(1 if standing_start else 2):
+        if lap == 1:
+            w[0] = mn(lim2[0], mx(w[n - 1] * e[n - 1] + acc[n - 1], 0.0))
+        for i in range(n - 1):
+            w[i + 1] = mn(lim2[i + 1], mx(w[i] * e[i] + acc[i], 0.0))
+
+    # Backward: braking-limited, applied on top of the forward result.
+    for _ in range(1 if standing_start else 2):
+        if not standing_start:
+            w[n - 1] = mn(w[n - 1], w[0] / e[n - 1] + brk[n - 1])
+        for i in range(n - 2, -1, -1):
+            w[i] = mn(w[i], w[i + 1] / e[i] + brk[i])
+    if standing_start:
+        w[0] = 0.0
+    return w
+
+
+def qss_speed_profile(v_limit, ds, accel, brake, drag, standing_start: bool = False) -> tuple:
+    """
+    Quasi-steady-state speed profile by forward/backward passes.
+
+    Works in v² space. Over a step ds with constant force and drag ∝ v²:
+        accelerating:  v1² = v0²·e + accel·f,   e = exp(-2·drag·ds), f = (1 - e) / drag
+        braking (reversed): v0² = v1²/e + brake·g,   g = (exp(2·drag·ds) - 1) / drag
+    (f, g → 2·ds as drag → 0).
+
+    Parameters
+    ----------
+    v_limit : np.ndarray, shape (n,) or (n, m)
+        Corner speed limit at each station (m/s, inf on straights);
+        m = number of setups solved together.
+    ds : float or np.ndarray of shape (n,)
+        Distance from station i to i+1 (entry n-1 closes the lap).
+    accel : float or np.ndarray of shape (m,)
+        (engine force - rolling resistance) / mass  (m/s²)
+    brake : float or np.ndarray of shape (m,)
+        (brake force + rolling resistance) / mass  (m/s²)
+    drag : float or np.ndarray of shape (m,)
+        0.5 · rho · Cd · A / mass  (1/m)
+    standing_start : bool
+        Start from rest at station 0 instead of a flying lap.
+
+    Returns
+    -------
+    tuple[np.ndarray, float | np.ndarray] — (speed at each station (m/s),
+        lap time (s)); shapes follow v_limit.
+    """
+    v_lim = np.asarray(v_limit, dtype=float)
+    single = v_lim.ndim == 1
+    if single:
+        v_lim = v_lim[:, None]
+    n, m = v_lim.shape
+
+    ds = np.broadcast_to(np.asarray(ds, dtype=float).reshape(-1, 1), (n, 1))
+    accel = np.broadcast_to(np.asarray(accel, dtype=float), (m,))
+    brake = np.broadcast_to(np.asarray(brake, dtype=float), (m,))
+    drag = np.broadcast_to(np.asarray(drag, dtype=float), (m,))
+
+    x = 2.0 * drag * ds                                   # (n, m)
+    e = np.exp(-x)
+    has_drag = drag > 0
+    safe_drag = np.where(has_drag, drag, 1.0)
+    f = np.where(has_drag, -np.expm1(-x) / safe_drag, 2.0 * ds)
+    g = np.where(has_drag, np.expm1(x) / safe_drag, 2.0 * ds)
+    acc_gain = accel * f
+    brk_gain = brake * g
+
+    # Flying lap needs a finite start: terminal speed (or the station limit).
+    terminal2 = np.where(has_drag, np.maximum(accel, 0.0) / safe_drag, np.inf)
+    lim2 = v_lim ** 2
+
+    if m == 1:
+        # Plain floats are much cheaper than 1-element array ops per station.
+        w = _qss_passes(lim2[:, 0].tolist(), e[:, 0].tolist(), acc_gain[:, 0].tolist(),
+                        brk_gain[:, 0].tolist(), float(terminal2[0]), standing_start, min, max)
+        w = np.asarray(w)[:, None]
+    else:
+        w = _qss_passes(lim2.copy(), e, acc_gain, brk_gain, terminal2, standing_start,
+                        np.minimum, np.maximum)
+
+    v = np.sqrt(w)
+
+    # Lap time: constant acceleration in v² over a step → t = 2·ds / (v0 + v1).
+    if standing_start:
+        v_line = np.sqrt(np.minimum(lim2[0], np.maximum(w[-1] * e[-1] + acc_gain[-1], 0.0)))
+    else:
+        v_line = v[0]
+    v_next = np.vstack([v[1:], v_line[None, :]])
+    with np.errstate(divide="ignore"):
+        lap_time = np.sum(2.0 * ds / (v + v_next), axis=0)
+
+    if single:
+        return v[:, 0], float(lap_time[0])
+    return v, lap_time
 
 
 class LapTimeSimulator:
@@ -151,7 +271,11 @@ class LapTimeSimulator:
         car_params: dict = None,
         mu: float = 1.2,
         aero: AeroModel = None,
+        solver: str = "segments",
     ):
+        if solver not in ("segments", "qss"):
+            raise ValueError(f"Unknown solver: {solver}. Choose 'segments' or 'qss'")
+        self.solver = solver
         self.track = TrackGeometry(track_points)
         self.params = car_params if car_params else dict(CAR)
         self.mu = mu
@@ -245,10 +369,95 @@ class LapTimeSimulator:
 
         return d
 
+    def qss_inputs(self, ds: float = 1.0) -> dict:
+        """
+        Distance-resampled track and per-station corner limits for the QSS solver.
+
+        Returns
+        -------
+        dict — s (station distances), ds (step), v_limit (m/s), accel, brake, drag
+        """
+        L = self._track_length
+        n_st = max(int(round(L / ds)), 3)
+        step = L / n_st
+        s = np.arange(n_st) * step
+
+        kappa = np.interp(s, self.track.cumulative_distance[:-1], np.abs(self._curvatures), period=L)
+        with np.errstate(divide="ignore"):
+            radius = np.where(kappa > 1e-9, 1.0 / kappa, np.inf)
+
+        p = self.params
+        mass = p["mass"]
+        roll = p["rolling_resistance"] * mass * 9.81
+        return {
+            "s": s,
+            "ds": step,
+            "v_limit": self.aero.max_corner_speed(radius, self.mu, mass),
+            "accel": (p["max_engine_force"] - roll) / mass,
+            "brake": (p["max_brake_force"] + roll) / mass,
+            "drag": 0.5 * p["air_density"] * p["drag_coeff"] * p["frontal_area"] / mass,
+        }
+
+    def simulate_qss_lap(self, ds: float = 1.0, standing_start: bool = False) -> dict:
+        """
+        Quasi-steady-state optimal lap (forward/backward passes, see qss_speed_profile).
+
+        Parameters
+        ----------
+        ds : float
+            Station spacing for the distance-resampled track (m).
+        standing_start : bool
+            Start from rest instead of a flying lap.
+
+        Returns
+        -------
+        dict — same keys as simulate_optimal_lap(), plus "solver" and
+        "station_speed_kmh" (profile on the resampled stations).
+        """
+        q = self.qss_inputs(ds)
+        v, lap_time = qss_speed_profile(q["v_limit"], q["ds"], q["accel"], q["brake"], q["drag"],
+                                        standing_start=standing_start)
+
+        # Back onto the original track points
+        L = self._track_length
+        v_points = np.interp(self.track.cumulative_distance[:-1], q["s"], v, period=L)
+
+        corner_stats = []
+        for c in self._corners:
+            corner_stats.append({
+                "radius_m": round(c["radius"], 1),
+                "arc_length_m": round(c["arc_length"], 1),
+                "apex_speed_kmh": round(float(v_points[c["start_idx"]:c["end_idx"] + 1].min()) * 3.6, 1),
+                "direction": c["direction"],
+            })
+
+        return {
+            "lap_time_s": round(lap_time, 3),
+            "track_length_m": round(L, 1),
+            "average_speed_kmh": round(L / lap_time * 3.6, 1) if lap_time > 0 else 0.0,
+            "speed_profile_kmh": [round(x, 1) for x in (v_points * 3.6).tolist()],
+            "station_speed_kmh": v * 3.6,
+            "n_corners": len(self._corners),
+            "corner_stats": corner_stats,
+            "n_straights": len(self._straights),
+            "solver": "qss",
+            "params": {
+                "mass": self.params["mass"],
+                "engine_force": self.params["max_engine_force"],
+                "brake_force": self.params["max_brake_force"],
+                "mu": self.mu,
+                "drag_coeff": self.params["drag_coeff"],
+                "downforce_coeff": self.aero.downforce_coeff,
+            },
+        }
+
     def simulate_optimal_lap(self) -> dict:
         """
         Compute optimal lap time and speed profile.
 
+        Uses the solver chosen at construction; "qss" delegates to
+        simulate_qss_lap().
+
         Returns
         -------
         dict with:
@@ -259,6 +468,9 @@ class LapTimeSimulator:
           - track_length_m: total track length
           - average_speed_kmh: mean speed
         """
+        if self.solver == "qss":
+            return self.simulate_qss_lap()
+
         n = len(self.track.points)
         speed_profile_ms = np.zeros(n)
         segment_times = []
@@ -273,29 +485,26 @@ class LapTimeSimulator:
             speed_profile_ms[corner["start_idx"]:corner["end_idx"] + 1] = v_max
 
         # Phase 2: Fill straights with acceleration/deceleration
+        corner_starts = np.array([c["start_idx"] for c in self._corners], dtype=int)
         i = 0
         current_speed = 0.0
         while i < n:
-            # Check if we're approaching a corner
-            next_corner = None
-            for corner in self._corners:
-                if corner["start_idx"] > i:
-                    next_corner = corner
-                    break
+            # Next corner starting after i (corners are ordered by start_idx)
+            k = int(np.searchsorted(corner_starts, i, side="right"))
+            next_corner = self._corners[k] if k < len(self._corners) else None
 
             if next_corner is None:
                 # No more corners — final straight
-                straight_len = self.track._arc_length(i, n)
+                straight_len = self.track.arc_length(i, n)
                 if straight_len > 1.0:
                     final_speed, seg_time, avg_speed = self.max_straight_speed(straight_len, current_speed)
-                    for j in range(i, n):
-                        frac = (j - i) / max(n - i, 1)
-                        speed_profile_ms[j] = current_speed + (final_speed - current_speed) * frac
+                    frac = np.arange(n - i) / max(n - i, 1)
+                    speed_profile_ms[i:n] = current_speed + (final_speed - current_speed) * frac
                     total_time += seg_time
                 break
 
             # Straight before corner
-            straight_len = self.track._arc_length(i, next_corner["start_idx"])
+            straight_len = self.track.arc_length(i, next_corner["start_idx"])
             corner_entry_speed = corner_speeds.get(next_corner["peak_idx"], 0)
 
             if straight_len > 0.5:
@@ -317,9 +526,10 @@ class LapTimeSimulator:
                     speed_before_brake = min(accel_speed, 80.0)
 
                     # Fill acceleration phase
-                    for j in range(i, min(i + int(accel_len / 1.0), next_corner["start_idx"])):
-                        frac = (j - i) / max(int(accel_len / 1.0), 1)
-                        speed_profile_ms[j] = current_speed + (speed_before_brake - current_speed) * min(frac, 1.0)
+                    fill_end = min(i + int(accel_len / 1.0), next_corner["start_idx"])
+                    if fill_end > i:
+                        frac = np.minimum(np.arange(fill_end - i) / max(int(accel_len / 1.0), 1), 1.0)
+                        speed_profile_ms[i:fill_end] = current_speed + (speed_before_brake - current_speed) * frac
 
                     total_time += accel_time
 
@@ -334,8 +544,7 @@ class LapTimeSimulator:
                 total_time += corner_time
 
             # Fill corner speed profile
-            for j in range(next_corner["start_idx"], next_corner["end_idx"] + 1):
-                speed_profile_ms[j] = corner_entry_speed
+            speed_profile_ms[next_corner["start_idx"]:next_corner["end_idx"] + 1] = corner_entry_speed
 
             i = next_corner["end_idx"] + 1
             current_speed = corner_entry_speed
@@ -373,8 +582,18 @@ class LapTimeSimulator:
             },
         }
 
-    def compare_to_actual(self, actual_lap_time: float, actual_speed_profile: list = None) -> dict:
-        """Compare optimal prediction to an actual simulation run."""
+    def compare_to_actual(
+        self, actual_lap_time: float, actual_speed_profile: list = None, actual_distance_m: list = None
+    ) -> dict:
+        """
+        Compare optimal prediction to an actual simulation run.
+
+        The actual speed profile is resampled onto the track points the
+        optimal profile is given at, by distance: `actual_distance_m` if
+        given (e.g. lap_alignment.lap_distance of the lap), otherwise
+        integrated from the speeds assuming they are evenly spaced in
+        time over actual_lap_time.
+        """
         optimal = self.simulate_optimal_lap()
 
         time_delta = actual_lap_time - optimal["lap_time_s"]
@@ -394,10 +613,17 @@ class LapTimeSimulator:
             actual_speed = np.array(actual_speed_profile)
             optimal_speed = np.array(optimal["speed_profile_kmh"])
 
-            n = min(len(actual_speed), len(optimal_speed))
-            if n > 0:
-                result["speed_rmse"] = round(float(np.sqrt(np.mean((actual_speed[:n] - optimal_speed[:n]) ** 2))), 2)
-                result["speed_mae"] = round(float(np.mean(np.abs(actual_speed[:n] - optimal_speed[:n]))), 2)
+            if actual_distance_m is not None:
+                dist, length = np.asarray(actual_distance_m, dtype=float), None
+            else:
+                # One full lap: scale the integrated distance to the track length.
+                dist = speed_distance(actual_speed, np.linspace(0.0, actual_lap_time, len(actual_speed)))
+                length = self._track_length
+            if len(actual_speed) >= 2 and dist[-1] > 0:
+                actual_on_track = resample(dist, actual_speed, self.track.cumulative_distance[:-1], length_m=length)
+                err = actual_on_track - optimal_speed
+                result["speed_rmse"] = round(float(np.sqrt(np.mean(err ** 2))), 2)
+                result["speed_mae"] = round(float(np.mean(np.abs(err))), 2)
 
         return result
 
@@ -444,6 +670,8 @@ def cli():
     parser.add_argument("--mu", type=float, default=1.2, help="Tire-road friction coefficient")
     parser.add_argument("--downforce", type=float, default=1.2, help="Downforce coefficient")
     parser.add_argument("--actual-lap-time", type=float, default=None, help="Actual lap time for comparison")
+    parser.add_argument("--solver", type=str, default="segments", choices=["segments", "qss"],
+                        help="segments = corner/straight heuristics, qss = forward/backward speed profile")
 
     args = parser.parse_args()
 
@@ -472,7 +700,7 @@ def cli():
 
     # Run lap time simulation
     aero = AeroModel(downforce_coeff=args.downforce)
-    lts = LapTimeSimulator(track, car_params=car_params, mu=args.mu, aero=aero)
+    lts = LapTimeSimulator(track, car_params=car_params, mu=args.mu, aero=aero, solver=args.solver)
     lts.print_report()
 
     if args.actual_lap_time:
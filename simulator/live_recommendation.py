@@ -1,16 +1,249 @@
 # simulator/live_recommendation.py
 
+import os
+import json
+import hashlib
+
 import numpy as np
 from typing import Dict, Any, List
 
-from simulator.recommender import (
-    load_all_sessions,
-    build_segment_database,
-)
+from simulator.recommender import load_segment_store, LOG_DIR
+from simulator.segment_store import ROOT, STORE_CHANNELS, columns_arrays
+
+SEGMENT_REFERENCE_PATH = os.path.join(ROOT, "data", "store", "segment_reference.npz")
+SEGMENT_REFERENCE_VERSION = 1
+
+# Speed sketch: fixed 0.5 km/h bins over 0–400 km/h (last bin takes the overflow)
+SPEED_BIN_KMH = 0.5
+SPEED_BINS = 800
+TARGET_SPEED_PERCENTILE = 75        # "fast but safe"
+
+_META_KEY = "__meta__"
+
 
 # ============================================================
-# PART 1 — Build Segment Reference From Historical Data
+# PART 1 — Segment Reference (persisted, streaming)
 # ============================================================
+class SegmentReference:
+    """
+    Per-segment targets kept as mergeable sketches instead of raw samples:
+
+      counts (S,)                samples per segment
+      sums   (S, 2)              throttle, brake_cmd totals → exact means
+      hist   (S, SPEED_BINS)     speed histogram → percentiles within one bin
+
+    Adding a session costs one bincount over its samples; nothing already
+    folded in is re-read or re-sorted. `sources` ({filename: fingerprint})
+    records what the sketch contains, and `key` hashes that set, so
+    update_from_logs() only reads logs the reference has not seen. A changed
+    or deleted log cannot be subtracted from a histogram, so that case
+    rebuilds from all logs.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.sources: Dict[str, str] = {}
+        self.segments = np.zeros(0, np.int32)
+        self.counts = np.zeros(0, np.int64)
+        self.sums = np.zeros((0, 2))
+        self.hist = np.zeros((0, SPEED_BINS), np.uint32)
+        self._dirty = False
+
+    @property
+    def key(self) -> str:
+        """Hash of the contributing session fingerprints."""
+        return _sources_key(self.sources)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    # --------------------------------------------------------
+    # FOLD IN SAMPLES
+    # --------------------------------------------------------
+    def add(self, arrays: Dict[str, np.ndarray], source: Dict[str, str] = None):
+        """Fold one session's arrays (segment_store.session_arrays layout) into the sketches."""
+        if source:
+            self.sources[source["filename"]] = source["fingerprint"]
+        self._dirty = True
+        idx = np.asarray(arrays["track_index"], dtype=np.int32)
+        if len(idx) == 0:
+            return
+
+        segments = np.union1d(self.segments, idx).astype(np.int32)
+        if len(segments) != len(self.segments):
+            pos = np.searchsorted(segments, self.segments)
+            counts = np.zeros(len(segments), np.int64)
+            sums = np.zeros((len(segments), 2))
+            hist = np.zeros((len(segments), SPEED_BINS), np.uint32)
+            counts[pos], sums[pos], hist[pos] = self.counts, self.sums, self.hist
+            self.segments, self.counts, self.sums, self.hist = segments, counts, sums, hist
+
+        S = len(self.segments)
+        k = np.searchsorted(self.segments, idx)
+        speed = np.nan_to_num(np.asarray(arrays["features"][:, 0], dtype=np.float64), nan=0.0)
+        b = np.clip((speed / SPEED_BIN_KMH).astype(np.int64), 0, SPEED_BINS - 1)
+        actions = np.asarray(arrays["actions"][:, :2], dtype=np.float64)
+
+        self.counts += np.bincount(k, minlength=S)
+        self.sums[:, 0] += np.bincount(k, weights=actions[:, 0], minlength=S)
+        self.sums[:, 1] += np.bincount(k, weights=actions[:, 1], minlength=S)
+        self.hist += np.bincount(k * SPEED_BINS + b, minlength=S * SPEED_BINS).reshape(S, SPEED_BINS).astype(np.uint32)
+
+    def add_store(self, db):
+        """Fold in every sample of a SegmentStore."""
+        self.add({"track_index": db.track_index, "features": db.features, "actions": db.actions})
+        self.sources.update({s["filename"]: s["fingerprint"] for s in db.sources if s})
+
+    def update_from_logs(self, log_dir: str = LOG_DIR) -> Dict[str, int]:
+        """
+        Sync with the Stage-1 logs in log_dir (via the session catalog).
+
+        Returns
+        -------
+        dict — counts of added / unchanged / failed sessions, and rebuilt (0/1)
+        """
+        from utils.session_catalog import SessionCatalog
+        from utils.session_store import load_session_columns
+
+        with SessionCatalog(log_dir) as catalog:
+            catalog.update()
+            rows = catalog.list(schema="stage1")
+        current = {r["filename"]: r["fingerprint"] for r in rows}
+        counts = {"added": 0, "unchanged": 0, "failed": 0, "rebuilt": 0}
+
+        if _sources_key(current) == self.key:
+            counts["unchanged"] = len(current)
+            return counts
+
+        if any(current.get(fn) != fp for fn, fp in self.sources.items()):
+            # Changed or deleted log: histograms cannot un-count it, start over.
+            self.__init__(self.path)
+            counts["rebuilt"] = 1
+
+        for fn, fp in current.items():
+            if fn in self.sources:
+                counts["unchanged"] += 1
+                continue
+            try:
+                cols = load_session_columns(os.path.join(log_dir, fn), channels=list(STORE_CHANNELS))
+                self.add(columns_arrays(cols), {"filename": fn, "fingerprint": fp})
+                counts["added"] += 1
+            except Exception:
+                counts["failed"] += 1
+        return counts
+
+    # --------------------------------------------------------
+    # TARGETS
+    # --------------------------------------------------------
+    def speed_percentile(self, q: float) -> np.ndarray:
+        """
+        Per-segment q-th speed percentile → (S,).
+
+        Same linear interpolation between order statistics as np.percentile;
+        each order statistic is placed evenly within its histogram bin, so
+        the result is within one bin (SPEED_BIN_KMH) of the exact value.
+        """
+        cdf = np.cumsum(self.hist, axis=1, dtype=np.int64)
+        rows = np.arange(len(cdf))
+        # Rows shifted apart so one searchsorted covers every segment.
+        shift = rows * (int(self.counts.max(initial=0)) + 1)
+        flat = (cdf + shift[:, None]).ravel()
+
+        def order_stat(j):
+            b = np.searchsorted(flat, j + shift, side="right") - rows * SPEED_BINS
+            b = np.minimum(b, SPEED_BINS - 1)
+            in_bin = self.hist[rows, b].astype(np.float64)
+            below = cdf[rows, b] - in_bin
+            return (b + (j - below + 0.5) / np.maximum(in_bin, 1)) * SPEED_BIN_KMH
+
+        h = np.maximum(self.counts - 1, 0) * (q / 100.0)
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(self.counts - 1, 0))
+        v_lo = order_stat(lo)
+        return v_lo + (h - lo) * (order_stat(hi) - v_lo)
+
+    def targets(self, min_samples_per_segment: int = 5) -> Dict[int, Dict[str, Any]]:
+        """The build_segment_reference() dict for segments with enough samples."""
+        target_speed = self.speed_percentile(TARGET_SPEED_PERCENTILE)
+        means = self.sums / np.maximum(self.counts, 1)[:, None]
+        return {
+            int(self.segments[k]): {
+                "target_speed": float(target_speed[k]),
+                "target_throttle": float(means[k, 0]),
+                "target_brake_cmd": float(means[k, 1]),
+                "samples": int(self.counts[k]),
+            }
+            for k in np.flatnonzero(self.counts >= min_samples_per_segment)  # fewer → skip
+        }
+
+    # --------------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------------
+    def save(self, path: str = None) -> str:
+        """Write a compressed .npz; histograms are stored as sparse (row, bin, count)."""
+        from utils.json_writer import _ensure_dir
+        path = path or self.path or SEGMENT_REFERENCE_PATH
+        _ensure_dir(path)
+        rows, bins = np.nonzero(self.hist)
+        meta = {
+            "version": SEGMENT_REFERENCE_VERSION,
+            "speed_bin_kmh": SPEED_BIN_KMH,
+            "speed_bins": SPEED_BINS,
+            "sources": self.sources,
+            "key": self.key,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f, segments=self.segments, counts=self.counts, sums=self.sums,
+                hist_rows=rows.astype(np.int32), hist_bins=bins.astype(np.int32), hist_counts=self.hist[rows, bins],
+                **{_META_KEY: np.array(json.dumps(meta))},
+            )
+        os.replace(tmp, path)
+        self.path = path
+        self._dirty = False
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SegmentReference":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z[_META_KEY]))
+            if (meta.get("version"), meta.get("speed_bin_kmh"), meta.get("speed_bins")) != \
+                    (SEGMENT_REFERENCE_VERSION, SPEED_BIN_KMH, SPEED_BINS):
+                raise ValueError(f"{path}: outdated segment reference")
+            ref = cls(path)
+            ref.segments, ref.counts, ref.sums = z["segments"], z["counts"], z["sums"]
+            ref.hist = np.zeros((len(ref.segments), SPEED_BINS), np.uint32)
+            ref.hist[z["hist_rows"], z["hist_bins"]] = z["hist_counts"]
+        ref.sources = meta["sources"]
+        return ref
+
+    @classmethod
+    def open(cls, path: str = SEGMENT_REFERENCE_PATH) -> "SegmentReference":
+        """Load the reference at path, or an empty one if it is missing or outdated."""
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError):
+            return cls(path)
+
+
+def _sources_key(sources: Dict[str, str]) -> str:
+    return hashlib.sha1("\n".join(sorted(sources.values())).encode()).hexdigest()
+
+
+def load_segment_reference() -> SegmentReference:
+    """
+    The persisted reference for LOG_DIR (data/store/segment_reference.npz),
+    updated with new logs only and saved again when it changed.
+    """
+    ref = SegmentReference.open(SEGMENT_REFERENCE_PATH)
+    ref.update_from_logs(LOG_DIR)
+    if ref.dirty:
+        ref.save()
+    return ref
+
+
 def build_segment_reference(
     limit_sessions: int | None = None,
     min_samples_per_segment: int = 5,
@@ -18,39 +251,23 @@ def build_segment_reference(
     """
     Build a reference "target behaviour" from all past sessions.
 
+    Uses the persisted, incrementally updated SegmentReference; with
+    limit_sessions an in-memory one is built from the first sessions.
+
     Output (per segment idx):
       {
-        "target_speed": float,
+        "target_speed": float,        # 75th percentile speed (±0.5 km/h bin)
         "target_throttle": float,
         "target_brake_cmd": float,
         "samples": int
       }
     """
-    sessions = load_all_sessions(limit=limit_sessions)
-    db = build_segment_database(sessions)
-
-    segment_ref: Dict[int, Dict[str, Any]] = {}
-
-    for idx, records in db.items():
-        if len(records) < min_samples_per_segment:
-            continue  # not enough data → skip
-
-        speeds = np.array([r[0][0] for r in records])      # speed_kmh
-        throttles = np.array([r[1][0] for r in records])   # throttle
-        brakes = np.array([r[1][1] for r in records])      # brake_cmd
-
-        target_speed = float(np.percentile(speeds, 75))     # "fast but safe"
-        target_throttle = float(throttles.mean())
-        target_brake_cmd = float(brakes.mean())
-
-        segment_ref[idx] = {
-            "target_speed": target_speed,
-            "target_throttle": target_throttle,
-            "target_brake_cmd": target_brake_cmd,
-            "samples": len(records),
-        }
-
-    return segment_ref
+    if limit_sessions:
+        ref = SegmentReference()
+        ref.add_store(load_segment_store(limit=limit_sessions))
+    else:
+        ref = load_segment_reference()
+    return ref.targets(min_samples_per_segment)
 
 
 # ============================================================
@@ -0,0 +1,395 @@
+"""
+Monte Carlo race outcomes: K seeded replicas of a stint or race.
+
+Much of a run is random: simple_lap_profile + DriverProfile.perturb_action,
+AdaptiveDriver's braking jitter and steering noise, and sensor noise and
+dropouts. One run is therefore one sample. This module repeats the same
+stint (one entry) or race (several entries) K times across a process pool
+and reports distributions instead of single numbers. Per car it reports:
+
+  - lap time percentiles, plus a p5/p50/p95 band for every lap
+  - race time with a 95% confidence interval of the mean
+  - fuel used and tire wear percentiles at the flag
+  - failure rate with a Wilson 95% interval. A failure is a DNF (the car
+    did not finish in max_sim_time), an empty tank, or tire wear over
+    `wear_limit_pct`.
+  - finishing position (mean, percentiles, win rate) for multi-car races
+
+Replica k is seeded from SeedSequence(seed).spawn(K)[k]. Its result
+depends only on (seed, k), not on n_jobs or on which worker ran it, so a
+report is reproducible and the replicas can be split across any number
+of processes.
+
+Usage:
+    # 500 replicas of a 5-lap stint for two drivers, on 4 processes
+    python -m simulator.monte_carlo --replicas 500 --target-laps 5 \\
+        --driver-ids driver_fast adaptive_expert --seed 1 --n-jobs 4
+
+    from simulator.monte_carlo import run_monte_carlo
+    report = run_monte_carlo(track, car_cfg, sensor_cfg, entries, replicas=200, seed=1, n_jobs=4)
+    report["cars"][0]["lap_time_s"]      # {"mean", "std", "p5", "p50", "p95"}
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.config_loader import load_yaml
+from utils.json_writer import atomic_write
+
+from simulator.race_mode import run_race, load_race_entries
+from simulator.track_loader import load_track_csv, generate_oval_track
+
+DATA_DIR = os.path.join(ROOT, "data")
+MC_DIR = os.path.join(DATA_DIR, "monte_carlo")
+
+BANDS = (5, 50, 95)
+
+
+# ---------------------------------------------------------------------------
+#  REPLICAS
+# ---------------------------------------------------------------------------
+
+def run_replica(track, car_cfg, sensor_cfg, entries, seed_seq, dt=0.1, target_laps=5,
+                max_sim_time=None) -> list:
+    """
+    One race with the global RNGs seeded from `seed_seq`.
+
+    The drivers, profiles and sensors draw from `random` and `np.random`,
+    so both are seeded here and restored afterwards.
+
+    Returns
+    -------
+    list[dict] — run_race() classification rows, ordered by car.
+    """
+    py_seed, np_seed = seed_seq.generate_state(2)
+    py_state, np_state = random.getstate(), np.random.get_state()
+    random.seed(int(py_seed))
+    np.random.seed(int(np_seed))
+    try:
+        classification, _ = run_race(track, car_cfg, sensor_cfg, entries, dt=dt,
+                                     target_laps=target_laps, max_sim_time=max_sim_time,
+                                     stop_file=None)
+    finally:
+        random.setstate(py_state)
+        np.random.set_state(np_state)
+    return sorted(classification, key=lambda row: row["car"])
+
+
+# Per-process state for the pool (track / config are sent once, not per chunk).
+_WORKER = {}
+
+
+def _init_worker(track, car_cfg, sensor_cfg, entries, dt, target_laps, max_sim_time):
+    _WORKER.update(track=track, car_cfg=car_cfg, sensor_cfg=sensor_cfg, entries=entries,
+                   dt=dt, target_laps=target_laps, max_sim_time=max_sim_time)
+
+
+def _run_chunk(tasks: list) -> list:
+    w = _WORKER
+    return [(k, run_replica(w["track"], w["car_cfg"], w["sensor_cfg"], w["entries"], seq,
+                            dt=w["dt"], target_laps=w["target_laps"], max_sim_time=w["max_sim_time"]))
+            for k, seq in tasks]
+
+
+# ---------------------------------------------------------------------------
+#  STATISTICS
+# ---------------------------------------------------------------------------
+
+def _percentiles(values, bands=BANDS) -> dict:
+    """{"mean", "std", "p5", "p50", "p95"} of the finite values (None if there are none)."""
+    v = np.asarray([x for x in values if x is not None], dtype=float)
+    v = v[np.isfinite(v)]
+    if not len(v):
+        return None
+    out = {"mean": round(float(v.mean()), 3), "std": round(float(v.std(ddof=1)) if len(v) > 1 else 0.0, 3)}
+    for b, p in zip(bands, np.percentile(v, bands)):
+        out[f"p{b}"] = round(float(p), 3)
+    return out
+
+
+def _mean_ci(values, z: float = 1.96) -> list:
+    """Normal-approximation confidence interval of the mean."""
+    v = np.asarray([x for x in values if x is not None], dtype=float)
+    if len(v) < 2:
+        return None
+    half = z * v.std(ddof=1) / np.sqrt(len(v))
+    return [round(float(v.mean() - half), 3), round(float(v.mean() + half), 3)]
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> list:
+    """Wilson score interval of a proportion."""
+    if n == 0:
+        return None
+    p = successes / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return [round(float(max(centre - half, 0.0)), 4), round(float(min(centre + half, 1.0)), 4)]
+
+
+def summarize_replicas(replicas: list, target_laps: int, wear_limit_pct: float = 80.0,
+                       bands=BANDS) -> list:
+    """
+    Aggregate replica results per car.
+
+    Parameters
+    ----------
+    replicas : list[list[dict]]
+        run_replica() results (one list of per-car rows per replica).
+    target_laps : int
+        Laps of the stint (sizes the per-lap bands).
+    wear_limit_pct : float
+        Tire wear at the flag above which a run counts as a failure.
+
+    Returns
+    -------
+    list[dict] — one summary per car, in grid order.
+    """
+    if not replicas:
+        return []
+    n_rep = len(replicas)
+    summaries = []
+    for car in range(len(replicas[0])):
+        rows = [rep[car] for rep in replicas]
+        finished = [r["finish_time_s"] is not None for r in rows]
+        dnf = n_rep - sum(finished)
+        fuel_out = sum(r["fuel_kg"] <= 0.0 for r in rows)
+        tire_out = sum(r["tire_wear_pct"] > wear_limit_pct for r in rows)
+        failed = sum(
+            (r["finish_time_s"] is None) or r["fuel_kg"] <= 0.0 or r["tire_wear_pct"] > wear_limit_pct
+            for r in rows
+        )
+
+        lap_bands = []
+        for lap in range(target_laps):
+            lap_times = [r["lap_times_s"][lap] for r in rows if len(r["lap_times_s"]) > lap]
+            band = _percentiles(lap_times, bands)
+            if band is not None:
+                lap_bands.append({"lap": lap + 1, "n": len(lap_times),
+                                  **{k: v for k, v in band.items() if k.startswith("p")}})
+
+        race_times = [r["finish_time_s"] for r in rows if r["finish_time_s"] is not None]
+        race_time = _percentiles(race_times, bands)
+        if race_time is not None:
+            race_time["ci95"] = _mean_ci(race_times)
+
+        summary = {
+            "car": car,
+            "driver_id": rows[0]["driver_id"],
+            "replicas": n_rep,
+            "finish_rate": round(sum(finished) / n_rep, 4),
+            "failure_rate": round(failed / n_rep, 4),
+            "failure_ci95": wilson_interval(failed, n_rep),
+            "failures": {"dnf": dnf, "fuel": fuel_out, "tire": tire_out},
+            "lap_time_s": _percentiles([lt for r in rows for lt in r["lap_times_s"]], bands),
+            "lap_bands": lap_bands,
+            "race_time_s": race_time,
+            "fuel_used_kg": _percentiles([r["fuel_used_kg"] for r in rows], bands),
+            "tire_wear_pct": _percentiles([r["tire_wear_pct"] for r in rows], bands),
+        }
+        if len(replicas[0]) > 1:
+            positions = [r["position"] for r in rows]
+            summary["position"] = _percentiles(positions, bands)
+            summary["position"]["win_rate"] = round(sum(p == 1 for p in positions) / n_rep, 4)
+        summaries.append(summary)
+    return summaries
+
+
+# ---------------------------------------------------------------------------
+#  ENGINE
+# ---------------------------------------------------------------------------
+
+def run_monte_carlo(
+    track: list,
+    car_cfg: dict,
+    sensor_cfg: dict,
+    entries: list,
+    replicas: int = 100,
+    target_laps: int = 5,
+    dt: float = 0.1,
+    seed: int = None,
+    n_jobs: int = 1,
+    chunk_size: int = None,
+    max_sim_time: float = None,
+    wear_limit_pct: float = 80.0,
+    progress=None,
+) -> dict:
+    """
+    Run `replicas` seeded races across a process pool and aggregate them.
+
+    Parameters
+    ----------
+    track : list[(x, y)]
+        Closed-loop waypoints.
+    car_cfg, sensor_cfg : dict
+        Contents of car_simple.yaml / sensors.yaml.
+    entries : list[(driver_id, driver)]
+        As for run_race(); one entry simulates a single-car stint.
+    replicas : int
+        Number of replicas (K).
+    target_laps : int
+        Laps per replica.
+    dt : float
+        Simulation timestep (s).
+    seed : int, optional
+        Root seed. If None, fresh entropy is drawn and recorded in the report.
+    n_jobs : int
+        Worker processes (1 = run in this process).
+    chunk_size : int, optional
+        Replicas per task (default: spread evenly, ~4 tasks per worker).
+    max_sim_time : float, optional
+        Per-replica cap on simulated seconds; cars still running are DNF.
+    wear_limit_pct : float
+        Tire wear at the flag counted as a failure.
+    progress : callable, optional
+        progress(n_done, n_total) after every chunk.
+
+    Returns
+    -------
+    dict — {"seed", "replicas", "target_laps", "wall_time_s", "replicas_per_s",
+            "cars": summarize_replicas(...)}
+    """
+    root = np.random.SeedSequence(seed)
+    tasks = list(enumerate(root.spawn(replicas)))
+    if chunk_size is None:
+        chunk_size = max(1, -(-replicas // (max(n_jobs, 1) * 4)))
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    results = [None] * replicas
+    n_done = 0
+    start = time.perf_counter()
+
+    def _collect(done):
+        nonlocal n_done
+        for k, rows in done:
+            results[k] = rows
+        n_done += len(done)
+        if progress:
+            progress(n_done, replicas)
+
+    if n_jobs <= 1 or len(chunks) <= 1:
+        _init_worker(track, car_cfg, sensor_cfg, entries, dt, target_laps, max_sim_time)
+        for chunk in chunks:
+            _collect(_run_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(track, car_cfg, sensor_cfg, entries, dt,
+                                           target_laps, max_sim_time)) as pool:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+            for fut in as_completed(futures):
+                _collect(fut.result())
+
+    wall = time.perf_counter() - start
+    return {
+        "seed": root.entropy,
+        "replicas": replicas,
+        "target_laps": target_laps,
+        "dt": dt,
+        "n_jobs": n_jobs,
+        "wall_time_s": round(wall, 3),
+        "replicas_per_s": round(replicas / wall, 2) if wall > 0 else float("inf"),
+        "cars": summarize_replicas(results, target_laps, wear_limit_pct=wear_limit_pct),
+    }
+
+
+# ---------------------------------------------------------------------------
+#  CLI
+# ---------------------------------------------------------------------------
+
+def _resolve(path: str, default: str) -> str:
+    if path is None:
+        return default
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Monte Carlo race outcomes over seeded replicas")
+    parser.add_argument("--replicas", type=int, default=200)
+    parser.add_argument("--target-laps", type=int, default=5)
+    parser.add_argument("--driver-ids", type=str, nargs="+", default=["driver_fast"],
+                        help="DriverProfile or AdaptiveDriver ids (one = a single-car stint)")
+    parser.add_argument("--cars", type=int, default=None,
+                        help="Cars per replica, drivers assigned round-robin (default: one per driver id)")
+    parser.add_argument("--track", type=str, default=None,
+                        help="Track CSV filename inside the track dir (default: oval)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--max-sim-time", type=float, default=None,
+                        help="Cap on simulated seconds per replica (cars still running are DNF)")
+    parser.add_argument("--wear-limit", type=float, default=80.0,
+                        help="Tire wear (%%) at the flag counted as a failure")
+    parser.add_argument("--out", type=str, default=None,
+                        help="Report JSON (default: data/monte_carlo/mc_<timestamp>.json)")
+    parser.add_argument("--track-dir", type=str, default=None)
+    args = parser.parse_args()
+
+    track_dir = _resolve(args.track_dir, os.path.join(DATA_DIR, "tracks"))
+    sim_cfg = load_yaml(os.path.join(ROOT, "configs", "simulation.yaml"))
+    car_cfg = load_yaml(os.path.join(ROOT, "configs", "car_simple.yaml"))
+    sensor_cfg = load_yaml(os.path.join(ROOT, "configs", "sensors.yaml"))
+    dt = sim_cfg.get("dt", 0.1)
+
+    if args.track:
+        track_path = os.path.join(track_dir, args.track)
+        if os.path.exists(track_path):
+            print(f"📌 Loading track: {track_path}")
+            track = load_track_csv(track_path)
+        else:
+            print(f"⚠ Track not found: {track_path}, falling back to oval")
+            track = generate_oval_track()
+    else:
+        track = generate_oval_track()
+
+    entries = load_race_entries(args.driver_ids, args.cars or len(args.driver_ids))
+    out = _resolve(args.out, os.path.join(
+        MC_DIR, f"mc_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+
+    print(f"🎲 {args.replicas} replicas × {len(entries)} car(s) × {args.target_laps} laps, "
+          f"{args.n_jobs} process(es)…")
+    t0 = time.perf_counter()
+
+    def _progress(n_done, n_total):
+        print(f"\r  {n_done}/{n_total} replicas ({time.perf_counter() - t0:.1f}s)", end="", flush=True)
+
+    report = run_monte_carlo(track, car_cfg, sensor_cfg, entries, replicas=args.replicas,
+                             target_laps=args.target_laps, dt=dt, seed=args.seed,
+                             n_jobs=args.n_jobs, chunk_size=args.chunk_size,
+                             max_sim_time=args.max_sim_time, wear_limit_pct=args.wear_limit,
+                             progress=_progress)
+    print()
+
+    print("\n Car  Driver               Lap p50 (p5–p95) s     Race time mean [95% CI] s   "
+          "Fuel p50 kg  Wear p50 %  Fail % [95% CI]" + ("   Win %" if len(entries) > 1 else ""))
+    for c in report["cars"]:
+        lap = c["lap_time_s"]
+        race = c["race_time_s"]
+        lap_s = f"{lap['p50']:6.2f} ({lap['p5']:.2f}–{lap['p95']:.2f})" if lap else "     -"
+        race_s = (f"{race['mean']:8.2f} [{race['ci95'][0]:.2f}, {race['ci95'][1]:.2f}]"
+                  if race and race["ci95"] else "       -")
+        ci = c["failure_ci95"]
+        line = (f" {c['car']:>3}  {c['driver_id']:<20} {lap_s:<22} {race_s:<27} "
+                f"{c['fuel_used_kg']['p50']:>10.2f}  {c['tire_wear_pct']['p50']:>9.1f}  "
+                f"{c['failure_rate'] * 100:5.1f} [{ci[0] * 100:.1f}, {ci[1] * 100:.1f}]")
+        if "position" in c:
+            line += f"   {c['position']['win_rate'] * 100:5.1f}"
+        print(line)
+
+    atomic_write(out, report)
+    print(f"\n✅ {report['replicas']} replicas in {report['wall_time_s']:.1f}s "
+          f"({report['replicas_per_s']:.1f} replicas/s), seed {report['seed']} → {out}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -83,18 +83,20 @@ class AeroModel:
             m * v^2 / r = mu * (m * g + 0.5 * rho * Cl * A * v^2)
             v^2 * (m/r - 0.5 * mu * rho * Cl * A) = mu * m * g
             v = sqrt(mu * m * g / (m/r - 0.5 * mu * rho * Cl * A))
-        """
-        if radius <= 0 or mu <= 0:
-            return 0.0
-
-        term = mass_kg / radius - 0.5 * mu * self._rho * self.downforce_coeff * self._A
-        if term <= 0:
-            return float("inf")
 
-        v_sq = mu * mass_kg * 9.81 / term
-        if v_sq <= 0:
-            return 0.0
-        return np.sqrt(v_sq)
+        `radius` may be an array (e.g. one radius per track station); the
+        result then has the same shape. Straights (radius = inf) and
+        radii where downforce outgrows the centripetal demand give inf.
+        """
+        r = np.asarray(radius, dtype=float)
+        if mu <= 0:
+            v = np.zeros_like(r)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                term = mass_kg / r - 0.5 * mu * self._rho * self.downforce_coeff * self._A
+                v = np.where(term > 0, np.sqrt(np.maximum(mu * mass_kg * 9.81 / term, 0.0)), np.inf)
+            v = np.where(r > 0, v, 0.0)
+        return float(v) if v.ndim == 0 else v
 
     def get_state(self) -> dict:
         return {
@@ -1,4 +1,6 @@
 # simulator/physics/simple/dynamics.py
+import numpy as np
+
 from .vehicle_model import CAR
 
 def compute_drag(v_ms, aero_model=None):
@@ -19,6 +21,30 @@ def compute_downforce(v_ms, aero_model=None):
         return aero_model.compute_downforce(v_ms)
     return 0.0
 
+def update_speed_batch(v_ms, throttle, brake, dt=0.1, mass=None, aero_model=None, car=None):
+    """
+    Array form of update_speed — advances N cars in one call.
+
+    v_ms, throttle, brake, mass: scalars or arrays of shape (N,)
+    car: optional parameter dict (defaults to CAR); values may be
+         per-car arrays, e.g. max_engine_force for a setup sweep
+    returns new v_ms as an array
+    """
+    p = CAR if car is None else car
+    m = mass if mass is not None else p["mass"]
+
+    engine_force = p["max_engine_force"] * throttle
+    brake_force = p["max_brake_force"] * brake
+    if aero_model is not None:
+        drag = aero_model.compute_drag(v_ms)
+    else:
+        drag = 0.5 * p["air_density"] * p["drag_coeff"] * p["frontal_area"] * (v_ms ** 2)
+    roll = p["rolling_resistance"] * m * 9.81
+
+    net_F = engine_force - brake_force - drag - roll
+    a = net_F / m
+    return np.maximum(0.0, v_ms + a * dt)
+
 def update_speed(v_ms, throttle, brake, dt=0.1, mass=None, aero_model=None):
     """
     v_ms: speed in m/s
@@ -27,15 +53,7 @@ def update_speed(v_ms, throttle, brake, dt=0.1, mass=None, aero_model=None):
     mass: vehicle mass (kg) — varies with fuel load
     aero_model: optional AeroModel for downforce-inclusive drag
     returns new v_ms
-    """
-    m = mass if mass is not None else CAR["mass"]
 
-    engine_force = CAR["max_engine_force"] * throttle
-    brake_force = CAR["max_brake_force"] * brake
-    drag = compute_drag(v_ms, aero_model)
-    roll = compute_rolling_resistance(mass=m)
-
-    net_F = engine_force - brake_force - drag - roll
-    a = net_F / m
-    v_new = max(0.0, v_ms + a * dt)
-    return v_new
+    Thin scalar wrapper around update_speed_batch.
+    """
+    return float(update_speed_batch(v_ms, throttle, brake, dt, mass=mass, aero_model=aero_model))
@@ -10,6 +10,20 @@ Fuel mass decreases over laps, improving performance.
 import numpy as np
 
 
+def consume_fuel(fuel_mass, throttle, dt, consumption_rate):
+    """
+    Array form of FuelModel.step — fuel_mass / throttle / consumption_rate
+    may be scalars or arrays of shape (N,).
+
+    Returns
+    -------
+    tuple — (new_fuel_mass, consumed_kg)
+    """
+    flow = consumption_rate * throttle * dt
+    consumed = np.minimum(flow, fuel_mass)
+    return np.maximum(0.0, fuel_mass - consumed), consumed
+
+
 class FuelModel:
     def __init__(
         self,
@@ -38,11 +52,9 @@ class FuelModel:
 
         fuel_flow = consumption_rate * throttle * dt
         """
-        flow = self.consumption_rate * throttle * dt
-        consumed = min(flow, self.fuel_mass)
-        self.fuel_mass -= consumed
-        self.total_consumed_kg += consumed
-        self.fuel_mass = max(0.0, self.fuel_mass)
+        fuel_mass, consumed = consume_fuel(self.fuel_mass, throttle, dt, self.consumption_rate)
+        self.fuel_mass = float(fuel_mass)
+        self.total_consumed_kg += float(consumed)
 
     @property
     def fuel_load_kg(self) -> float:
@@ -1,37 +1,185 @@
 # simulator/physics/simple/gps_simulator.py
+"""
+Track following: distance travelled → (x, y), waypoint index and lap.
 
-import numpy as np
+TrackPath precomputes the cumulative distance along the closed loop of
+waypoints once. A position is then one searchsorted() into that array
+plus a linear interpolation, for any number of cars at once. Laps come
+from the distance wrapping past the track length, so there is no walk
+over the segments and no distance-to-start check per step.
+
+  - TrackPath   geometry + locate(s) for arrays of along-track distances
+  - GPSBatch    N cars on one track, advanced with one advance(d[]) call
+  - GPSMock     the single-car interface used by the runners
+
+Lap convention (unchanged): `lap` counts start-line crossings including
+the start itself. It is 1 during the first lap, 2 during the second, and
+so on. `laps_completed` is `lap - 1`.
+
+Usage:
+    gps = GPSMock(track)
+    (x, y), idx, lap = gps.advance(v_ms * dt)
+
+    field = GPSBatch(track, n_cars=20)
+    xy, idx, lap = field.advance(v_ms_array * dt)     # (20, 2), (20,), (20,)
+"""
+
+import bisect
 import math
 
+import numpy as np
+
+
+class TrackPath:
+    """Closed loop of (x, y) waypoints with precomputed cumulative distance."""
+
+    def __init__(self, track_points):
+        self.points = np.array(track_points, dtype=float).reshape(-1, 2)
+        self.N = len(self.points)
+
+        if self.N > 1:
+            delta = np.roll(self.points, -1, axis=0) - self.points    # segment i: point i → i+1 (wraps)
+            self.seg_len = np.hypot(delta[:, 0], delta[:, 1])
+        else:
+            delta = np.zeros((self.N, 2))
+            self.seg_len = np.zeros(self.N)
+        self.delta = delta
+        # cum[i] = distance from the start to waypoint i; cum[N] = track length
+        self.cum = np.concatenate([[0.0], np.cumsum(self.seg_len)])
+        self.length = float(self.cum[-1])
+        # Plain-list copies for the scalar path (bisect beats NumPy on one value).
+        self._cum = self.cum.tolist()
+        self._points = self.points.tolist()
+        self._delta = self.delta.tolist()
+        self._seg_len = self.seg_len.tolist()
+
+    def locate(self, s) -> tuple:
+        """
+        Positions at along-track distances `s` (wrapped into one lap).
+
+        Parameters
+        ----------
+        s : float or np.ndarray
+            Distance from the start line (m).
+
+        Returns
+        -------
+        tuple (x, y, index) of arrays shaped like `s`; index is the
+        waypoint at the start of the segment the position lies on.
+        """
+        s = np.asarray(s, dtype=float)
+        if self.length <= 0:
+            zero = np.zeros(s.shape, dtype=np.intp)
+            p = self.points[0] if self.N else np.zeros(2)
+            return np.full(s.shape, p[0]), np.full(s.shape, p[1]), zero
+
+        s = np.mod(s, self.length)
+        # side="right" skips zero-length segments and puts a position exactly
+        # on a waypoint at the start of the following segment.
+        idx = np.searchsorted(self.cum, s, side="right") - 1
+        idx = np.clip(idx, 0, self.N - 1)
+        seg = self.seg_len[idx]
+        frac = np.divide(s - self.cum[idx], seg, out=np.zeros_like(s), where=seg > 0)
+        x = self.points[idx, 0] + frac * self.delta[idx, 0]
+        y = self.points[idx, 1] + frac * self.delta[idx, 1]
+        return x, y, idx
+
+    def locate_one(self, s: float) -> tuple:
+        """locate() for a single distance: (x, y, index) as Python scalars."""
+        if self.length <= 0:
+            x, y = self._points[0] if self.N else (0.0, 0.0)
+            return x, y, 0
+        s = math.fmod(s, self.length)
+        if s < 0:
+            s += self.length
+        idx = min(max(bisect.bisect_right(self._cum, s) - 1, 0), self.N - 1)
+        seg = self._seg_len[idx]
+        frac = (s - self._cum[idx]) / seg if seg > 0 else 0.0
+        (px, py), (dx, dy) = self._points[idx], self._delta[idx]
+        return px + frac * dx, py + frac * dy, idx
+
+
+class GPSBatch:
+    """
+    N cars following one track.
+
+    Parameters
+    ----------
+    track_points : list[(x, y)] or TrackPath
+        Closed-loop waypoints.
+    n_cars : int
+        Number of cars, all starting on the start line.
+    """
+
+    def __init__(self, track_points, n_cars: int = 1):
+        self.path = track_points if isinstance(track_points, TrackPath) else TrackPath(track_points)
+        self.n = int(n_cars)
+        self.distance = np.zeros(self.n)            # total distance travelled (m)
+        self.index = np.zeros(self.n, dtype=np.intp)
+        self.lap = np.zeros(self.n, dtype=np.int64)
+        self.xy = np.repeat(self.path.points[:1], self.n, axis=0) if self.path.N else np.zeros((self.n, 2))
+
+    @property
+    def laps_completed(self) -> np.ndarray:
+        if self.path.length <= 0:
+            return np.zeros(self.n, dtype=np.int64)
+        return np.floor_divide(self.distance, self.path.length).astype(np.int64)
+
+    @property
+    def lap_progress(self) -> np.ndarray:
+        """Fraction of the current lap covered (0..1)."""
+        if self.path.length <= 0:
+            return np.zeros(self.n)
+        return np.mod(self.distance, self.path.length) / self.path.length
+
+    def advance(self, d) -> tuple:
+        """
+        Move every car along the track.
+
+        Parameters
+        ----------
+        d : float or np.ndarray of shape (n_cars,)
+            Distance travelled this step (m, >= 0).
+
+        Returns
+        -------
+        tuple (xy (n, 2), track_index (n,), lap (n,))
+        """
+        self.distance = self.distance + np.asarray(d, dtype=float)
+        x, y, self.index = self.path.locate(self.distance)
+        self.xy = np.column_stack([x, y])
+        moved = self.distance > 0
+        self.lap = np.where(moved, self.laps_completed + 1, 0)
+        return self.xy, self.index, self.lap
+
 
 class GPSMock:
     """
-    Simple GPS simulator that moves along a list of (x, y) points.
+    Single-car GPS along a list of (x, y) points.
 
     Guarantees:
-    - Proper track index wrap: index = (index + 1) % len(track)
-    - Lap counting increases only when we pass near the start line
-    - Prevents double-counting by using a "cooldown" flag
+    - Track index wraps at the end of the loop
+    - A lap is counted when the distance travelled wraps past the track length
+    - `lap` becomes 1 on the first move (the start line counts)
     """
 
     def __init__(self, track_points, lap_threshold=2.0):
         """
         Args:
             track_points: list of (x, y) waypoints forming a loop
-            lap_threshold: meters from start point to count a lap
+            lap_threshold: unused, kept for compatibility (laps are
+                           counted by distance)
         """
-        self.track = np.array(track_points, dtype=float)
-        self.N = len(self.track)
+        self.path = TrackPath(track_points)
+        self.track = self.path.points
+        self.N = self.path.N
+        self.start_point = self.track[0] if self.N else None
+        self.lap_threshold = lap_threshold
 
+        self.distance = 0.0         # total distance travelled (m)
         self.index = 0
         self.lap = 0
 
-        self.start_point = self.track[0]
-        self.lap_threshold = lap_threshold
-
-        # Used to avoid counting many laps while inside threshold
-        self.passed_start_cooldown = False
-
     # --------------------------------------------------------------
     # Move forward along track by distance "d"
     # --------------------------------------------------------------
@@ -42,48 +190,12 @@ class GPSMock:
         Returns:
             (x, y)      : GPS coordinates
             track_index : int
-            lap         : number of completed laps
+            lap         : lap counter (see module docstring)
         """
-        if self.N < 2:
-            return (self.track[self.index], self.index, self.lap)
-
-        remaining = d
-
-        while remaining > 0:
-            p1 = self.track[self.index]
-            p2 = self.track[(self.index + 1) % self.N]
-
-            seg_len = np.linalg.norm(p2 - p1)
-
-            if seg_len < 1e-6:
-                self.index = (self.index + 1) % self.N
-                continue
-
-            if remaining < seg_len:
-                # Interpolate within the segment
-                t = remaining / seg_len
-                x = p1[0] + t * (p2[0] - p1[0])
-                y = p1[1] + t * (p2[1] - p1[1])
-                remaining = 0
-            else:
-                # Move to next segment
-                remaining -= seg_len
-                self.index = (self.index + 1) % self.N
-                x, y = p2[0], p2[1]
-
-            # -----------------------------------------
-            # L A P   D E T E C T I O N
-            # -----------------------------------------
-            dist_to_start = math.dist((x, y), self.start_point)
-
-            if dist_to_start < self.lap_threshold:
-                if not self.passed_start_cooldown:
-                    self.lap += 1
-                    self.passed_start_cooldown = True
-            else:
-                # Reset when far enough from start line
-                self.passed_start_cooldown = False
-
+        self.distance += float(d)
+        x, y, self.index = self.path.locate_one(self.distance)
+        if self.distance > 0:
+            self.lap = int(self.distance // self.path.length) + 1 if self.path.length > 0 else 1
         return (x, y), self.index, self.lap
 
 
@@ -1,13 +1,18 @@
 # simulator/physics/simple/steering_yaw.py
 
+import numpy as np
+
+
 def compute_yaw_rate(steering, speed_kmh):
     """
     steering: -1..1
     speed_kmh: speed
     returns yaw rate in deg/s (signed)
+
+    Both inputs may also be arrays (one value per car).
     """
     base_sensitivity = 30.0   # deg/s at reference speed
     ref_speed = 40.0
-    sensitivity = base_sensitivity / max(speed_kmh / ref_speed, 1.0)
+    sensitivity = base_sensitivity / np.maximum(np.divide(speed_kmh, ref_speed), 1.0)
     yaw = steering * sensitivity
     return yaw
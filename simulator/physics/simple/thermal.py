@@ -7,9 +7,12 @@ def update_coolant_temp(temp_c, throttle, speed_kmh, dt=0.1,
       - heat generation ~ throttle
       - speed adds to heat (e.g., accessory load/friction)
       - cooling proportional to speed (airflow)
+
+    Pure arithmetic, so temp_c / throttle / speed_kmh may also be
+    NumPy arrays (one entry per car) — see VehicleBatch.
     """
     heat_gen = throttle * heat_coeff
     speed_heat = speed_kmh * speed_heat_factor
     cooling = cooling_coeff * (speed_kmh / 40.0)  # normalized
-    temp_c += (heat_gen + speed_heat - cooling) * dt * 10.0
+    temp_c = temp_c + (heat_gen + speed_heat - cooling) * dt * 10.0
     return temp_c
@@ -23,6 +23,57 @@ COMPOUNDS = {
 }
 
 
+def tire_grip(wear, surface_temp, base_grip, grip_drop_per_wear, opt_temp, temp_window):
+    """
+    Grip multiplier for one or many tires (array-friendly).
+
+    Grip falls linearly with wear and falls off outside the compound's
+    optimal temperature window (floored at 0.6).
+    """
+    wear_factor = 1.0 - grip_drop_per_wear * wear
+    diff = np.abs(surface_temp - opt_temp)
+    falloff = np.maximum(diff - temp_window, 0.0) / 40.0
+    temp_factor = np.maximum(0.6, 1.0 - falloff)
+    return base_grip * wear_factor * temp_factor
+
+
+def advance_tire_state(
+    wear, surface_temp, core_temp,
+    speed_kmh, throttle, brake, lateral_accel, dt,
+    wear_rate, ambient_temp,
+):
+    """
+    Array form of TireModel.step — every argument may be a scalar or an
+    array of shape (N,).
+
+    Returns
+    -------
+    tuple — (wear, surface_temp, core_temp, distance_km, graining, blistering)
+    """
+    distance_km = speed_kmh * dt / 3600.0
+
+    # --- Wear accumulation ---
+    slip_factor = np.abs(throttle) + np.abs(brake) + np.abs(lateral_accel) / 10.0
+    wear = np.clip(wear + wear_rate * distance_km * (1.0 + slip_factor), 0.0, 1.0)
+
+    # --- Surface temperature ---
+    friction_heat = slip_factor * speed_kmh * 0.01
+    ambient_cooling = (ambient_temp - surface_temp) * 0.02
+    conduction_to_core = (core_temp - surface_temp) * 0.05
+    surface_temp = surface_temp + (friction_heat + ambient_cooling + conduction_to_core) * dt * 10
+    surface_temp = np.clip(surface_temp, ambient_temp - 5, 140.0)
+
+    # --- Core temperature ---
+    conduction_from_surface = (surface_temp - core_temp) * 0.02
+    core_temp = np.clip(core_temp + conduction_from_surface * dt * 10, ambient_temp - 5, 120.0)
+
+    # --- Graining (large surface/core delta) / blistering (very hot surface) ---
+    graining = np.abs(surface_temp - core_temp) > 30.0
+    blistering = surface_temp > 120.0
+
+    return wear, surface_temp, core_temp, distance_km, graining, blistering
+
+
 class TireModel:
     def __init__(
         self,
@@ -50,20 +101,11 @@ class TireModel:
     @property
     def grip_coefficient(self) -> float:
         """Current grip multiplier (1.0 = nominal)."""
-        base = self.compound_data["base_grip"]
-        wear_factor = 1.0 - self.grip_drop_per_wear * self.wear
-        temp_factor = self._temperature_grip_factor()
-        return base * wear_factor * temp_factor
-
-    def _temperature_grip_factor(self) -> float:
-        """Grip falls off when outside optimal temperature window."""
-        opt = self.compound_data["opt_temp"]
-        window = self.compound_data["temp_window"]
-        diff = abs(self.surface_temp - opt)
-        if diff <= window:
-            return 1.0
-        falloff = (diff - window) / 40.0
-        return max(0.6, 1.0 - falloff)
+        return float(tire_grip(
+            self.wear, self.surface_temp,
+            self.compound_data["base_grip"], self.grip_drop_per_wear,
+            self.compound_data["opt_temp"], self.compound_data["temp_window"],
+        ))
 
     def step(
         self,
@@ -82,32 +124,17 @@ class TireModel:
           - Core temperature from surface conduction
           - Graining / blistering flags
         """
-        distance_km = speed_kmh * dt / 3600.0
-        self.total_distance_km += distance_km
-
-        # --- Wear accumulation ---
-        slip_factor = (abs(throttle) + abs(brake) + abs(lateral_accel) / 10.0)
-        wear_increment = self.compound_data["wear_rate"] * distance_km * (1.0 + slip_factor)
-        self.wear = np.clip(self.wear + wear_increment, 0.0, 1.0)
-
-        # --- Surface temperature ---
-        friction_heat = slip_factor * speed_kmh * 0.01
-        ambient_cooling = (self.ambient_temp - self.surface_temp) * 0.02
-        conduction_to_core = (self.core_temp - self.surface_temp) * 0.05
-        self.surface_temp += (friction_heat + ambient_cooling + conduction_to_core) * dt * 10
-        self.surface_temp = np.clip(self.surface_temp, self.ambient_temp - 5, 140.0)
-
-        # --- Core temperature ---
-        conduction_from_surface = (self.surface_temp - self.core_temp) * 0.02
-        self.core_temp += conduction_from_surface * dt * 10
-        self.core_temp = np.clip(self.core_temp, self.ambient_temp - 5, 120.0)
-
-        # --- Graining (large temp delta between surface and core) ---
-        temp_delta = abs(self.surface_temp - self.core_temp)
-        self.graining = temp_delta > 30.0
-
-        # --- Blistering (very high surface temp) ---
-        self.blistering = self.surface_temp > 120.0
+        wear, surface, core, distance_km, graining, blistering = advance_tire_state(
+            self.wear, self.surface_temp, self.core_temp,
+            speed_kmh, throttle, brake, lateral_accel, dt,
+            self.compound_data["wear_rate"], self.ambient_temp,
+        )
+        self.wear = float(wear)
+        self.surface_temp = float(surface)
+        self.core_temp = float(core)
+        self.total_distance_km += float(distance_km)
+        self.graining = bool(graining)
+        self.blistering = bool(blistering)
 
     def reset(self, compound: str = None, initial_wear: float = 0.0):
         """Reset tire state (e.g., for a new set of tires)."""
@@ -0,0 +1,287 @@
+"""
+Vectorised multi-car vehicle state.
+
+VehicleBatch holds N cars as structure-of-arrays NumPy buffers
+(speed, coolant, tire wear/temps, fuel mass) and advances all of them
+with a single step(throttle[], brake[], dt) call.
+
+It runs the same array kernels that the scalar models wrap:
+  - dynamics.update_speed_batch      (update_speed)
+  - thermal.update_coolant_temp      (already array-safe)
+  - tire_model.advance_tire_state    (TireModel.step)
+  - fuel_model.consume_fuel          (FuelModel.step)
+
+Every entry of car_params may be a scalar or a length-N sequence, so a
+single batch can hold N setup variants (mass, engine force, drag,
+downforce, compound, fuel load, ...).
+
+Usage:
+    import numpy as np
+    from simulator.physics.simple.vehicle_batch import VehicleBatch
+
+    batch = VehicleBatch(1000, car_params={"max_engine_force": np.linspace(5000, 7000, 1000)})
+    for _ in range(250):
+        batch.step(throttle=0.8, brake=0.0, dt=0.1)
+    print(batch.speed_kmh.max())
+"""
+
+import numpy as np
+
+from .vehicle_model import CAR
+from .dynamics import update_speed_batch
+from .thermal import update_coolant_temp
+from .tire_model import COMPOUNDS, advance_tire_state, tire_grip
+from .fuel_model import consume_fuel
+
+# Numeric car parameters that may vary per car.
+PARAM_KEYS = (
+    "mass",
+    "drag_coeff",
+    "frontal_area",
+    "air_density",
+    "rolling_resistance",
+    "max_engine_force",
+    "max_brake_force",
+    "downforce_coeff",
+)
+
+
+def _per_car(value, n: int, name: str) -> np.ndarray:
+    """Broadcast a scalar or length-n sequence to a float array of shape (n,)."""
+    arr = np.asarray(value, dtype=float)
+    if arr.ndim == 0:
+        return np.full(n, float(arr))
+    if arr.shape != (n,):
+        raise ValueError(f"{name}: expected a scalar or {n} values, got shape {arr.shape}")
+    return arr.copy()
+
+
+class VehicleBatch:
+    def __init__(
+        self,
+        n_cars: int,
+        car_params: dict = None,
+        ambient_temp: float = 25.0,
+        grip_drop_per_wear: float = 0.6,
+        initial_tire_temp: float = 40.0,
+    ):
+        """
+        Parameters
+        ----------
+        n_cars : int
+            Number of cars advanced in lockstep.
+        car_params : dict, optional
+            car_simple.yaml-style dict. Missing keys fall back to CAR.
+            Values may be scalars or sequences of length n_cars;
+            "tire_compound" may be a string or a list of strings.
+        ambient_temp : float
+            Ambient temperature for the tire model (°C).
+        grip_drop_per_wear : float
+            Grip lost per unit of wear (as in TireModel).
+        initial_tire_temp : float
+            Starting surface and core tire temperature (°C).
+        """
+        if n_cars < 1:
+            raise ValueError("n_cars must be >= 1")
+
+        n = int(n_cars)
+        cfg = dict(CAR)
+        cfg.update(car_params or {})
+
+        self.n = n
+        self.params = {k: _per_car(cfg[k], n, k) for k in PARAM_KEYS}
+
+        # --- Tire compound data per car ---
+        compounds = cfg.get("tire_compound", "medium")
+        if isinstance(compounds, str):
+            compounds = [compounds] * n
+        if len(compounds) != n:
+            raise ValueError(f"tire_compound: expected 1 or {n} compounds, got {len(compounds)}")
+        for c in compounds:
+            if c not in COMPOUNDS:
+                raise ValueError(f"Unknown compound: {c}. Choose from {list(COMPOUNDS.keys())}")
+        self.compounds = list(compounds)
+        self._base_grip = np.array([COMPOUNDS[c]["base_grip"] for c in compounds])
+        self._wear_rate = np.array([COMPOUNDS[c]["wear_rate"] for c in compounds])
+        self._opt_temp = np.array([COMPOUNDS[c]["opt_temp"] for c in compounds], dtype=float)
+        self._temp_window = np.array([COMPOUNDS[c]["temp_window"] for c in compounds], dtype=float)
+        self.ambient_temp = ambient_temp
+        self.grip_drop_per_wear = grip_drop_per_wear
+
+        # --- State buffers ---
+        self.speed_ms = np.zeros(n)
+        self.coolant_temp = _per_car(cfg.get("initial_coolant_temp", 60.0), n, "initial_coolant_temp")
+
+        self.tire_wear = np.clip(_per_car(cfg.get("tire_initial_wear", 0.0), n, "tire_initial_wear"), 0.0, 1.0)
+        self.tire_surface_temp = np.full(n, float(initial_tire_temp))
+        self.tire_core_temp = np.full(n, float(initial_tire_temp))
+        self.tire_distance_km = np.zeros(n)
+        self.tire_graining = np.zeros(n, dtype=bool)
+        self.tire_blistering = np.zeros(n, dtype=bool)
+
+        self.fuel_capacity_kg = _per_car(cfg.get("fuel_capacity_kg", 100.0), n, "fuel_capacity_kg")
+        self.fuel_consumption_rate = _per_car(cfg.get("fuel_consumption_rate", 0.5), n, "fuel_consumption_rate")
+        self.fuel_mass = np.clip(
+            _per_car(cfg.get("fuel_initial_kg", 80.0), n, "fuel_initial_kg"), 0.0, self.fuel_capacity_kg
+        )
+        self.fuel_consumed_kg = np.zeros(n)
+
+        self.aero_grip_multiplier = np.ones(n)
+
+    # ------------------------------------------------------------------
+    #  DERIVED CHANNELS
+    # ------------------------------------------------------------------
+
+    @property
+    def speed_kmh(self) -> np.ndarray:
+        return self.speed_ms * 3.6
+
+    @property
+    def total_mass(self) -> np.ndarray:
+        """Chassis mass + current fuel load (kg)."""
+        return self.params["mass"] + self.fuel_mass
+
+    @property
+    def fuel_pct(self) -> np.ndarray:
+        return self.fuel_mass / self.fuel_capacity_kg * 100.0
+
+    @property
+    def tire_grip(self) -> np.ndarray:
+        """Current grip multiplier per car (1.0 = nominal)."""
+        return tire_grip(
+            self.tire_wear, self.tire_surface_temp,
+            self._base_grip, self.grip_drop_per_wear,
+            self._opt_temp, self._temp_window,
+        )
+
+    def _as_input(self, value, name: str) -> np.ndarray:
+        arr = np.asarray(value, dtype=float)
+        if arr.ndim == 0 or arr.shape == (self.n,):
+            return np.broadcast_to(arr, (self.n,))
+        raise ValueError(f"{name}: expected a scalar or {self.n} values, got shape {arr.shape}")
+
+    # ------------------------------------------------------------------
+    #  STEP
+    # ------------------------------------------------------------------
+
+    def step(self, throttle, brake, dt: float = 0.1, lateral_accel=0.0) -> np.ndarray:
+        """
+        Advance every car by one timestep.
+
+        Parameters
+        ----------
+        throttle, brake : float or np.ndarray of shape (N,)
+            Driver inputs (0..1).
+        dt : float
+            Timestep (s).
+        lateral_accel : float or np.ndarray of shape (N,)
+            Lateral acceleration fed to the tire wear/heat model.
+
+        Returns
+        -------
+        np.ndarray — new speeds (m/s)
+        """
+        th = self._as_input(throttle, "throttle")
+        br = self._as_input(brake, "brake")
+        lat = self._as_input(lateral_accel, "lateral_accel")
+
+        # Longitudinal dynamics (mass includes current fuel load)
+        mass = self.total_mass
+        self.speed_ms = update_speed_batch(self.speed_ms, th, br, dt, mass=mass, car=self.params)
+        speed_kmh = self.speed_ms * 3.6
+
+        # Thermal
+        self.coolant_temp = update_coolant_temp(self.coolant_temp, th, speed_kmh, dt)
+
+        # Aero grip multiplier: (m*g + downforce) / (m*g)
+        p = self.params
+        downforce = 0.5 * p["air_density"] * p["downforce_coeff"] * p["frontal_area"] * self.speed_ms ** 2
+        weight = mass * 9.81
+        self.aero_grip_multiplier = (weight + downforce) / weight
+
+        # Tires
+        (self.tire_wear, self.tire_surface_temp, self.tire_core_temp,
+         distance_km, self.tire_graining, self.tire_blistering) = advance_tire_state(
+            self.tire_wear, self.tire_surface_temp, self.tire_core_temp,
+            speed_kmh, th, br, lat, dt,
+            self._wear_rate, self.ambient_temp,
+        )
+        self.tire_distance_km = self.tire_distance_km + distance_km
+
+        # Fuel
+        self.fuel_mass, consumed = consume_fuel(self.fuel_mass, th, dt, self.fuel_consumption_rate)
+        self.fuel_consumed_kg = self.fuel_consumed_kg + consumed
+
+        return self.speed_ms
+
+    # ------------------------------------------------------------------
+    #  PER-CAR VIEWS
+    # ------------------------------------------------------------------
+
+    def get_state(self, i: int) -> dict:
+        """
+        State of car i in the same packet layout the scalar models produce
+        (vehicle_state / tire_state / fuel_state).
+        """
+        grip = tire_grip(
+            self.tire_wear[i], self.tire_surface_temp[i],
+            self._base_grip[i], self.grip_drop_per_wear,
+            self._opt_temp[i], self._temp_window[i],
+        )
+        return {
+            "vehicle_state": {
+                "mass_kg": round(float(self.params["mass"][i] + self.fuel_mass[i]), 1),
+                "aero_grip_multiplier": round(float(self.aero_grip_multiplier[i]), 3),
+            },
+            "tire_state": {
+                "compound": self.compounds[i],
+                "wear_pct": round(float(self.tire_wear[i]) * 100, 1),
+                "surface_temp_c": round(float(self.tire_surface_temp[i]), 1),
+                "core_temp_c": round(float(self.tire_core_temp[i]), 1),
+                "grip": round(float(grip), 3),
+                "graining": bool(self.tire_graining[i]),
+                "blistering": bool(self.tire_blistering[i]),
+                "total_distance_km": round(float(self.tire_distance_km[i]), 2),
+            },
+            "fuel_state": {
+                "fuel_kg": round(float(self.fuel_mass[i]), 2),
+                "fuel_pct": round(float(self.fuel_pct[i]), 1),
+                "total_consumed_kg": round(float(self.fuel_consumed_kg[i]), 2),
+            },
+        }
+
+    def get_states(self) -> list:
+        """get_state(i) for every car, computed in one pass over the arrays."""
+        mass = np.round(self.params["mass"] + self.fuel_mass, 1).tolist()
+        aero = np.round(self.aero_grip_multiplier, 3).tolist()
+        wear = np.round(self.tire_wear * 100, 1).tolist()
+        surface = np.round(self.tire_surface_temp, 1).tolist()
+        core = np.round(self.tire_core_temp, 1).tolist()
+        grip = np.round(self.tire_grip, 3).tolist()
+        graining = self.tire_graining.tolist()
+        blistering = self.tire_blistering.tolist()
+        distance = np.round(self.tire_distance_km, 2).tolist()
+        fuel = np.round(self.fuel_mass, 2).tolist()
+        fuel_pct = np.round(self.fuel_pct, 1).tolist()
+        consumed = np.round(self.fuel_consumed_kg, 2).tolist()
+        return [
+            {
+                "vehicle_state": {"mass_kg": mass[i], "aero_grip_multiplier": aero[i]},
+                "tire_state": {
+                    "compound": self.compounds[i],
+                    "wear_pct": wear[i],
+                    "surface_temp_c": surface[i],
+                    "core_temp_c": core[i],
+                    "grip": grip[i],
+                    "graining": graining[i],
+                    "blistering": blistering[i],
+                    "total_distance_km": distance[i],
+                },
+                "fuel_state": {
+                    "fuel_kg": fuel[i],
+                    "fuel_pct": fuel_pct[i],
+                    "total_consumed_kg": consumed[i],
+                },
+            }
+            for i in range(self.n)
+        ]
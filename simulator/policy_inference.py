@@ -0,0 +1,286 @@
+"""
+Batched, low-latency driver policy inference.
+
+choose_action_from_policy() answers one state at a time: each call
+runs a full scikit-learn predict([state_vector]), which costs milliseconds
+for a single row. That is more than the rest of a simulation step. This
+module precompiles a policy once and then answers whole batches of states
+(one row per simulated car) with plain NumPy:
+
+  - CompiledForest     RandomForest flattened into node arrays, evaluated
+                       for all rows × all trees in max_depth vectorised steps
+  - PolicyTable        best-lap {segment_idx: action} policy as a dense
+                       (n_segments, 3) lookup table
+  - PolicyInference    the same decision order as choose_action_from_policy
+                       (model → segment table → heuristic → default), for
+                       one state or a batch, with p50/p99 latency tracking
+
+Usage:
+    from simulator.recommender import load_driver_policy, GlobalPolicyModel
+    from simulator.policy_inference import PolicyInference
+
+    infer = PolicyInference(load_driver_policy("driver_fast"),
+                            models=GlobalPolicyModel.load(), seed=1)
+    throttle, brake, steer = infer.act(segment_idx, state_vector)
+    actions = infer.act_batch(segment_idx_array, states)    # (n, 3)
+    infer.latency()   # {"calls", "rows", "p50_us", "p99_us", "max_us", "us_per_row"}
+"""
+
+import time
+
+import numpy as np
+
+from simulator.segment_store import FEATURES
+
+# Output bounds for [throttle, brake, steer]
+ACTION_LO = np.array([0.0, 0.0, -1.0])
+ACTION_HI = np.array([1.0, 1.0, 1.0])
+_DEFAULT_ACTION = (0.5, 0.0, 0.0)
+
+_ACTION_KEYS = ("throttle", "brake", "steer")
+
+
+# ---------------------------------------------------------------------------
+#  COMPILED TREES
+# ---------------------------------------------------------------------------
+
+class CompiledForest:
+    """
+    A fitted scikit-learn tree ensemble as flat arrays.
+
+    Every tree's nodes are concatenated into one set of arrays. Leaves
+    point to themselves (threshold +inf, so they always "go left"). A batch
+    is then evaluated by advancing an (n_rows, n_trees) array of node ids
+    max_depth times. Predictions match forest.predict() exactly.
+    """
+
+    def __init__(self, forest):
+        estimators = getattr(forest, "estimators_", [forest])
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            nodes = np.arange(n)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            value.append(tree.value[:, :, 0])
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.value = np.concatenate(value)              # (total_nodes, n_outputs)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = depth
+        self.n_outputs = self.value.shape[1]
+
+    def predict(self, X) -> np.ndarray:
+        """(n, n_features) → (n, n_outputs); (n,) for single-output forests."""
+        # Trees split float32 features against float64 thresholds, as sklearn does.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        out = self.value[node].mean(axis=1)
+        return out[:, 0] if self.n_outputs == 1 else out
+
+
+# ---------------------------------------------------------------------------
+#  SEGMENT LOOKUP TABLE
+# ---------------------------------------------------------------------------
+
+class PolicyTable:
+    """Best-lap {segment_idx: [throttle, brake, steer]} policy as dense arrays."""
+
+    def __init__(self, segment_policy: dict):
+        # JSON-loaded policies have string keys.
+        idx = np.array([int(k) for k in segment_policy], dtype=np.intp)
+        size = int(idx.max()) + 1 if len(idx) else 1
+        self.actions = np.zeros((size, 3))
+        self.known = np.zeros(size, dtype=bool)
+        if len(idx):
+            self.actions[idx] = np.array(list(segment_policy.values()), dtype=float)
+            self.known[idx] = True
+
+    def lookup(self, segment_idx) -> tuple:
+        """(actions (n, 3), found (n,) bool) — rows outside the table are not found."""
+        seg = np.asarray(segment_idx, dtype=np.intp)
+        inside = (seg >= 0) & (seg < len(self.known))
+        safe = np.where(inside, seg, 0)
+        return self.actions[safe], inside & self.known[safe]
+
+
+# ---------------------------------------------------------------------------
+#  INFERENCE SERVICE
+# ---------------------------------------------------------------------------
+
+class PolicyInference:
+    """
+    Compiled policy for one driver, answering single states or batches.
+
+    Decision order per row is that of choose_action_from_policy():
+      1. "ml" policy with models — GlobalPolicyModel, or the per-segment
+         {"throttle": {idx: forest}, ...} dict of train_regressors_per_action()
+      2. segment table — policy["policy"] = {segment_idx: action}; unlike
+         choose_action_from_policy(), string keys of JSON-loaded policies
+         match too
+      3. heuristic — base throttle/brake ± uniform noise (seeded RNG)
+      4. (0.5, 0.0, 0.0)
+
+    Parameters
+    ----------
+    policy : dict
+        From load_driver_policy().
+    models : GlobalPolicyModel or dict, optional
+        From train_models() / GlobalPolicyModel.load().
+    seed : int, optional
+        Seed of the heuristic noise generator.
+    window : int
+        Number of recent calls kept for the latency percentiles.
+    """
+
+    def __init__(self, policy: dict, models=None, seed: int = None, window: int = 10_000):
+        self.policy = policy or {}
+        self.rng = np.random.default_rng(seed)
+        self._global = None
+        self._compiled = None           # segment_idx → (CompiledForest × 3)
+
+        # Everything is compiled up front so no act_batch() call (and no
+        # latency sample) pays for it.
+        if self.policy.get("type") == "ml" and models:
+            if hasattr(models, "model"):
+                self._global = CompiledForest(models.model)
+            elif isinstance(models, dict):
+                self._compiled = self._compile_segments(models)
+
+        seg_policy = self.policy.get("policy")
+        self.table = PolicyTable(seg_policy) if isinstance(seg_policy, dict) else None
+
+        self._lat = np.zeros(window)
+        self._lat_rows = np.zeros(window, dtype=np.int64)
+        self._lat_n = 0
+
+    # ------------------------------------------------------------------
+    #  ACTIONS
+    # ------------------------------------------------------------------
+
+    def act(self, segment_idx=None, state_vector=None) -> tuple:
+        """One state → (throttle, brake, steer)."""
+        seg = None if segment_idx is None else [segment_idx]
+        states = None if state_vector is None else [state_vector]
+        out = self.act_batch(seg, states, n=1)[0]
+        return float(out[0]), float(out[1]), float(out[2])
+
+    def act_batch(self, segment_idx=None, states=None, n: int = None) -> np.ndarray:
+        """
+        Actions for a batch of cars.
+
+        Parameters
+        ----------
+        segment_idx : array-like of int, optional
+            Track index of each car (needed for segment tables/models).
+        states : array-like, shape (n, 4), optional
+            [speed_kmh, coolant_temp, yaw_deg, lap_progress] per car (needed
+            for models).
+        n : int, optional
+            Batch size when neither segment_idx nor states is given.
+
+        Returns
+        -------
+        np.ndarray (n, 3) — [throttle, brake, steer] rows.
+        """
+        start = time.perf_counter()
+        seg = None if segment_idx is None else np.asarray(segment_idx, dtype=np.intp).reshape(-1)
+        X = None if states is None else np.asarray(states, dtype=float).reshape(-1, len(FEATURES))
+        if n is None:
+            n = len(seg) if seg is not None else len(X) if X is not None else 1
+
+        out = np.empty((n, 3))
+        todo = np.ones(n, dtype=bool)
+
+        if X is not None and self._global is not None:
+            out[:] = np.clip(self._global.predict(X), ACTION_LO, ACTION_HI)
+            todo[:] = False
+        elif X is not None and seg is not None and self._compiled is not None:
+            self._predict_segments(seg, X, out, todo)
+
+        if todo.any() and seg is not None and self.table is not None:
+            actions, found = self.table.lookup(seg)
+            hit = todo & found
+            out[hit] = actions[hit]
+            todo &= ~found
+
+        if todo.any():
+            k = int(todo.sum())
+            if self.policy.get("type") == "heuristic":
+                p = self.policy
+                throttle = p["throttle_base"] + self.rng.uniform(-0.05, 0.05, k)
+                brake = p["brake_base"] + self.rng.uniform(-0.02, 0.02, k)
+                steering = self.rng.uniform(-p["steer_var"], p["steer_var"], k)
+                out[todo] = np.clip(np.column_stack([throttle, brake, steering]), ACTION_LO, ACTION_HI)
+            else:
+                out[todo] = _DEFAULT_ACTION
+
+        self._record(time.perf_counter() - start, n)
+        return out
+
+    def _predict_segments(self, seg, X, out, todo):
+        """Per-segment forests: one compiled predict per distinct segment in the batch."""
+        for s in np.unique(seg):
+            forests = self._compiled.get(int(s))
+            if forests is None:
+                continue
+            rows = seg == s
+            out[rows] = np.column_stack([f.predict(X[rows]) for f in forests])
+            todo[rows] = False
+
+    @staticmethod
+    def _compile_segments(models: dict) -> dict:
+        """{segment_idx: (throttle, brake, steer) CompiledForest} for segments with all three models."""
+        try:
+            per_action = [models[k] for k in _ACTION_KEYS]
+        except KeyError:
+            return {}
+        segments = set(per_action[0]).intersection(*per_action[1:])
+        return {int(s): tuple(CompiledForest(m[s]) for m in per_action) for s in segments}
+
+    # ------------------------------------------------------------------
+    #  LATENCY
+    # ------------------------------------------------------------------
+
+    def _record(self, seconds: float, rows: int):
+        i = self._lat_n % len(self._lat)
+        self._lat[i] = seconds
+        self._lat_rows[i] = rows
+        self._lat_n += 1
+
+    def latency(self) -> dict:
+        """Per-call latency over the last `window` calls (microseconds)."""
+        k = min(self._lat_n, len(self._lat))
+        if k == 0:
+            return {"calls": 0, "rows": 0, "p50_us": 0.0, "p99_us": 0.0, "max_us": 0.0, "us_per_row": 0.0}
+        lat = self._lat[:k] * 1e6
+        rows = int(self._lat_rows[:k].sum())
+        return {
+            "calls": self._lat_n,
+            "rows": rows,
+            "p50_us": round(float(np.percentile(lat, 50)), 1),
+            "p99_us": round(float(np.percentile(lat, 99)), 1),
+            "max_us": round(float(lat.max()), 1),
+            "us_per_row": round(float(lat.sum() / max(rows, 1)), 2),
+        }
+
+    def reset_latency(self):
+        self._lat_n = 0
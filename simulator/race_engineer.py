@@ -12,6 +12,15 @@ Processes session telemetry through the race engineer's mental model:
   → Root cause: "Why was this lap slower?"
   → Prediction
 
+Each lap is analysed in columnar form: lap_columns() pulls the packet
+fields into NumPy arrays in one pass, and derived channels, corners,
+sectors and corner metrics are all array operations on those columns.
+
+For live use, push(packet) feeds packets one at a time: a lap's summary
+is finalised when the lap counter moves on, and latest_comparison /
+latest_prediction are refreshed then, so each packet costs O(1) and each
+lap O(lap length).
+
 Usage:
     from simulator.race_engineer import RaceEngineer
 
@@ -22,10 +31,27 @@ Usage:
     summary = engineer.get_lap_summary(lap_number)
     delta = engineer.compare_laps(5, 6)  # why was lap 6 slower?
     print(delta["root_cause"])
+
+    # cached: unchanged logs are not re-analysed (utils.analysis_cache)
+    engineer = RaceEngineer.from_file(path, cache=AnalysisCache())
+
+    # many laps, any sessions/drivers, aligned on distance
+    laps = {f"A L{ln}": p for ln, p in load_session_laps(path_a).items()}
+    laps.update({f"B L{ln}": p for ln, p in load_session_laps(path_b).items()})
+    cmp = RaceEngineer().compare_laps_across(laps)
+    cmp["delta_s"], cmp["corner_delta_s"]
+
+    # live
+    engineer = RaceEngineer()
+    for packet in stream:
+        summary = engineer.push(packet)      # dict when a lap completes, else None
+        if summary:
+            print(engineer.latest_comparison["root_cause"])
 """
 
 import numpy as np
-import math
+
+from simulator.lap_alignment import LapResampler, lap_columns, lap_distance
 
 try:
     import pandas as pd
@@ -33,6 +59,29 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+# Bump whenever lap summaries / corner metrics change, so cached analyses
+# (utils.analysis_cache) computed by older code are not reused.
+ANALYSIS_VERSION = 1
+
+
+def load_session_laps(path: str, laps: list = None) -> dict:
+    """
+    {lap_number: packets} for a session log. By default every lap except
+    the last, which is usually partial; pass `laps` to pick specific ones.
+    """
+    from utils.session_log import load_session_packets
+    by_lap = {}
+    for p in load_session_packets(path, laps=laps):
+        by_lap.setdefault(p.get("lap", 1), []).append(p)
+    if laps is None and len(by_lap) > 1:
+        by_lap.pop(max(by_lap))
+    return by_lap
+
+
+def _prev(a: np.ndarray) -> np.ndarray:
+    """a shifted by one sample; the first sample is its own predecessor."""
+    return np.concatenate((a[:1], a[:-1]))
+
 
 class RaceEngineer:
     """
@@ -46,6 +95,13 @@ class RaceEngineer:
         self.corners = []         # list of corner segments
         self.sector_boundaries = []
         self._analyzed = False
+        self.source_path = None         # log file, when loaded from one
+        self.resampler = LapResampler() # distance alignment, cached per lap
+
+        # Incremental (push) mode
+        self.live_lap = None            # lap currently receiving packets
+        self.latest_comparison = None   # compare_laps(previous, last completed)
+        self.latest_prediction = None   # predict_next_lap(last completed)
 
     # ------------------------------------------------------------------
     #  DATA LOADING
@@ -56,13 +112,60 @@ class RaceEngineer:
         self.packets = packets
         self._group_by_lap()
         self._analyzed = False
+        self.source_path = None
+        self.live_lap = None
+        self.latest_comparison = None
+        self.latest_prediction = None
 
     def load_from_file(self, path: str):
-        """Load packets from a session log JSON file."""
-        import json
-        with open(path) as f:
-            packets = json.load(f)
-        self.load_packets(packets)
+        """Load packets from a session log (JSON array or NDJSON)."""
+        from utils.session_log import load_session_packets
+        self.load_packets(load_session_packets(path))
+        self.source_path = path
+
+    @classmethod
+    def from_file(cls, path: str, cache=None) -> "RaceEngineer":
+        """
+        Load and analyse a session log.
+
+        With `cache` (utils.analysis_cache.AnalysisCache), lap summaries are
+        taken from the cache when it holds this exact file at
+        ANALYSIS_VERSION; packets are then only read per lap, on demand,
+        by lap_packets(). Fresh analyses are written back to the cache.
+        """
+        engineer = cls()
+        if cache is None:
+            engineer.load_from_file(path)
+            engineer.analyze()
+            return engineer
+
+        from utils.session_catalog import file_fingerprint
+        fingerprint = file_fingerprint(path)
+        summaries = cache.get(path, ANALYSIS_VERSION, fingerprint)
+        if summaries is not None:
+            engineer.source_path = path
+            engineer.lap_summaries = summaries
+            engineer._analyzed = True
+            return engineer
+
+        engineer.load_from_file(path)
+        engineer.analyze()
+        # Skip caching if the log changed while it was being read.
+        if file_fingerprint(path) == fingerprint:
+            cache.put(path, ANALYSIS_VERSION, engineer.lap_summaries, fingerprint)
+        return engineer
+
+    def lap_packets(self, lap_number: int) -> list:
+        """Packets of one lap (read from the log on first use after a cache hit)."""
+        if lap_number not in self.lap_data and self.source_path and not self.packets:
+            from utils.session_log import load_session_packets, read_session_footer
+            if read_session_footer(self.source_path) is not None:
+                # Closed NDJSON log: seek straight to the lap.
+                self.lap_data[lap_number] = load_session_packets(self.source_path, laps=[lap_number])
+            else:
+                self.packets = load_session_packets(self.source_path)
+                self._group_by_lap()
+        return self.lap_data.get(lap_number, [])
 
     def _group_by_lap(self):
         """Group packets by lap number."""
@@ -71,71 +174,136 @@ class RaceEngineer:
             ln = p.get("lap", 1)
             self.lap_data.setdefault(ln, []).append(p)
 
+    # ------------------------------------------------------------------
+    #  INCREMENTAL (LIVE) MODE
+    # ------------------------------------------------------------------
+
+    def push(self, packet: dict):
+        """
+        Add one live packet.
+
+        Returns the finalised summary of the previous lap when this packet
+        starts a new one, else None.
+        """
+        if not self._analyzed:
+            # Packets loaded in bulk before going live: summarise them once.
+            self.analyze()
+            if self.lap_data:
+                self.live_lap = max(self.lap_data)
+
+        ln = packet.get("lap", 1)
+        self.packets.append(packet)
+        self.lap_data.setdefault(ln, []).append(packet)
+        self.resampler.invalidate(ln)
+
+        if self.live_lap is None:
+            self.live_lap = ln
+            return None
+        if ln == self.live_lap:
+            return None
+        if ln < self.live_lap:
+            # Late packet for a finished lap: refresh that lap only.
+            if ln in self.lap_summaries:
+                self.lap_summaries[ln] = self.compute_lap_summary(ln)
+            return None
+
+        finished, self.live_lap = self.live_lap, ln
+        return self._finalize(finished)
+
+    def push_many(self, packets: list) -> list:
+        """push() each packet; returns the summaries of laps completed on the way."""
+        finished = []
+        for p in packets:
+            summary = self.push(p)
+            if summary is not None:
+                finished.append(summary)
+        return finished
+
+    def finalize_lap(self):
+        """Finalise the lap in progress (e.g. at the end of a stint)."""
+        if self.live_lap is None or self.live_lap not in self.lap_data:
+            return None
+        return self._finalize(self.live_lap)
+
+    def current_lap_summary(self) -> dict:
+        """Summary of the lap in progress so far (computed on demand)."""
+        if self.live_lap is None:
+            return {}
+        return self.compute_lap_summary(self.live_lap)
+
+    def _finalize(self, lap_number: int) -> dict:
+        summary = self.compute_lap_summary(lap_number)
+        self.lap_summaries[lap_number] = summary
+
+        previous = [ln for ln in self.lap_summaries if ln < lap_number]
+        if previous:
+            self.latest_comparison = self.compare_laps(max(previous), lap_number)
+        prediction = self.predict_next_lap(lap_number)
+        if "error" not in prediction:
+            self.latest_prediction = prediction
+        return summary
+
     # ------------------------------------------------------------------
     #  STAGE 2 — DERIVED METRICS
     # ------------------------------------------------------------------
 
+    def compute_derived_columns(self, cols: dict) -> dict:
+        """
+        Derived channels (unrounded) for one lap of columns.
+
+        Each sample is differenced against the previous one (the first
+        sample against itself), with dt floored at 0.01 s.
+        """
+        t = cols["t"]
+        dt = np.maximum(t - _prev(t), 0.01)
+
+        speed_ms = np.nan_to_num(cols["speed_kmh"], nan=0.0) / 3.6
+        long_accel = (speed_ms - _prev(speed_ms)) / dt
+
+        # Engine power estimate (kW)
+        power_kw = np.where(speed_ms > 0.1, long_accel * cols["mass_kg"] * speed_ms / 1000, 0.0)
+
+        # Yaw rate (deg/s)
+        yaw = cols["yaw_deg"]
+        yaw_rate = (yaw - _prev(yaw)) / dt
+
+        # Slip angle proxy (difference between heading and path direction)
+        dx = cols["gps_x"] - _prev(cols["gps_x"])
+        dy = cols["gps_y"] - _prev(cols["gps_y"])
+        moved = (dx != 0) | (dy != 0)
+        path_angle = np.where(moved, np.degrees(np.arctan2(dy, dx)), yaw)
+        slip_angle = yaw - path_angle
+
+        # Brake / throttle / steering rates
+        brake = cols["brake_cmd"]
+        throttle = cols["throttle"]
+        steering = cols["steering"]
+
+        return {
+            "long_accel_ms2": long_accel,
+            "yaw_rate_dps": yaw_rate,
+            "slip_angle_deg": slip_angle,
+            "power_kw": power_kw,
+            "brake_gradient": (brake - _prev(brake)) / dt,
+            "throttle_rate": (throttle - _prev(throttle)) / dt,
+            "steering_rate": (steering - _prev(steering)) / dt,
+        }
+
     def compute_derived(self, packets: list) -> list:
         """Enrich each packet with acceleration, power, slip angle."""
         n = len(packets)
         if n < 2:
             return packets
 
+        derived = self.compute_derived_columns(lap_columns(packets))
+        digits = {"power_kw": 1}
+        values = {k: v.tolist() for k, v in derived.items()}
+
         enriched = []
         for i, p in enumerate(packets):
             ep = dict(p)
-            true = ep.setdefault("true", {})
-            prev = packets[i - 1] if i > 0 else p
-            next_p = packets[i + 1] if i < n - 1 else p
-
-            dt = max(ep.get("t", 0) - prev.get("t", 0), 0.01)
-            speed_ms = true.get("speed_kmh", 0) / 3.6
-            prev_speed_ms = prev.get("true", {}).get("speed_kmh", 0) / 3.6
-
-            # Longitudinal acceleration
-            long_accel = (speed_ms - prev_speed_ms) / dt
-
-            # Engine power estimate (kW)
-            throttle = true.get("throttle", 0)
-            mass = ep.get("vehicle_state", {}).get("mass_kg", 210)
-            power_kw = (long_accel * mass * speed_ms) / 1000 if speed_ms > 0.1 else 0
-
-            # Yaw rate (deg/s)
-            yaw = true.get("yaw_deg", 0)
-            prev_yaw = prev.get("true", {}).get("yaw_deg", 0)
-            yaw_rate = (yaw - prev_yaw) / dt
-
-            # Slip angle proxy (difference between heading and path direction)
-            gx = ep.get("gps", {}).get("x", 0)
-            gy = ep.get("gps", {}).get("y", 0)
-            px = prev.get("gps", {}).get("x", 0)
-            py = prev.get("gps", {}).get("y", 0)
-            path_angle = math.degrees(math.atan2(gy - py, gx - px)) if (gx != px or gy != py) else yaw
-            slip_angle = yaw - path_angle
-
-            # Brake pressure gradient
-            brake = true.get("brake_cmd", 0)
-            prev_brake = prev.get("true", {}).get("brake_cmd", 0)
-            brake_gradient = (brake - prev_brake) / dt
-
-            # Throttle application rate
-            prev_throttle = prev.get("true", {}).get("throttle", 0)
-            throttle_rate = (throttle - prev_throttle) / dt
-
-            # Steering rate
-            steering = true.get("steering", 0)
-            prev_steering = prev.get("true", {}).get("steering", 0)
-            steering_rate = (steering - prev_steering) / dt
-
-            ep["derived"] = {
-                "long_accel_ms2": round(long_accel, 3),
-                "yaw_rate_dps": round(yaw_rate, 3),
-                "slip_angle_deg": round(slip_angle, 3),
-                "power_kw": round(power_kw, 1),
-                "brake_gradient": round(brake_gradient, 3),
-                "throttle_rate": round(throttle_rate, 3),
-                "steering_rate": round(steering_rate, 3),
-            }
+            ep.setdefault("true", {})
+            ep["derived"] = {k: round(values[k][i], digits.get(k, 3)) for k in derived}
             enriched.append(ep)
 
         return enriched
@@ -150,40 +318,27 @@ class RaceEngineer:
 
         Returns list of dicts: {start_idx, end_idx, peak_idx, peak_yaw, direction}
         """
-        corners = []
+        yaw_deg = np.asarray(yaw_deg, dtype=float)
+        above = np.abs(yaw_deg) > threshold
+
+        # Runs of |yaw| > threshold that end before the trace does
+        edges = np.diff(np.concatenate(([0], above.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        keep = (ends < len(yaw_deg)) & (ends - starts >= min_gap)
+
         abs_yaw = np.abs(yaw_deg)
-        in_corner = False
-        start = 0
-        peak = 0
-        peak_val = 0
-
-        for i in range(len(abs_yaw)):
-            if abs_yaw[i] > threshold and not in_corner:
-                start = i
-                peak = i
-                peak_val = abs_yaw[i]
-                in_corner = True
-            elif abs_yaw[i] > threshold and in_corner:
-                if abs_yaw[i] > peak_val:
-                    peak_val = abs_yaw[i]
-                    peak = i
-            elif abs_yaw[i] <= threshold and in_corner:
-                if i - start >= min_gap:
-                    entry_idx = start
-                    apex_idx = peak
-                    exit_idx = i
-
-                    # Find braking point (look back from entry for brake application)
-                    brake_point = entry_idx
-                    corners.append({
-                        "start_idx": entry_idx,
-                        "apex_idx": apex_idx,
-                        "end_idx": exit_idx,
-                        "peak_yaw": round(peak_val, 1),
-                        "direction": "L" if yaw_deg[apex_idx] > 0 else "R",
-                        "brake_idx": brake_point,
-                    })
-                in_corner = False
+        corners = []
+        for start, end in zip(starts[keep].tolist(), ends[keep].tolist()):
+            apex_idx = start + int(np.argmax(abs_yaw[start:end]))
+            corners.append({
+                "start_idx": start,
+                "apex_idx": apex_idx,
+                "end_idx": end,
+                "peak_yaw": round(float(abs_yaw[apex_idx]), 1),
+                "direction": "L" if yaw_deg[apex_idx] > 0 else "R",
+                "brake_idx": start,
+            })
 
         self.corners = corners
         return corners
@@ -197,30 +352,37 @@ class RaceEngineer:
     #  STAGE 4 — PER-CORNER METRICS
     # ------------------------------------------------------------------
 
-    def compute_corner_metrics(self, packets: list, corner: dict) -> dict:
-        """Compute entry/apex/exit speeds and braking metrics for one corner."""
+    def compute_corner_metrics(self, packets, corner: dict) -> dict:
+        """
+        Compute entry/apex/exit speeds and braking metrics for one corner.
+
+        `packets` is a lap's packet list or its lap_columns() dict.
+        """
+        cols = packets if isinstance(packets, dict) else lap_columns(packets)
+        speed = cols["speed_kmh"]
+        n = len(speed)
+
         start = max(0, corner["start_idx"] - 5)
         apex = corner["apex_idx"]
-        end = min(len(packets) - 1, corner["end_idx"] + 5)
+        end = min(n - 1, corner["end_idx"] + 5)
 
-        entry_speed = packets[start].get("true", {}).get("speed_kmh", 0)
-        apex_speed = packets[apex].get("true", {}).get("speed_kmh", 0)
-        exit_speed = packets[end].get("true", {}).get("speed_kmh", 0)
+        def _speed(i):
+            v = speed[i]
+            return 0 if np.isnan(v) else float(v)
+
+        entry_speed = _speed(start)
+        apex_speed = _speed(apex)
+        exit_speed = _speed(end)
 
         # Find braking point — where brake first exceeds 0.1 before entry
-        brake_idx = start
-        for i in range(start, apex):
-            if packets[i].get("true", {}).get("brake_cmd", 0) > 0.1:
-                brake_idx = i
-                break
-        brake_speed = packets[brake_idx].get("true", {}).get("speed_kmh", 0)
+        braking = np.flatnonzero(cols["brake_cmd"][start:apex] > 0.1)
+        brake_idx = start + int(braking[0]) if len(braking) else start
+        brake_speed = _speed(brake_idx)
         brake_distance = brake_speed / 3.6 * (apex - brake_idx) * 0.1
 
-        # Minimum speed in corner
-        min_speed = min(
-            packets[i].get("true", {}).get("speed_kmh", float("inf"))
-            for i in range(start, end + 1)
-        )
+        # Minimum speed in corner (samples without a speed are skipped)
+        window = speed[start:end + 1]
+        min_speed = float(np.nanmin(window)) if not np.all(np.isnan(window)) else float("inf")
 
         return {
             "entry_speed_kmh": round(entry_speed, 1),
@@ -271,49 +433,49 @@ class RaceEngineer:
         if not packets:
             return {"lap": lap_number, "error": "no data"}
 
-        # Enrich with derived metrics
-        enriched = self.compute_derived(packets)
-        n = len(enriched)
+        cols = lap_columns(packets)
+        return self.summarize_lap_columns(lap_number, cols, self.extract_tire_fuel_state(packets))
+
+    def summarize_lap_columns(self, lap_number: int, cols: dict, tire_fuel: dict) -> dict:
+        """
+        compute_lap_summary() on one lap of lap_columns() arrays plus its
+        extract_tire_fuel_state() dict.
+        """
+        n = len(cols["t"])
 
         # Detect corners from yaw
-        yaw_trace = np.array([p.get("true", {}).get("yaw_deg", 0) for p in enriched])
-        corners = self.detect_corners(yaw_trace)
+        corners = self.detect_corners(cols["yaw_deg"])
 
         # Basic stats
-        speeds = np.array([p.get("true", {}).get("speed_kmh", 0) for p in enriched])
-        throttles = np.array([p.get("true", {}).get("throttle", 0) for p in enriched])
-        brakes = np.array([p.get("true", {}).get("brake_cmd", 0) for p in enriched])
+        speeds = np.nan_to_num(cols["speed_kmh"], nan=0.0)
+        throttles = cols["throttle"]
+        brakes = cols["brake_cmd"]
 
         # Lap time (from last packet timestamp - first packet timestamp)
-        t_start = enriched[0].get("t", 0)
-        t_end = enriched[-1].get("t", 0)
-        lap_time = t_end - t_start
+        t = cols["t"]
+        lap_time = float(t[-1] - t[0])
 
         # Sector times — divide track_index into 3 sectors
-        track_indices = np.array([p.get("track_index", 0) for p in enriched])
-        if len(track_indices) > 0:
-            max_idx = max(track_indices)
-            sector_times = {}
-            for s in range(3):
-                s_start = max_idx * s / 3
-                s_end = max_idx * (s + 1) / 3
-                sector_packets = [p for p in enriched if s_start <= p.get("track_index", 0) <= s_end]
-                if sector_packets:
-                    sector_times[f"sector_{s+1}"] = round(
-                        sector_packets[-1].get("t", 0) - sector_packets[0].get("t", 0), 3
-                    )
-
-        # Derived acceleration stats
-        long_accels = np.array([p.get("derived", {}).get("long_accel_ms2", 0) for p in enriched])
-
-        # Tire and fuel
-        tire_fuel = self.extract_tire_fuel_state(enriched)
+        track_indices = cols["track_index"]
+        max_idx = float(track_indices.max())
+        sector_times = {}
+        for s in range(3):
+            s_start = max_idx * s / 3
+            s_end = max_idx * (s + 1) / 3
+            in_sector = np.flatnonzero((track_indices >= s_start) & (track_indices <= s_end))
+            if len(in_sector):
+                sector_times[f"sector_{s+1}"] = round(float(t[in_sector[-1]] - t[in_sector[0]]), 3)
+
+        # Derived acceleration stats (rounded as the per-packet channel is)
+        if n >= 2:
+            long_accels = self.compute_derived_columns(cols)["long_accel_ms2"]
+            max_accel = round(float(long_accels.max()), 3)
+            min_accel = round(float(long_accels.min()), 3)
+        else:
+            max_accel = min_accel = 0.0
 
         # Corner metrics
-        corner_metrics = []
-        for c in corners:
-            cm = self.compute_corner_metrics(enriched, c)
-            corner_metrics.append(cm)
+        corner_metrics = [self.compute_corner_metrics(cols, c) for c in corners]
 
         # Driver score (0-100 composite)
         # Based on: braking consistency, throttle smoothness, corner speed maintenance
@@ -332,8 +494,8 @@ class RaceEngineer:
             "avg_throttle_pct": round(float(np.mean(throttles)) * 100, 1),
             "avg_brake_pct": round(float(np.mean(brakes)) * 100, 1),
             "max_brake": round(float(np.max(brakes)) * 100, 1),
-            "max_long_accel_ms2": round(float(np.max(long_accels)), 2),
-            "min_long_accel_ms2": round(float(np.min(long_accels)), 2),
+            "max_long_accel_ms2": round(max_accel, 2),
+            "min_long_accel_ms2": round(min_accel, 2),
             "n_corners": len(corner_metrics),
             "driver_score": min(driver_score, 100),
             "tire_wear_start_pct": tire_fuel["tire_wear_start_pct"],
@@ -498,6 +660,99 @@ class RaceEngineer:
             "root_cause": "\n".join(lines),
         }
 
+    # ------------------------------------------------------------------
+    #  CROSS-SESSION COMPARISON
+    # ------------------------------------------------------------------
+
+    def compare_laps_across(self, laps, reference=None, step_m: float = 5.0) -> dict:
+        """
+        Align any number of laps on track distance and compare them.
+
+        Each lap's distance is scaled to the median lap length, so laps
+        from different sessions or drivers on the same track line up even
+        when their GPS path lengths differ slightly. Corners are detected
+        once on the reference lap and measured on every lap at the same
+        distances.
+
+        Parameters
+        ----------
+        laps : list[int] or dict[str, list[dict]]
+            Lap numbers of this session, or {label: packets} for laps from
+            any sessions (see load_session_laps()).
+        reference : label, optional
+            Lap the deltas are taken against (default: the fastest).
+        step_m : float
+            Distance grid spacing (m).
+
+        Returns
+        -------
+        dict with:
+          - labels, reference
+          - distance_m: (G,) grid
+          - time_s, speed_kmh, delta_s: (N, G) — elapsed time, speed and
+            time gained (-) / lost (+) vs the reference at each distance
+          - lap_times: (N,)
+          - corners: [{corner, start_m, apex_m, end_m, direction}]
+          - corner_time_s, corner_delta_s, entry_speed_kmh, apex_speed_kmh,
+            exit_speed_kmh, min_speed_kmh: (N, n_corners)
+        """
+        if not isinstance(laps, dict):
+            laps = {ln: self.lap_packets(ln) for ln in laps}
+        aligned = self.resampler.align(laps, step_m=step_m, channels=("t", "speed_kmh"))
+        labels = aligned["keys"]
+        if not labels:
+            return {"error": "No laps with at least two packets"}
+
+        grid = aligned["distance_m"]
+        time_s, speed = aligned["t"], aligned["speed_kmh"]
+        n, g = time_s.shape
+
+        lap_times = time_s[:, -1]
+        ref = labels.index(reference) if reference is not None else int(np.argmin(lap_times))
+        delta_s = time_s - time_s[ref]
+
+        # Corners from the reference lap, mapped onto the distance grid
+        ref_cols = aligned["cols"][ref]
+        ref_d = lap_distance(ref_cols)
+        if ref_d[-1] > 0:
+            ref_d = ref_d * (grid[-1] / ref_d[-1])
+        corners = []
+        for k, c in enumerate(self.detect_corners(ref_cols["yaw_deg"])):
+            corners.append({
+                "corner": k + 1,
+                "start_m": round(float(ref_d[c["start_idx"]]), 1),
+                "apex_m": round(float(ref_d[c["apex_idx"]]), 1),
+                "end_m": round(float(ref_d[min(c["end_idx"], len(ref_d) - 1)]), 1),
+                "direction": c["direction"],
+            })
+
+        nc = len(corners)
+        marks = np.array([[c["start_m"], c["apex_m"], c["end_m"]] for c in corners], dtype=float).reshape(nc, 3)
+        idx = np.minimum(np.searchsorted(grid, marks), g - 1)
+        start, apex, end = idx[:, 0], idx[:, 1], idx[:, 2]
+
+        corner_time = time_s[:, end] - time_s[:, start]
+        min_speed = np.empty((n, nc))
+        for k in range(nc):
+            min_speed[:, k] = speed[:, start[k]:end[k] + 1].min(axis=1)
+
+        return {
+            "labels": labels,
+            "reference": labels[ref],
+            "distance_m": grid,
+            "time_s": time_s,
+            "speed_kmh": speed,
+            "delta_s": delta_s,
+            "lap_times": lap_times,
+            "corners": corners,
+            "corner_time_s": corner_time,
+            "corner_delta_s": corner_time - corner_time[ref],
+            "entry_speed_kmh": speed[:, start],
+            "apex_speed_kmh": speed[:, apex],
+            "exit_speed_kmh": speed[:, end],
+            "min_speed_kmh": min_speed,
+        }
+
     # ------------------------------------------------------------------
     #  STAGE 11 — PREDICTION
     # ------------------------------------------------------------------
@@ -0,0 +1,486 @@
+"""
+Multi-car race mode: N cars on one track, advanced in lockstep.
+
+run_simulator_with_recommender.py and batch_run.py simulate a single car.
+run_race() puts a whole field on the same track in one process:
+
+  - VehicleBatch       one step() call advances every car's physics
+  - GPSBatch           every car's track position from one searchsorted
+  - drivers            a DriverProfile (lap profile + perturb_action) or
+                       anything with get_action(), e.g. AdaptiveDriver
+  - running order      recomputed every tick from distance covered
+                       (finished cars first, in finishing order)
+
+Each car's packets stream to its own NDJSON session log. Every packet
+also carries "car" and "position". One followed car can be published
+on the telemetry bus / shared-memory ring for the live pages.
+
+Usage:
+    # 20 cars, 5 laps, drivers assigned round-robin
+    python -m simulator.race_mode --cars 20 --target-laps 5 \\
+        --driver-ids driver_fast driver_smooth adaptive_expert adaptive_novice --seed 1
+
+    # live: publish car 3 on the telemetry bus while racing in real time
+    python -m simulator.race_mode --cars 8 --realtime --live --follow-car 3
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+import argparse
+import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.json_writer import atomic_write
+from utils.telemetry_bus import TelemetryPublisher
+from utils.telemetry_ring import TelemetryRing
+from utils.session_log import SessionLogWriter
+from utils.config_loader import load_yaml
+
+from simulator.driver_profiles import simple_lap_profile
+from simulator.driver_manager import load_drivers
+from simulator.driver_models import load_adaptive_drivers
+from simulator.track_loader import load_track_csv, generate_oval_track
+
+from simulator.new_sensors.wheel_speed_sensor import WheelSpeedSensor
+from simulator.new_sensors.brake_pressure_sensor import BrakePressureSensor
+from simulator.new_sensors.coolant_temp_sensor import CoolantTempSensor
+from simulator.new_sensors.imu_sensor import IMUSensor
+
+from simulator.physics.simple.steering_yaw import compute_yaw_rate
+from simulator.physics.simple.gps_simulator import GPSBatch
+from simulator.physics.simple.vehicle_batch import VehicleBatch
+
+DATA_DIR = os.path.join(ROOT, "data")
+LOG_DIR = os.path.join(DATA_DIR, "logs")
+STOP_FILE = os.path.join(DATA_DIR, "stop_signal.txt")
+
+# Expected lap time of the driving cycle (same as batch_run).
+PROFILE_LAP_TIME = 25.0
+
+
+# ---------------------------------------------------------------------------
+#  HELPERS
+# ---------------------------------------------------------------------------
+
+def track_curvature(track: list) -> np.ndarray:
+    """
+    Normalised curvature per waypoint (-1..1, positive = right turn), the
+    `track_curvature` input of AdaptiveDriver.get_action().
+    """
+    pts = np.asarray(track, dtype=float)
+    if len(pts) < 3:
+        return np.zeros(len(pts))
+    d = np.roll(pts, -1, axis=0) - pts
+    heading = np.arctan2(d[:, 1], d[:, 0])
+    turn = np.angle(np.exp(1j * (heading - np.roll(heading, 1))))
+    peak = np.abs(turn).max()
+    # Counter-clockwise heading change is a left turn.
+    return -turn / peak if peak > 0 else np.zeros(len(pts))
+
+
+def running_order(distance: np.ndarray, finish_time: np.ndarray) -> np.ndarray:
+    """
+    Car indices from P1 to last: finished cars by finishing time, then the
+    rest by distance covered (ties keep grid order).
+    """
+    finished = np.isfinite(finish_time)
+    return np.lexsort((np.arange(len(distance)), -distance, finish_time, ~finished))
+
+
+def _driver_action(driver, t: float, lap_t: float, curvature: float, speed_kmh: float) -> tuple:
+    if hasattr(driver, "get_action"):
+        return driver.get_action(lap_t, PROFILE_LAP_TIME, curvature, speed_kmh)
+    throttle, brake, steering = simple_lap_profile(t=t, lap_time=PROFILE_LAP_TIME)
+    if driver is not None:
+        throttle, brake, steering = driver.perturb_action(throttle, brake, steering)
+    return throttle, brake, steering
+
+
+# ---------------------------------------------------------------------------
+#  RACE
+# ---------------------------------------------------------------------------
+
+def run_race(
+    track: list,
+    car_cfg: dict,
+    sensor_cfg: dict,
+    entries: list,
+    dt: float = 0.1,
+    target_laps: int = 5,
+    log_dir: str = None,
+    stamp: str = None,
+    realtime: bool = False,
+    bus=None,
+    ring=None,
+    follow_car: int = 0,
+    progress_path: str = None,
+    max_sim_time: float = None,
+    stop_file: str = STOP_FILE,
+) -> tuple:
+    """
+    Race a field of cars on one track until every car has finished.
+
+    Parameters
+    ----------
+    track : list[(x, y)]
+        Closed-loop waypoints shared by all cars.
+    car_cfg, sensor_cfg : dict
+        Contents of car_simple.yaml / sensors.yaml. car_cfg values may be
+        per-car sequences (see VehicleBatch).
+    entries : list[(driver_id, driver)]
+        One entry per car, in grid order. driver is a DriverProfile, an
+        object with get_action() (AdaptiveDriver) or None (plain lap
+        profile). Stateful drivers are copied, so one instance may be
+        entered more than once.
+    dt : float
+        Simulation timestep (s).
+    target_laps : int
+        A car finishes once it has completed this many laps.
+    log_dir : str, optional
+        If set, stream each car's packets to
+        race_<stamp>_car<NN>_<driver_id>.ndjson in this directory.
+    stamp : str, optional
+        Timestamp used in log filenames (default: now).
+    realtime : bool
+        Sleep so simulated time tracks wall-clock time.
+    bus : TelemetryPublisher, optional
+        Publish the followed car's packets on the telemetry bus.
+    ring : TelemetryRing, optional
+        Append the followed car's packets to this shared-memory ring.
+    follow_car : int
+        Car published on the bus / ring.
+    progress_path : str, optional
+        If set, write {lap, target} whenever the leader's lap changes.
+    max_sim_time : float, optional
+        Safety cap on simulated seconds (default: 120 s per target lap).
+    stop_file : str
+        Abort early if this file exists.
+
+    Returns
+    -------
+    tuple[list[dict], dict] — (classification, stats)
+        classification: one row per car in finishing order with position,
+        car, driver_id, laps, finish_time_s, lap_times_s, best_lap_s,
+        fuel_kg, fuel_used_kg, tire_wear_pct (at the flag), log_path
+        stats: cars, steps, sim_time_s, wall_time_s, car_steps_per_s,
+        realtime_factor
+    """
+    n = len(entries)
+    if n < 1:
+        raise ValueError("run_race needs at least one car")
+    if max_sim_time is None:
+        max_sim_time = 120.0 * max(target_laps, 1)
+    stamp = stamp or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    driver_ids = [driver_id for driver_id, _ in entries]
+    drivers = [copy.deepcopy(driver) for _, driver in entries]
+
+    batch = VehicleBatch(n, car_params=car_cfg)
+    gps = GPSBatch(track, n_cars=n)
+    curvature = track_curvature(track)
+
+    # Sensors hold no per-car state; one set serves the whole field.
+    wheel_sensor = WheelSpeedSensor(sensor_cfg["wheel_speed"]["std"],
+                                    sensor_cfg["wheel_speed"]["dropout_prob"])
+    brake_sensor = BrakePressureSensor(sensor_cfg["brake_pressure"]["std"],
+                                       sensor_cfg["brake_pressure"]["dropout_prob"])
+    coolant_sensor = CoolantTempSensor(sensor_cfg["coolant_temp"]["std"],
+                                       sensor_cfg["coolant_temp"]["dropout_prob"])
+    imu_sensor = IMUSensor(
+        accel_std=sensor_cfg["imu"]["accel_std"],
+        yaw_std=sensor_cfg["imu"]["yaw_std"],
+        dropout_prob=sensor_cfg["imu"]["dropout_prob"],
+    )
+
+    log_paths = [None] * n
+    logs = [None] * n
+    # Packets are only built when something consumes them (not for Monte Carlo replicas).
+    emit = bool(log_dir) or bus is not None or ring is not None
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        for i, driver_id in enumerate(driver_ids):
+            log_paths[i] = os.path.join(log_dir, f"race_{stamp}_car{i:02d}_{driver_id}.ndjson")
+            logs[i] = SessionLogWriter(log_paths[i], flush_every=200)
+
+    throttle = np.zeros(n)
+    brake = np.zeros(n)
+    steering = np.zeros(n)
+    laps_done = np.zeros(n, dtype=int)
+    lap_start = np.zeros(n)
+    finish_time = np.full(n, np.inf)
+    lap_times = [[] for _ in range(n)]
+    final_state = [None] * n
+    position = np.arange(1, n + 1)
+    running = np.ones(n, dtype=bool)
+
+    t = 0.0
+    steps = 0
+    car_steps = 0
+    leader_lap = -1
+    best_lap = np.inf
+
+    wall_start = time.time()
+    perf_start = time.perf_counter()
+
+    while t < max_sim_time and running.any():
+        if stop_file and steps % 50 == 0 and os.path.exists(stop_file):
+            print("🛑 Stop signal detected — ending race early.")
+            break
+
+        # Drivers
+        speed_kmh = batch.speed_kmh
+        for i in np.flatnonzero(running):
+            throttle[i], brake[i], steering[i] = _driver_action(
+                drivers[i], t, t - lap_start[i], curvature[gps.index[i]], speed_kmh[i]
+            )
+        # Finished cars brake to a stop off the racing line.
+        throttle[~running] = 0.0
+        brake[~running] = 1.0
+
+        # Physics (whole field)
+        v_ms = batch.step(throttle, brake, dt)
+        speed_kmh = v_ms * 3.6
+        yaw_deg = compute_yaw_rate(steering, np.maximum(speed_kmh, 0.0))
+
+        # Track position (finished cars stay where they crossed the line)
+        t_next = t + dt
+        xy, idx, laps = gps.advance(np.where(running, v_ms * dt, 0.0))
+        completed = gps.laps_completed
+        for i in np.flatnonzero(completed > laps_done):
+            # Crossing time interpolated within the step from the distance past the line.
+            past_line = gps.distance[i] - completed[i] * gps.path.length
+            crossed = t_next - past_line / v_ms[i] if v_ms[i] > 0 else t_next
+            lap_time = float(crossed - lap_start[i])
+            lap_times[i].append(lap_time)
+            best_lap = min(best_lap, lap_time)
+            if hasattr(drivers[i], "on_lap_complete"):
+                # Adaptive drivers measure themselves against the fastest lap in the field.
+                drivers[i].on_lap_complete(lap_time, best_lap)
+            lap_start[i] = crossed
+            laps_done[i] = completed[i]
+            if completed[i] >= target_laps:
+                finish_time[i] = crossed
+                running[i] = False
+                final_state[i] = batch.get_state(i)
+
+        # Running order
+        order = running_order(gps.distance, finish_time)
+        position[order] = np.arange(1, n + 1)
+
+        if progress_path and min(laps.max(), target_laps) != leader_lap:
+            leader_lap = int(min(laps.max(), target_laps))
+            atomic_write(progress_path, {"lap": leader_lap, "target": target_laps})
+
+        car_steps += int(running.sum())
+
+        # Packets for cars still racing (as in batch_run, no packet for the finishing tick)
+        if emit:
+            states = batch.get_states()
+            kmh = speed_kmh.tolist()
+            coolant = batch.coolant_temp.tolist()
+            yaw = yaw_deg.tolist()
+            lap = laps.tolist()
+            track_index = idx.tolist()
+            gps_xy = xy.tolist()
+            for i in np.flatnonzero(running):
+                packet = {
+                    "timestamp": wall_start + t,
+                    "t": t,
+                    "lap": lap[i],
+                    "track_index": track_index[i],
+                    "driver_id": driver_ids[i],
+                    "car": int(i),
+                    "position": int(position[i]),
+                    "gps": {"x": gps_xy[i][0], "y": gps_xy[i][1]},
+                    "true": {
+                        "speed_kmh": kmh[i],
+                        "coolant_temp": coolant[i],
+                        "brake_cmd": float(brake[i]),
+                        "throttle": float(throttle[i]),
+                        "yaw_deg": yaw[i],
+                        "steering": float(steering[i]),
+                    },
+                    "sensors": {
+                        "wheel_speed": wheel_sensor.read(kmh[i]),
+                        "brake_pressure": brake_sensor.read(float(brake[i]) * 100.0),
+                        "coolant_temp": coolant_sensor.read(coolant[i]),
+                        "imu": imu_sensor.read(true_ax=0.0, true_ay=0.0, true_yaw=yaw[i]),
+                    },
+                    **states[i],
+                }
+
+                if logs[i] is not None:
+                    logs[i].append(packet)
+                if i == follow_car:
+                    if bus is not None:
+                        bus.publish(packet)
+                    if ring is not None:
+                        ring.push(packet)
+
+        t = t_next
+        steps += 1
+
+        if realtime:
+            lag = (perf_start + t) - time.perf_counter()
+            if lag > 0:
+                time.sleep(lag)
+
+    for log in logs:
+        if log is not None:
+            log.close()
+
+    order = running_order(gps.distance, finish_time)
+    classification = []
+    for pos, i in enumerate(order, start=1):
+        state = final_state[i] or batch.get_state(i)
+        classification.append({
+            "position": pos,
+            "car": int(i),
+            "driver_id": driver_ids[i],
+            "laps": len(lap_times[i]),
+            "finish_time_s": round(float(finish_time[i]), 3) if np.isfinite(finish_time[i]) else None,
+            "lap_times_s": [round(lt, 3) for lt in lap_times[i]],
+            "best_lap_s": round(min(lap_times[i]), 3) if lap_times[i] else None,
+            "fuel_kg": state["fuel_state"]["fuel_kg"],
+            "fuel_used_kg": state["fuel_state"]["total_consumed_kg"],
+            "tire_wear_pct": state["tire_state"]["wear_pct"],
+            "log_path": log_paths[i],
+        })
+
+    wall = time.perf_counter() - perf_start
+    stats = {
+        "cars": n,
+        "steps": steps,
+        "sim_time_s": round(t, 3),
+        "wall_time_s": round(wall, 3),
+        "car_steps_per_s": round(car_steps / wall, 1) if wall > 0 else float("inf"),
+        "realtime_factor": round(t / wall, 1) if wall > 0 else float("inf"),
+    }
+    return classification, stats
+
+
+# ---------------------------------------------------------------------------
+#  CLI
+# ---------------------------------------------------------------------------
+
+def _resolve(path: str, default: str) -> str:
+    if path is None:
+        return default
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def load_race_entries(driver_ids: list, n_cars: int) -> list:
+    """
+    (driver_id, driver) for n_cars cars, assigning driver_ids round-robin.
+    Ids are looked up in load_drivers(), then load_adaptive_drivers();
+    unknown ids drive the plain lap profile.
+    """
+    profiles = load_drivers()
+    adaptive = load_adaptive_drivers()
+    entries = []
+    for k in range(n_cars):
+        driver_id = driver_ids[k % len(driver_ids)]
+        entries.append((driver_id, profiles.get(driver_id) or adaptive.get(driver_id)))
+    return entries
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Multi-car race simulation")
+    parser.add_argument("--cars", type=int, default=20, help="Number of cars on the grid")
+    parser.add_argument("--target-laps", type=int, default=5)
+    parser.add_argument("--driver-ids", type=str, nargs="+",
+                        default=["driver_fast", "driver_smooth", "driver_aggressive", "adaptive_expert"],
+                        help="DriverProfile or AdaptiveDriver ids, assigned round-robin over the grid")
+    parser.add_argument("--track", type=str, default=None,
+                        help="Track CSV filename inside the track dir (default: oval)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--realtime", action="store_true", help="Pace to wall clock")
+    parser.add_argument("--live", action="store_true",
+                        help="Publish the followed car on the telemetry bus and sim_progress.json")
+    parser.add_argument("--follow-car", type=int, default=0, help="Car index published with --live")
+    parser.add_argument("--realtime-file", action="store_true",
+                        help="With --live, also write realtime.json every tick")
+    parser.add_argument("--ring-seconds", type=float, default=120.0,
+                        help="With --live, seconds of history in the shared-memory ring (0 = off)")
+    parser.add_argument("--max-sim-time", type=float, default=None,
+                        help="Cap on simulated seconds")
+    parser.add_argument("--data-dir", type=str, default=None)
+    parser.add_argument("--track-dir", type=str, default=None)
+    parser.add_argument("--log-dir", type=str, default=None)
+    args = parser.parse_args()
+
+    data_dir = _resolve(args.data_dir, DATA_DIR)
+    track_dir = _resolve(args.track_dir, os.path.join(data_dir, "tracks"))
+    log_dir = _resolve(args.log_dir, os.path.join(data_dir, "logs"))
+
+    sim_cfg = load_yaml(os.path.join(ROOT, "configs", "simulation.yaml"))
+    car_cfg = load_yaml(os.path.join(ROOT, "configs", "car_simple.yaml"))
+    sensor_cfg = load_yaml(os.path.join(ROOT, "configs", "sensors.yaml"))
+    dt = sim_cfg.get("dt", 0.1)
+
+    if args.track:
+        track_path = os.path.join(track_dir, args.track)
+        if os.path.exists(track_path):
+            print(f"📌 Loading track: {track_path}")
+            track = load_track_csv(track_path)
+        else:
+            print(f"⚠ Track not found: {track_path}, falling back to oval")
+            track = generate_oval_track()
+    else:
+        track = generate_oval_track()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    entries = load_race_entries(args.driver_ids, args.cars)
+    bus = None
+    ring = None
+    if args.live:
+        bus = TelemetryPublisher(fallback_path=os.path.join(data_dir, "realtime.json") if args.realtime_file else None)
+        if args.ring_seconds > 0:
+            ring = TelemetryRing.create(capacity=int(args.ring_seconds / dt))
+
+    print(f"🏁 Racing {args.cars} cars × {args.target_laps} laps "
+          f"({'real-time' if args.realtime else 'headless'})…")
+
+    try:
+        classification, stats = run_race(
+            track, car_cfg, sensor_cfg, entries, dt=dt,
+            target_laps=args.target_laps,
+            log_dir=log_dir,
+            realtime=args.realtime,
+            bus=bus,
+            ring=ring,
+            follow_car=args.follow_car,
+            progress_path=os.path.join(data_dir, "sim_progress.json") if args.live else None,
+            max_sim_time=args.max_sim_time,
+            stop_file=os.path.join(data_dir, "stop_signal.txt"),
+        )
+    finally:
+        if bus is not None:
+            bus.close()
+        if ring is not None:
+            ring.close()
+
+    print("\n Pos  Car  Driver               Laps   Finish (s)   Best lap (s)")
+    for row in classification:
+        finish = f"{row['finish_time_s']:10.1f}" if row["finish_time_s"] is not None else "       DNF"
+        best = f"{row['best_lap_s']:10.2f}" if row["best_lap_s"] is not None else "         -"
+        print(f" P{row['position']:<3} {row['car']:>3}  {row['driver_id']:<20} {row['laps']:>4}   {finish}   {best}")
+
+    print(f"\n✅ {stats['cars']} cars, {stats['steps']} steps in {stats['wall_time_s']:.2f}s "
+          f"({stats['car_steps_per_s']:.0f} car-steps/s, {stats['realtime_factor']:.0f}× real-time)")
+    print(f"📁 Logs: {log_dir}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,32 +1,39 @@
 # simulator/recommender.py
 import os
 import json
+import random
 import numpy as np
-from collections import defaultdict
-from statistics import mean
 
 # optional ML
 try:
     from sklearn.ensemble import RandomForestRegressor
+    import joblib
     SKLEARN_AVAILABLE = True
 except Exception:
     SKLEARN_AVAILABLE = False
 
+from utils.session_log import load_session_packets
+from utils.session_catalog import SessionCatalog
+from simulator.segment_store import SegmentStore, SEGMENT_STORE_PATH, FEATURES, ACTIONS
+from simulator.policy_inference import CompiledForest, ACTION_LO, ACTION_HI
+
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "logs")
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "models", "recommender_global.joblib")
 
 def load_all_sessions(limit=None):
-    """Load all JSON sessions from logs directory (optionally limit)."""
-    files = sorted([f for f in os.listdir(LOG_DIR) if f.endswith(".json")])
+    """Load all sessions (.json / .ndjson) from logs directory (optionally limit)."""
+    with SessionCatalog(LOG_DIR) as catalog:
+        catalog.update()
+        files = [r["filename"] for r in catalog.list()]
     sessions = []
     for i, fn in enumerate(files):
         if limit and i >= limit:
             break
         path = os.path.join(LOG_DIR, fn)
-        with open(path, "r") as f:
-            try:
-                sessions.append(json.load(f))
-            except Exception:
-                continue
+        try:
+            sessions.append(load_session_packets(path))
+        except Exception:
+            continue
     return sessions
 
 def build_segment_database(sessions):
@@ -35,82 +42,43 @@ def build_segment_database(sessions):
     Sessions missing required fields ("true", "track_index", "gps") are skipped.
 
     Returns:
-        db: dict[track_index] = list of (feature_vec, action_vec, lap_time)
+        db: SegmentStore — features (N, 4), actions (N, 3) and lap_time (N,)
+            sorted by track_index, with per-segment offsets
     """
-    db = defaultdict(list)
-
-    for sess_i, session in enumerate(sessions):
-
-        # Skip empty sessions
-        if not session:
-            print(f"⚠️ Skipping empty session #{sess_i}")
-            continue
-
-        # Check Stage-1 structure
-        if not all(
-            ("true" in r and
-             "track_index" in r and
-             "gps" in r and
-             "lap" in r)
-            for r in session
-        ):
-            print(f"⚠️ Skipping older session #{sess_i}: missing Stage-1 fields")
-            continue
-
-        # Determine max track index
-        max_idx = max(r["track_index"] for r in session) or 1
-
-        # Estimate lap time
-        try:
-            lap_time = session[-1]["t"] - session[0]["t"]
-        except:
-            lap_time = None
-
-        # Build DB records
-        for r in session:
-            idx = r["track_index"]
-            lap_progress = idx / max_idx
-
-            # feature vector
-            f = [
-                r["true"].get("speed_kmh", 0),
-                r["true"].get("coolant_temp", 0),
-                r["true"].get("yaw_deg", 0),
-                lap_progress
-            ]
-
-            # action vector
-            a = [
-                r["true"].get("throttle", 0),
-                r["true"].get("brake_cmd", 0),
-                r["true"].get("steering", 0)
-            ]
-
-            db[idx].append((f, a, lap_time))
-
-    print(f"📘 Database built with {sum(len(v) for v in db.values())} samples "
+    db = SegmentStore.from_sessions(sessions)
+    print(f"📘 Database built with {db.n_samples} samples "
           f"from {len(sessions)} sessions")
     return db
 
+def load_segment_store(limit=None):
+    """
+    Segment database for LOG_DIR without re-reading every log: the store
+    saved in data/store/segments.npz is updated with new or changed logs
+    only (and saved again). With `limit`, an in-memory store of the first
+    `limit` Stage-1 sessions is built instead.
+    """
+    if limit:
+        db = SegmentStore()
+        db.update_from_logs(LOG_DIR, limit=limit)
+        return db
+    db = SegmentStore.open(SEGMENT_STORE_PATH)
+    db.update_from_logs(LOG_DIR)
+    if db.dirty:
+        db.save()
+    return db
+
 def best_action_per_segment_by_best_lap(db):
     """
     Simple policy: choose, for each segment, action tuple from the record that came from the fastest lap (smallest lap_time).
     If lap_time not available, choose mean action.
     """
+    best_rows = db.argmin_per_segment(db.lap_time)
+    mean_actions = db.reduce_mean(db.actions)
+    actions = db.actions
     policy = {}
-    for idx, records in db.items():
-        # records: list of (f, a, lap_time)
-        # filter records with lap_time
-        with_time = [rec for rec in records if rec[2] is not None]
-        if with_time:
-            best = min(with_time, key=lambda r: r[2])
-            policy[idx] = best[1]  # action vector
-        else:
-            # fallback mean
-            ths = [r[1][0] for r in records]
-            brs = [r[1][1] for r in records]
-            sts = [r[1][2] for r in records]
-            policy[idx] = [mean(ths), mean(brs), mean(sts)]
+    for k, idx in enumerate(db.segments.tolist()):
+        a = actions[best_rows[k]] if best_rows[k] >= 0 else mean_actions[k]
+        policy[idx] = [round(float(x), 6) for x in a]
     return policy
 
 def train_regressors_per_action(db, max_samples_per_segment=1000):
@@ -127,21 +95,18 @@ def train_regressors_per_action(db, max_samples_per_segment=1000):
     models['brake'] = {}
     models['steer'] = {}
 
-    for idx, records in db.items():
-        # sample up to max_samples
-        recs = records if len(records) <= max_samples_per_segment else records[:max_samples_per_segment]
-        X = np.array([r[0] for r in recs])
-        Y_th = np.array([r[1][0] for r in recs])
-        Y_br = np.array([r[1][1] for r in recs])
-        Y_st = np.array([r[1][2] for r in recs])
+    for idx, seg in db.items():
+        # first max_samples rows of the segment (views, no copy)
+        X = seg["features"][:max_samples_per_segment]
+        Y = seg["actions"][:max_samples_per_segment]
         # train small RFs
         m_th = RandomForestRegressor(n_estimators=40, max_depth=6, random_state=42)
         m_br = RandomForestRegressor(n_estimators=40, max_depth=6, random_state=42)
         m_st = RandomForestRegressor(n_estimators=40, max_depth=6, random_state=42)
         try:
-            m_th.fit(X, Y_th)
-            m_br.fit(X, Y_br)
-            m_st.fit(X, Y_st)
+            m_th.fit(X, Y[:, 0])
+            m_br.fit(X, Y[:, 1])
+            m_st.fit(X, Y[:, 2])
             models['throttle'][idx] = m_th
             models['brake'][idx] = m_br
             models['steer'][idx] = m_st
@@ -150,14 +115,78 @@ def train_regressors_per_action(db, max_samples_per_segment=1000):
             continue
     return models
 
+class GlobalPolicyModel:
+    """
+    One multi-output RandomForest for the whole track: state vector
+    (speed_kmh, coolant_temp, yaw_deg, lap_progress) → [throttle, brake, steer].
+
+    Track position enters through lap_progress, so a single forest
+    replaces the three forests per track index of
+    train_regressors_per_action(), and a tick costs one predict() call.
+    """
+
+    def __init__(self, model, meta: dict = None):
+        self.model = model
+        self.meta = meta or {}
+        self._compiled = None
+
+    @classmethod
+    def fit(cls, db, n_estimators=60, max_depth=14, min_samples_leaf=3,
+            max_samples=200_000, n_jobs=-1, seed=42):
+        """
+        Train on every sample of a SegmentStore (randomly subsampled to
+        `max_samples` rows); n_jobs trees are grown in parallel.
+        """
+        if not SKLEARN_AVAILABLE:
+            raise RuntimeError("scikit-learn not available. Install scikit-learn to use regression policy.")
+        X, Y = db.features, db.actions
+        if len(X) > max_samples:
+            rows = np.sort(np.random.default_rng(seed).choice(len(X), max_samples, replace=False))
+            X, Y = X[rows], Y[rows]
+        model = RandomForestRegressor(
+            n_estimators=n_estimators, max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+            n_jobs=n_jobs, random_state=seed,
+        )
+        model.fit(X, Y)
+        model.n_jobs = 1        # single-row live predictions: no thread pool overhead
+        meta = {"features": list(FEATURES), "actions": list(ACTIONS),
+                "n_samples": int(len(X)), "n_segments": int(len(db.segments))}
+        return cls(model, meta)
+
+    def predict(self, X) -> np.ndarray:
+        """(n, 4) states → (n, 3) clipped actions (NumPy-compiled trees, no sklearn call)."""
+        if self._compiled is None:
+            self._compiled = CompiledForest(self.model)
+        Y = self._compiled.predict(np.asarray(X, dtype=np.float32).reshape(-1, len(FEATURES)))
+        return np.clip(Y, ACTION_LO, ACTION_HI)
+
+    def predict_one(self, state_vector) -> list:
+        return [float(x) for x in self.predict([state_vector])[0]]
+
+    def save(self, path=MODEL_PATH) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump({"model": self.model, "meta": self.meta}, path)
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH) -> "GlobalPolicyModel":
+        if not SKLEARN_AVAILABLE:
+            raise RuntimeError("scikit-learn not available. Install scikit-learn to use regression policy.")
+        data = joblib.load(path)
+        return cls(data["model"], data.get("meta"))
+
+
 def recommend_action_segment(segment_idx, state_vector, policy_segment_db=None, models=None):
     """
     Recommend [throttle, brake, steer] for single segment.
+    - if models is a GlobalPolicyModel -> one predict on the state vector
     - if models provided and has model for index -> use models
     - else if policy_segment_db provided -> return stored action
     - else fallback zeros
     state_vector is feature vector with same ordering used during training
     """
+    if isinstance(models, GlobalPolicyModel) and state_vector is not None:
+        return models.predict_one(state_vector)
     if models:
         try:
             th = models['throttle'][segment_idx].predict([state_vector])[0]
@@ -230,17 +259,30 @@ def load_driver_policy(driver_id="driver_normal"):
 # -----------------------------------------------------------
 # TRAIN MODELS WRAPPER
 # -----------------------------------------------------------
-def train_models(db):
+def train_models(db, mode="segment", n_jobs=-1, save_path=None):
     """
     Simulator expects train_models(db).
-    We map this to your existing RandomForest-based trainer.
+
+    mode="segment" — the RandomForest-per-track-index trainer (default)
+    mode="global"  — one multi-output GlobalPolicyModel (saved to
+                     save_path only if given)
     """
     if not SKLEARN_AVAILABLE:
         print("⚠️ scikit-learn not installed — cannot train regression models.")
         return None
 
-    print("📘 Training regressors per segment…")
-    return train_regressors_per_action(db)
+    if mode == "segment":
+        print("📘 Training regressors per segment…")
+        return train_regressors_per_action(db)
+    if mode != "global":
+        raise ValueError(f"Unknown model mode: {mode}. Choose 'global' or 'segment'")
+
+    print(f"📘 Training global model on {db.n_samples} samples…")
+    model = GlobalPolicyModel.fit(db, n_jobs=n_jobs)
+    if save_path:
+        model.save(save_path)
+        print(f"💾 Model saved to {save_path}")
+    return model
 
 
 # -----------------------------------------------------------
@@ -257,6 +299,8 @@ def choose_action_from_policy(policy, segment_idx=None, state_vector=None, model
     """
 
     # ML-based throttle/brake models (not segment-specific in this simple wrapper)
+    if policy.get("type") == "ml" and isinstance(models, GlobalPolicyModel) and state_vector is not None:
+        return tuple(models.predict_one(state_vector))
     if policy.get("type") == "ml" and models:
         try:
             # Use throttle model as example (you can extend)
@@ -274,7 +318,6 @@ def choose_action_from_policy(policy, segment_idx=None, state_vector=None, model
 
     # Fallback heuristic behaviour
     if policy["type"] == "heuristic":
-        import random
         throttle = policy["throttle_base"] + random.uniform(-0.05, 0.05)
         brake = policy["brake_base"] + random.uniform(-0.02, 0.02)
         steering = random.uniform(-policy["steer_var"], policy["steer_var"])
@@ -333,3 +376,27 @@ def choose_action_from_policy(policy, segment_idx=None, state_vector=None, model
 #             ]
 #             db[idx].append((f, a, lap_time))
 #     return db
+
+
+# -----------------------------------------------------------
+# CLI — train and save the global model
+# -----------------------------------------------------------
+def cli():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Train the global recommender model from data/logs")
+    parser.add_argument("--limit-sessions", type=int, default=None)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel tree building (-1 = all cores)")
+    parser.add_argument("--out", type=str, default=MODEL_PATH)
+    args = parser.parse_args()
+
+    db = load_segment_store(limit=args.limit_sessions)
+    t0 = time.perf_counter()
+    model = train_models(db, mode="global", n_jobs=args.n_jobs, save_path=args.out)
+    if model is not None:
+        print(f"✅ Trained in {time.perf_counter() - t0:.1f}s on {model.meta['n_samples']} samples "
+              f"({model.meta['n_segments']} segments)")
+
+
+if __name__ == "__main__":
+    cli()
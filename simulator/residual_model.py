@@ -39,6 +39,7 @@ except ImportError:
 
 from simulator.calibrate_from_f1 import load_lap_file, extract_speed_trace, extract_throttle_brake_trace, run_simulated_lap
 from utils.config_loader import load_yaml
+from utils.session_log import list_session_files
 
 CAR_CONFIG_PATH = os.path.join(ROOT, "configs", "car_simple.yaml")
 
@@ -304,8 +305,7 @@ def train_residual_from_logs(
     all_features = []
     all_targets = []
 
-    json_files = [f for f in os.listdir(log_dir) if f.endswith(".json")]
-    for fname in json_files:
+    for fname in list_session_files(log_dir):
         fpath = os.path.join(log_dir, fname)
         try:
             packets = load_lap_file(fpath)
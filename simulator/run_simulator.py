@@ -13,6 +13,7 @@ from simulator.sensors.coolant_temp import CoolantTempSimulator
 from simulator.sensors.wheel_speed import WheelSpeedSimulator
 from simulator.sensors.brake_pressure import BrakePressureSimulator
 from simulator.sensors.imu import IMUSimulator
+from utils.session_log import SessionLogWriter
 
 coolant = CoolantTempSimulator()
 wheels = WheelSpeedSimulator()
@@ -23,10 +24,10 @@ imu = IMUSimulator()
 log_path = os.path.join(ROOT, "data", "logs")
 os.makedirs(log_path, exist_ok=True)
 
-session_name = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+session_name = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
 session_file = os.path.join(log_path, session_name)
 
-session_log = []
+session_log = SessionLogWriter(session_file)
 
 print("\n▶️ Starting FSAE Telemetry Simulator (10 Hz)...")
 print("Press CTRL+C to stop.\n")
@@ -50,8 +51,6 @@ try:
 
             # Save for replay
             session_log.append(data)
-            with open(session_file, "w") as f:
-                json.dump(session_log, f, indent=2)
 
             # Update tqdm bar
             pbar.update(1)
@@ -62,3 +61,6 @@ try:
 except KeyboardInterrupt:
     print("\n\n🛑 Simulator stopped by user (CTRL+C).")
     print(f"📁 Session saved to: {session_file}\n")
+
+finally:
+    session_log.close()
@@ -10,7 +10,8 @@ from tqdm import tqdm
 
 # config utils
 from utils.config_loader import load_yaml
-from utils.json_writer import write_realtime_json, write_session_log
+from utils.json_writer import write_realtime_json
+from utils.session_log import SessionLogWriter
 
 # track & driver
 from simulator.track_loader import generate_oval_track
@@ -69,9 +70,9 @@ track = generate_custom_track(
 #track = generate_oval_track(n_points=400, a=120.0, b=60.0)
 gps = GPSMock(track)
 
-session = []
-session_name = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+session_name = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
 session_path = os.path.join(LOG_DIR, session_name)
+session_log = SessionLogWriter(session_path)
 
 print("Starting Option A (Simplified Physics) simulator. Ctrl+C to stop.")
 try:
@@ -124,8 +125,7 @@ try:
 
         # persist
         write_realtime_json(os.path.join(DATA_DIR, "realtime.json"), packet)
-        session.append(packet)
-        write_session_log(session_path, session)
+        session_log.append(packet)
 
         # progress
         step += 1
@@ -141,4 +141,5 @@ try:
 except KeyboardInterrupt:
     print("\nSimulator stopped by user.")
 finally:
+    session_log.close()
     print(f"Session saved: {session_path}")
@@ -12,7 +12,8 @@ from tqdm import tqdm
 
 # config utils
 from utils.config_loader import load_yaml
-from utils.json_writer import write_realtime_json, write_session_log
+from utils.json_writer import write_realtime_json
+from utils.session_log import SessionLogWriter
 
 # track & driver
 from simulator.track_loader import generate_oval_track
@@ -76,9 +77,9 @@ track = generate_custom_track(
 gps = GPSMock(track)
 
 # log
-session = []
-session_name = f"race_session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+session_name = f"race_session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
 session_path = os.path.join(LOG_DIR, session_name)
+session_log = SessionLogWriter(session_path)
 
 # --------------------------------------------------------------------
 # Progress Bar (laps)
@@ -149,8 +150,7 @@ try:
 
         # write realtime + append log
         write_realtime_json(os.path.join(DATA_DIR, "realtime.json"), packet)
-        session.append(packet)
-        write_session_log(session_path, session)
+        session_log.append(packet)
 
         # time stepping
         t += dt
@@ -160,6 +160,7 @@ except KeyboardInterrupt:
     print("\n🛑 Simulation manually stopped by user.")
 
 finally:
+    session_log.close()
     pbar.close()
     print(f"💾 Session saved to {session_path}")
     print("🏁 Simulation finished.")
@@ -7,17 +7,20 @@ ROOT = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(ROOT)
 
 # Utils
-from utils.json_writer import write_session_log, write_realtime_json
+from utils.session_log import SessionLogWriter
+from utils.telemetry_bus import TelemetryPublisher
+from utils.telemetry_ring import TelemetryRing
 from utils.config_loader import load_yaml
 
 # Driver + Recommender
 from simulator.driver_profiles import simple_lap_profile
+from simulator.policy_inference import PolicyInference
 from simulator.recommender import (
     load_driver_policy,
     load_all_sessions,
     build_segment_database,
     train_models,              # wrapper in recommender.py
-    choose_action_from_policy  # wrapper in recommender.py
+    GlobalPolicyModel,
 )
 
 # Track
@@ -51,6 +54,12 @@ parser.add_argument("--driver-id", type=str, default="driver_normal")
 parser.add_argument("--target-laps", type=int, default=5)
 parser.add_argument("--use-policy", action="store_true")
 parser.add_argument("--train-models", action="store_true")
+parser.add_argument("--model-mode", type=str, default="segment", choices=["segment", "global"],
+                    help="segment: RandomForests per track index; global: one multi-output model")
+parser.add_argument("--model-path", type=str, default=None,
+                    help="Global model file: loaded instead of training, or with --train-models "
+                         "--model-mode global, where the trained model is saved")
+parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel training jobs")
 parser.add_argument("--limit-sessions", type=int, default=None)
 
 parser.add_argument("--track", type=str, default=None,
@@ -59,6 +68,10 @@ parser.add_argument("--track", type=str, default=None,
 parser.add_argument("--progress-file", type=str, default="data/sim_progress.json",
                     help="Path to progress JSON (absolute or relative)")
 
+parser.add_argument("--realtime-file", action="store_true",
+                    help="Also write data/realtime.json every tick (fallback for file-polling readers)")
+parser.add_argument("--ring-seconds", type=float, default=120.0,
+                    help="Seconds of history kept in the shared-memory ring for live charts (0 = off)")
 parser.add_argument("--data-dir", type=str, default=None)
 parser.add_argument("--track-dir", type=str, default=None)
 parser.add_argument("--log-dir", type=str, default=None)
@@ -172,9 +185,14 @@ aero = AeroModel(
 # -------------------------------------------------------------
 # Prepare logging
 # -------------------------------------------------------------
-session = []
-session_name = f"race_session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+session_name = f"race_session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
 session_path = os.path.join(LOG_DIR, session_name)
+session_log = SessionLogWriter(session_path)
+
+# Live packets go to the telemetry bus; realtime.json only on request
+bus = TelemetryPublisher(fallback_path=os.path.join(DATA_DIR, "realtime.json") if args.realtime_file else None)
+# Recent history for live charts, shared with every dashboard process
+ring = TelemetryRing.create(capacity=int(args.ring_seconds / dt)) if args.ring_seconds > 0 else None
 
 
 # -------------------------------------------------------------
@@ -201,15 +219,21 @@ if args.train_models:
     sessions = load_all_sessions(limit=args.limit_sessions)
     db = build_segment_database(sessions)
     print("📘 Training models…")
-    models = train_models(db)
+    models = train_models(db, mode=args.model_mode, n_jobs=args.n_jobs,
+                          save_path=args.model_path if args.model_mode == "global" else None)
+elif args.model_path:
+    models = GlobalPolicyModel.load(args.model_path)
+    print(f"📘 Loaded global model from {args.model_path}")
 
 
 # -------------------------------------------------------------
 # Load recommender policy (optional)
 # -------------------------------------------------------------
 policy = None
+infer = None
 if args.use_policy:
     policy = load_driver_policy(args.driver_id)
+    infer = PolicyInference(policy, models=models)
     print(f"🤖 Using learned / heuristic driver policy: {args.driver_id}")
 
 
@@ -232,13 +256,12 @@ try:
         # -----------------------------
         #  Driver control logic
         # -----------------------------
-        if policy is not None:
-            # Our choose_action_from_policy in recommender.py
-            throttle, brake_cmd, steering = choose_action_from_policy(
-                policy=policy,
-                segment_idx=None,        # could pass gps index here later
-                state_vector=None,
-                models=models,
+        if infer is not None:
+            # Compiled policy (policy_inference.py): choose_action_from_policy's decision order,
+            # but segment tables also match the string keys of JSON-loaded policies
+            lap_progress = gps.index / max(gps.N - 1, 1)
+            throttle, brake_cmd, steering = infer.act(
+                gps.index, (v_ms * 3.6, coolant, yaw_deg, lap_progress)
             )
         else:
             # fallback: simple temporal profile
@@ -314,9 +337,10 @@ try:
 
 
         # Realtime + log
-        write_realtime_json(os.path.join(DATA_DIR, "realtime.json"), packet)
-        session.append(packet)
-        write_session_log(session_path, session)
+        bus.publish(packet)
+        if ring is not None:
+            ring.push(packet)
+        session_log.append(packet)
 
         # Step time
         t += dt
@@ -326,8 +350,15 @@ except KeyboardInterrupt:
     print("🛑 Interrupted by user")
 
 finally:
+    session_log.close()
+    bus.close()
+    if ring is not None:
+        ring.close()
     pbar.close()
     print(f"💾 Session saved to {session_path}")
+    if infer is not None:
+        lat = infer.latency()
+        print(f"🤖 Policy inference: p50 {lat['p50_us']:.0f} µs, p99 {lat['p99_us']:.0f} µs over {lat['calls']} steps")
 
 
 # # -------------------------------------------------------------
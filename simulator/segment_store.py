@@ -0,0 +1,387 @@
+# simulator/segment_store.py
+"""
+Dense per-segment database of (features, actions, lap time) samples.
+
+build_segment_database() used to return db[track_index] = list of
+(feature_list, action_list, lap_time) tuples, one Python tuple per
+packet, which every consumer then turned back into arrays. SegmentStore
+keeps the same samples as contiguous arrays sorted by track_index:
+
+    track_index  (N,)    int32
+    features     (N, 4)  float32   speed_kmh, coolant_temp, yaw_deg, lap_progress
+    actions      (N, 3)  float32   throttle, brake_cmd, steering
+    lap_time     (N,)    float64   NaN when unknown
+    session      (N,)    int32     index into store.sources
+    segments     (S,)    int32     distinct track indices, sorted
+    offsets      (S+1,)  int64     samples of segments[k] are [offsets[k], offsets[k+1])
+
+Sessions are appended in chunks and merged (stable sort) on first read,
+so samples of a segment stay in insertion order. update_from_logs()
+appends only new session logs, drops rows of changed or deleted ones,
+and the store saves to / loads from an uncompressed .npz.
+
+Usage:
+    from simulator.segment_store import SegmentStore
+
+    store = SegmentStore.from_sessions(sessions)            # packet lists
+    store = SegmentStore.open()                              # data/store/segments.npz
+    store.update_from_logs()                                 # new logs only
+    store.save()
+
+    seg = store.segment(42)              # {"features", "actions", "lap_time"} arrays
+    means = store.reduce_mean(store.actions)                 # (S, 3)
+    p75 = store.percentile(store.features[:, 0], 75)         # (S,)
+"""
+
+import os
+import sys
+import json
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+FEATURES = ("speed_kmh", "coolant_temp", "yaw_deg", "lap_progress")
+ACTIONS = ("throttle", "brake_cmd", "steering")
+
+LOG_DIR = os.path.join(ROOT, "data", "logs")
+SEGMENT_STORE_PATH = os.path.join(ROOT, "data", "store", "segments.npz")
+
+# Bump when the sample layout or feature definitions change.
+SEGMENT_STORE_VERSION = 1
+_META_KEY = "__meta__"
+
+# Columnar-store channels read by update_from_logs() and the live recommender
+STORE_CHANNELS = ("t", "track_index", "true_speed_kmh", "true_coolant_temp", "true_yaw_deg",
+                  "true_throttle", "true_brake_cmd", "true_steering")
+
+
+def _is_stage1(session: list) -> bool:
+    return all("true" in r and "track_index" in r and "gps" in r and "lap" in r for r in session)
+
+
+def session_arrays(session: list) -> dict:
+    """
+    Sample arrays for one Stage-1 session (packet list).
+
+    lap_time is the session's duration (last t - first t), the value the
+    dict-of-lists database stored with every sample.
+    """
+    trues = [r["true"] for r in session]
+    idx = np.array([r["track_index"] for r in session], dtype=np.int32)
+    max_idx = int(idx.max()) or 1
+
+    def _col(key):
+        return np.array([t.get(key, 0) for t in trues], dtype=np.float32)
+
+    try:
+        lap_time = float(session[-1]["t"] - session[0]["t"])
+    except (KeyError, TypeError):
+        lap_time = np.nan
+
+    return {
+        "track_index": idx,
+        "features": np.column_stack([_col("speed_kmh"), _col("coolant_temp"), _col("yaw_deg"),
+                                     (idx / max_idx).astype(np.float32)]),
+        "actions": np.column_stack([_col("throttle"), _col("brake_cmd"), _col("steering")]),
+        "lap_time": np.full(len(idx), lap_time),
+    }
+
+
+def columns_arrays(cols: dict) -> dict:
+    """session_arrays() from utils.session_store channel arrays (no JSON parsing)."""
+    keep = cols["track_index"] >= 0
+    idx = cols["track_index"][keep].astype(np.int32)
+    max_idx = int(idx.max()) if len(idx) else 0
+    max_idx = max_idx or 1
+
+    def _col(name):
+        return np.nan_to_num(cols[name][keep], nan=0.0).astype(np.float32)
+
+    t = cols["t"][keep]
+    lap_time = float(t[-1] - t[0]) if len(t) and np.isfinite(t[[0, -1]]).all() else np.nan
+    return {
+        "track_index": idx,
+        "features": np.column_stack([_col("true_speed_kmh"), _col("true_coolant_temp"), _col("true_yaw_deg"),
+                                     (idx / max_idx).astype(np.float32)]),
+        "actions": np.column_stack([_col("true_throttle"), _col("true_brake_cmd"), _col("true_steering")]),
+        "lap_time": np.full(len(idx), lap_time),
+    }
+
+
+class SegmentStore:
+    def __init__(self, path: str = None):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Default location for save().
+        """
+        self.path = path
+        self.sources = []           # one dict per appended session: {filename, fingerprint} or {}
+        self._chunks = []           # pending arrays from append()
+        self._dirty = False
+        self._set_arrays(
+            np.zeros(0, np.int32), np.zeros((0, len(FEATURES)), np.float32),
+            np.zeros((0, len(ACTIONS)), np.float32), np.zeros(0), np.zeros(0, np.int32),
+        )
+
+    def _set_arrays(self, track_index, features, actions, lap_time, session):
+        self._track_index = track_index
+        self._features = features
+        self._actions = actions
+        self._lap_time = lap_time
+        self._session = session
+        self._segments, starts = np.unique(track_index, return_index=True)
+        self._offsets = np.append(starts, len(track_index)).astype(np.int64)
+
+    # ------------------------------------------------------------------
+    #  BUILD / APPEND
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_sessions(cls, sessions: list, verbose: bool = True) -> "SegmentStore":
+        """Build from packet lists; sessions without Stage-1 fields are skipped."""
+        store = cls()
+        for i, session in enumerate(sessions):
+            if not session:
+                if verbose:
+                    print(f"⚠️ Skipping empty session #{i}")
+                continue
+            if not _is_stage1(session):
+                if verbose:
+                    print(f"⚠️ Skipping older session #{i}: missing Stage-1 fields")
+                continue
+            store.append(session_arrays(session))
+        return store
+
+    def append(self, arrays: dict, source: dict = None):
+        """Queue one session's arrays (see session_arrays); merged on next read."""
+        n = len(arrays["track_index"])
+        sid = len(self.sources)
+        self.sources.append(dict(source or {}))
+        if n:
+            self._chunks.append((arrays, np.full(n, sid, dtype=np.int32)))
+        self._dirty = True
+
+    def append_session(self, session: list, source: dict = None) -> bool:
+        """Append a packet list; returns False if it is not a Stage-1 session."""
+        if not session or not _is_stage1(session):
+            return False
+        self.append(session_arrays(session), source)
+        return True
+
+    def _merge(self):
+        if not self._chunks:
+            return
+        parts = [(self._track_index, self._features, self._actions, self._lap_time, self._session)]
+        parts += [(a["track_index"], a["features"], a["actions"], a["lap_time"], sid) for a, sid in self._chunks]
+        self._chunks = []
+        track_index, features, actions, lap_time, session = (np.concatenate(col) for col in zip(*parts))
+        order = np.argsort(track_index, kind="stable")
+        self._set_arrays(track_index[order], features[order], actions[order], lap_time[order], session[order])
+
+    def drop_sessions(self, session_ids):
+        """Remove every sample of the given sessions (their sources entries become {})."""
+        self._merge()
+        drop = np.isin(self._session, np.asarray(list(session_ids), dtype=np.int32))
+        for sid in session_ids:
+            self.sources[sid] = {}
+        if drop.any():
+            keep = ~drop
+            self._set_arrays(self._track_index[keep], self._features[keep], self._actions[keep],
+                             self._lap_time[keep], self._session[keep])
+            self._dirty = True
+
+    def update_from_logs(self, log_dir: str = LOG_DIR, limit: int = None) -> dict:
+        """
+        Sync with the Stage-1 logs in log_dir (via the session catalog).
+
+        New logs are appended through the columnar store (no JSON parsing
+        when data/store is fresh); logs whose fingerprint changed are
+        re-read, deleted logs are dropped.
+
+        Returns
+        -------
+        dict — counts of added / unchanged / removed / failed sessions
+        """
+        from utils.session_catalog import SessionCatalog
+        from utils.session_store import load_session_columns
+
+        with SessionCatalog(log_dir) as catalog:
+            catalog.update()
+            rows = catalog.list(schema="stage1")
+        if limit:
+            rows = rows[:limit]
+
+        current = {r["filename"]: r["fingerprint"] for r in rows}
+        known = {s["filename"]: (sid, s["fingerprint"]) for sid, s in enumerate(self.sources) if s}
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+
+        stale = []
+        for fn, (sid, fp) in known.items():
+            if fn not in current:
+                counts["removed"] += 1
+                stale.append(sid)
+            elif current[fn] != fp:
+                stale.append(sid)
+        if stale:
+            self.drop_sessions(stale)
+
+        for r in rows:
+            fn = r["filename"]
+            if fn in known and known[fn][1] == r["fingerprint"]:
+                counts["unchanged"] += 1
+                continue
+            try:
+                cols = load_session_columns(os.path.join(log_dir, fn), channels=list(STORE_CHANNELS))
+                self.append(columns_arrays(cols), {"filename": fn, "fingerprint": r["fingerprint"]})
+                counts["updated" if fn in known else "added"] += 1
+            except Exception:
+                counts["failed"] += 1
+        return counts
+
+    # ------------------------------------------------------------------
+    #  ACCESS
+    # ------------------------------------------------------------------
+
+    def _get(self, name):
+        self._merge()
+        return getattr(self, name)
+
+    track_index = property(lambda self: self._get("_track_index"))
+    features = property(lambda self: self._get("_features"))
+    actions = property(lambda self: self._get("_actions"))
+    lap_time = property(lambda self: self._get("_lap_time"))
+    session = property(lambda self: self._get("_session"))
+    segments = property(lambda self: self._get("_segments"))
+    offsets = property(lambda self: self._get("_offsets"))
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Samples per segment, aligned with .segments."""
+        return np.diff(self.offsets)
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.track_index)
+
+    @property
+    def n_sessions(self) -> int:
+        return len(np.unique(self.session))
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __contains__(self, track_index) -> bool:
+        segs = self.segments
+        k = int(np.searchsorted(segs, track_index))
+        return k < len(segs) and segs[k] == track_index
+
+    def slice(self, track_index) -> slice:
+        """Row range of one segment (empty slice if absent)."""
+        segs, offsets = self.segments, self.offsets
+        k = int(np.searchsorted(segs, track_index))
+        if k < len(segs) and segs[k] == track_index:
+            return slice(int(offsets[k]), int(offsets[k + 1]))
+        return slice(0, 0)
+
+    def segment(self, track_index) -> dict:
+        """Views of one segment's features, actions and lap times."""
+        s = self.slice(track_index)
+        return {"features": self.features[s], "actions": self.actions[s], "lap_time": self.lap_time[s]}
+
+    def items(self):
+        """(track_index, segment dict) for every segment, in track order."""
+        for idx in self.segments.tolist():
+            yield idx, self.segment(idx)
+
+    # ------------------------------------------------------------------
+    #  GROUPED REDUCTIONS (one vectorised pass over all segments)
+    # ------------------------------------------------------------------
+
+    def reduce_mean(self, values: np.ndarray) -> np.ndarray:
+        """Per-segment mean of a row-aligned (N,) or (N, k) array → (S,) / (S, k)."""
+        if len(self.segments) == 0:
+            return np.zeros((0,) + np.shape(values)[1:])
+        sums = np.add.reduceat(np.asarray(values, dtype=np.float64), self.offsets[:-1], axis=0)
+        counts = self.counts
+        return sums / (counts[:, None] if sums.ndim == 2 else counts)
+
+    def percentile(self, values: np.ndarray, q: float) -> np.ndarray:
+        """Per-segment q-th percentile (linear interpolation, as np.percentile) → (S,)."""
+        if len(self.segments) == 0:
+            return np.zeros(0)
+        values = np.asarray(values, dtype=np.float64)
+        seg_id = np.repeat(np.arange(len(self.segments)), self.counts)
+        v = values[np.lexsort((values, seg_id))]
+        start, n = self.offsets[:-1], self.counts
+        h = (n - 1) * (q / 100.0)
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, n - 1)
+        return v[start + lo] + (h - lo) * (v[start + hi] - v[start + lo])
+
+    def argmin_per_segment(self, values: np.ndarray) -> np.ndarray:
+        """
+        Row of the first minimum of `values` in each segment (NaN ignored);
+        -1 for segments where every value is NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        seg_id = np.repeat(np.arange(len(self.segments)), self.counts)
+        rows = np.arange(len(values))
+        order = np.lexsort((rows, values, seg_id))     # NaN sorts last within a segment
+        first = order[self.offsets[:-1]] if len(values) else np.zeros(0, np.int64)
+        return np.where(np.isnan(values[first]), -1, first)
+
+    # ------------------------------------------------------------------
+    #  PERSISTENCE
+    # ------------------------------------------------------------------
+
+    def save(self, path: str = None) -> str:
+        """Write an uncompressed .npz (to .tmp, then replaced)."""
+        from utils.json_writer import _ensure_dir
+        path = path or self.path or SEGMENT_STORE_PATH
+        _ensure_dir(path)
+        self._merge()
+        meta = {
+            "version": SEGMENT_STORE_VERSION,
+            "features": list(FEATURES),
+            "actions": list(ACTIONS),
+            "sources": self.sources,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, track_index=self._track_index, features=self._features, actions=self._actions,
+                     lap_time=self._lap_time, session=self._session,
+                     **{_META_KEY: np.array(json.dumps(meta))})
+        os.replace(tmp, path)
+        self.path = path
+        self._dirty = False
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SegmentStore":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z[_META_KEY]))
+            if meta.get("version") != SEGMENT_STORE_VERSION:
+                raise ValueError(f"{path}: segment store version {meta.get('version')}, "
+                                 f"expected {SEGMENT_STORE_VERSION}")
+            store = cls(path)
+            store._set_arrays(z["track_index"], z["features"], z["actions"], z["lap_time"], z["session"])
+        store.sources = meta["sources"]
+        return store
+
+    @classmethod
+    def open(cls, path: str = SEGMENT_STORE_PATH) -> "SegmentStore":
+        """Load the store at path, or an empty one if it is missing or outdated."""
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError):
+            return cls(path)
+
+    @property
+    def dirty(self) -> bool:
+        """True if samples changed since the last save()/load()."""
+        return self._dirty
@@ -0,0 +1,552 @@
+"""
+Setup sweep / design-of-experiments engine.
+
+Answers "what if downforce_coeff, mass or max_engine_force change?"
+without hand-editing configs/car_simple.yaml. A sweep is a list of
+setups (overrides of car_simple.yaml keys) built as a full-factorial grid
+or a Latin hypercube, evaluated with LapTimeSimulator across a process
+pool and streamed into a CSV table:
+
+  - lap time, average / top speed
+  - corner speeds (slowest apex, mean apex)
+  - fuel use per lap (throttle implied by the speed profile)
+
+Every finished row is appended to the CSV as soon as its chunk returns,
+so an interrupted sweep resumes where it stopped: setups already in the
+table are skipped. A sidecar <out>.meta.json records the solver, track
+and base config; resuming against a different one is refused.
+
+With the "qss" solver (default) a chunk of setups is solved in one
+batched qss_speed_profile() call; "segments" runs simulate_optimal_lap()
+per setup.
+
+Parameter specs:
+    name=lo:hi:n      n evenly spaced values (grid) / range lo..hi (lhs)
+    name=a,b,c        explicit values (grid only)
+    name=v            a single value
+
+Usage:
+    # 5 × 4 grid of downforce vs drag on the FIA track, 4 processes
+    python -m simulator.setup_sweep --track-type fia \\
+        --param downforce_coeff=0.6:2.0:5 --param drag_coeff=0.6:1.2:4 --n-jobs 4
+
+    # 200-point Latin hypercube, resumable, with the Pareto front printed
+    python -m simulator.setup_sweep --design lhs --samples 200 --seed 1 \\
+        --param downforce_coeff=0.6:2.0 --param drag_coeff=0.6:1.2 \\
+        --param mass=190:230 --out data/sweeps/aero_lhs.csv --pareto
+
+    from simulator.setup_sweep import full_factorial, run_sweep, pareto_front
+    setups = full_factorial({"downforce_coeff": [0.8, 1.2, 1.6], "mass": [200, 220]})
+    rows = run_sweep(track, car_cfg, setups, n_jobs=4)
+    front = pareto_front(rows, ("lap_time_s", "fuel_kg"))
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.config_loader import load_yaml
+from utils.json_writer import _ensure_dir, atomic_write
+from simulator.lap_time_simulator import LapTimeSimulator, qss_speed_profile
+from simulator.physics.simple.aero import AeroModel
+
+SWEEP_DIR = os.path.join(ROOT, "data", "sweeps")
+
+# Result columns, after the swept parameters.
+RESULT_FIELDS = [
+    "lap_time_s",
+    "average_speed_kmh",
+    "top_speed_kmh",
+    "min_corner_kmh",
+    "mean_apex_kmh",
+    "fuel_kg",
+    "n_corners",
+    "error",
+]
+
+
+# ---------------------------------------------------------------------------
+#  DESIGNS
+# ---------------------------------------------------------------------------
+
+def parse_param_spec(spec: str) -> tuple:
+    """
+    "name=lo:hi:n" | "name=lo:hi" | "name=a,b,c" | "name=v"
+    → (name, {"values": [...]} or {"range": (lo, hi)})
+    """
+    if "=" not in spec:
+        raise ValueError(f"Bad parameter spec {spec!r}: expected name=values")
+    name, rhs = spec.split("=", 1)
+    name = name.strip()
+    if ":" in rhs:
+        parts = [float(x) for x in rhs.split(":")]
+        if len(parts) == 2:
+            return name, {"range": (parts[0], parts[1])}
+        if len(parts) == 3:
+            lo, hi, n = parts
+            return name, {"range": (lo, hi), "values": np.linspace(lo, hi, int(n)).tolist()}
+        raise ValueError(f"Bad range in {spec!r}: expected lo:hi or lo:hi:n")
+    return name, {"values": [float(x) for x in rhs.split(",")]}
+
+
+def full_factorial(space: dict) -> list:
+    """Every combination of {name: [values]} → list of setup dicts."""
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def latin_hypercube(bounds: dict, n_samples: int, seed: int = None) -> list:
+    """
+    Latin hypercube over {name: (lo, hi)}: each parameter's range is cut
+    into n_samples strata and every stratum is sampled exactly once.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(bounds)
+    setups = [{} for _ in range(n_samples)]
+    for name in names:
+        lo, hi = bounds[name]
+        u = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+        for setup, x in zip(setups, lo + u * (hi - lo)):
+            setup[name] = float(x)
+    return setups
+
+
+def setup_key(setup: dict) -> str:
+    """Stable identity of a setup (sorted keys, values rounded) for resuming."""
+    return json.dumps({k: round(float(v), 9) for k, v in sorted(setup.items())}, sort_keys=True)
+
+
+# ---------------------------------------------------------------------------
+#  EVALUATION
+# ---------------------------------------------------------------------------
+
+def setup_params(car_cfg: dict, setup: dict) -> dict:
+    """Base car config with the setup's overrides applied."""
+    params = dict(car_cfg)
+    params.update(setup)
+    return params
+
+
+def build_simulator(track: list, params: dict, solver: str = "qss") -> LapTimeSimulator:
+    """LapTimeSimulator whose aero and tyre grip follow `params` (not the CAR defaults)."""
+    aero = AeroModel(
+        downforce_coeff=params.get("downforce_coeff", 1.2),
+        aero_balance=params.get("aero_balance", 0.5),
+        drag_coeff=params.get("drag_coeff"),
+        frontal_area=params.get("frontal_area"),
+        air_density=params.get("air_density"),
+    )
+    return LapTimeSimulator(track, car_params=params, mu=params.get("tire_mu", 1.2),
+                            aero=aero, solver=solver)
+
+
+def lap_fuel_kg(speed_ms: np.ndarray, ds, params: dict) -> float:
+    """
+    Fuel burnt over one lap of a speed profile.
+
+    The throttle at each step is the tractive force the profile needs
+    (m·a + drag + rolling resistance) over max_engine_force, clipped to
+    0..1; fuel = fuel_consumption_rate · Σ throttle · dt, as in FuelModel.
+    """
+    v0 = np.asarray(speed_ms, dtype=float)
+    v1 = np.roll(v0, -1)
+    ds = np.broadcast_to(np.asarray(ds, dtype=float), v0.shape)
+
+    mass = params["mass"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dt = np.where(v0 + v1 > 0, 2.0 * ds / (v0 + v1), 0.0)
+        a = np.where(ds > 0, (v1 ** 2 - v0 ** 2) / (2.0 * ds), 0.0)
+    v_mid = 0.5 * (v0 + v1)
+    force = (
+        mass * a
+        + 0.5 * params["air_density"] * params["drag_coeff"] * params["frontal_area"] * v_mid ** 2
+        + params["rolling_resistance"] * mass * 9.81
+    )
+    throttle = np.clip(force / params["max_engine_force"], 0.0, 1.0)
+    return float(params.get("fuel_consumption_rate", 0.5) * np.sum(throttle * dt))
+
+
+def _corner_speeds(lts: LapTimeSimulator, v_points: np.ndarray) -> tuple:
+    """(slowest apex, mean apex) in km/h over the track's corners."""
+    apexes = [float(v_points[c["start_idx"]:c["end_idx"] + 1].min()) for c in lts._corners]
+    if not apexes:
+        return None, None
+    return min(apexes) * 3.6, float(np.mean(apexes)) * 3.6
+
+
+def _result_row(setup: dict, lts: LapTimeSimulator, lap_time: float,
+                v_points: np.ndarray, fuel_kg: float) -> dict:
+    min_corner, mean_apex = _corner_speeds(lts, v_points)
+    L = lts._track_length
+    return {
+        **setup,
+        "lap_time_s": round(float(lap_time), 4),
+        "average_speed_kmh": round(float(L / lap_time) * 3.6, 2) if lap_time > 0 else 0.0,
+        "top_speed_kmh": round(float(v_points.max()) * 3.6, 2),
+        "min_corner_kmh": round(min_corner, 2) if min_corner is not None else None,
+        "mean_apex_kmh": round(mean_apex, 2) if mean_apex is not None else None,
+        "fuel_kg": round(fuel_kg, 4),
+        "n_corners": len(lts._corners),
+        "error": None,
+    }
+
+
+def _error_row(setup: dict, err: Exception) -> dict:
+    row = {**setup, **{f: None for f in RESULT_FIELDS}}
+    row["error"] = f"{type(err).__name__}: {err}"
+    return row
+
+
+def evaluate_setups(track: list, car_cfg: dict, setups: list,
+                    solver: str = "qss", ds: float = 1.0) -> list:
+    """
+    Evaluate setups on one track.
+
+    With solver="qss" all setups share one distance resampling and are
+    solved in a single batched qss_speed_profile() call.
+
+    Returns
+    -------
+    list[dict] — one row per setup: the setup's parameters plus RESULT_FIELDS.
+    """
+    if not setups:
+        return []
+    if solver != "qss":
+        rows = []
+        for setup in setups:
+            try:
+                params = setup_params(car_cfg, setup)
+                lts = build_simulator(track, params, solver)
+                res = lts.simulate_optimal_lap()
+                v_points = np.asarray(res["speed_profile_kmh"]) / 3.6
+                fuel = lap_fuel_kg(v_points, lts.track.seg_lengths, params)
+                rows.append(_result_row(setup, lts, res["lap_time_s"], v_points, fuel))
+            except Exception as e:
+                rows.append(_error_row(setup, e))
+        return rows
+
+    sims, inputs, rows = [], [], [None] * len(setups)
+    for j, setup in enumerate(setups):
+        try:
+            params = setup_params(car_cfg, setup)
+            lts = build_simulator(track, params, solver)
+            sims.append((j, params, lts))
+            inputs.append(lts.qss_inputs(ds))
+        except Exception as e:
+            rows[j] = _error_row(setup, e)
+
+    if sims:
+        # Same track and ds → same stations for every setup.
+        v, lap_times = qss_speed_profile(
+            np.column_stack([q["v_limit"] for q in inputs]),
+            inputs[0]["ds"],
+            np.array([q["accel"] for q in inputs]),
+            np.array([q["brake"] for q in inputs]),
+            np.array([q["drag"] for q in inputs]),
+        )
+        s, step = inputs[0]["s"], inputs[0]["ds"]
+        for col, (j, params, lts) in enumerate(sims):
+            L = lts._track_length
+            v_points = np.interp(lts.track.cumulative_distance[:-1], s, v[:, col], period=L)
+            fuel = lap_fuel_kg(v[:, col], step, params)
+            rows[j] = _result_row(setups[j], lts, lap_times[col], v_points, fuel)
+    return rows
+
+
+# Per-process state for the pool (track / config are sent once, not per chunk).
+_WORKER = {}
+
+
+def _init_worker(track, car_cfg, solver, ds):
+    _WORKER.update(track=track, car_cfg=car_cfg, solver=solver, ds=ds)
+
+
+def _evaluate_chunk(setups: list) -> list:
+    return evaluate_setups(_WORKER["track"], _WORKER["car_cfg"], setups,
+                           solver=_WORKER["solver"], ds=_WORKER["ds"])
+
+
+# ---------------------------------------------------------------------------
+#  CHECKPOINTED SWEEP
+# ---------------------------------------------------------------------------
+
+def load_sweep_results(path: str) -> list:
+    """Rows of a sweep CSV, numeric fields parsed as fresh rows have them (empty cells → None)."""
+    if not os.path.exists(path):
+        return []
+    rows = []
+    with open(path, newline="") as f:
+        for raw in csv.DictReader(f):
+            row = {}
+            for k, v in raw.items():
+                if v == "":
+                    row[k] = None
+                elif k == "error":
+                    row[k] = v
+                elif k == "n_corners":
+                    row[k] = int(float(v))
+                else:
+                    try:
+                        row[k] = float(v)
+                    except ValueError:
+                        row[k] = v
+            rows.append(row)
+    return rows
+
+
+def _check_meta(out_path: str, meta: dict, overwrite: bool):
+    meta_path = out_path + ".meta.json"
+    if overwrite:
+        for p in (out_path, meta_path):
+            if os.path.exists(p):
+                os.remove(p)
+    elif os.path.exists(meta_path):
+        with open(meta_path) as f:
+            old = json.load(f)
+        diff = [k for k in ("solver", "ds", "track", "car_cfg", "params") if old.get(k) != meta.get(k)]
+        if diff:
+            raise ValueError(
+                f"{out_path} was written by a different sweep ({', '.join(diff)} differ); "
+                f"use another --out or --overwrite"
+            )
+    atomic_write(meta_path, meta)
+
+
+def run_sweep(
+    track: list,
+    car_cfg: dict,
+    setups: list,
+    solver: str = "qss",
+    ds: float = 1.0,
+    n_jobs: int = 1,
+    chunk_size: int = 32,
+    out_path: str = None,
+    overwrite: bool = False,
+    track_name: str = None,
+    progress=None,
+) -> list:
+    """
+    Evaluate setups across a process pool, streaming rows to a CSV checkpoint.
+
+    Parameters
+    ----------
+    track : list
+        Track waypoints.
+    car_cfg : dict
+        Base car config (configs/car_simple.yaml); setups override its keys.
+    setups : list[dict]
+        Setups from full_factorial() / latin_hypercube().
+    solver : str
+        "qss" (batched per chunk) or "segments".
+    ds : float
+        QSS station spacing (m).
+    n_jobs : int
+        Worker processes (1 = run in this process).
+    chunk_size : int
+        Setups per task.
+    out_path : str, optional
+        CSV checkpoint. Setups already in it are skipped, new rows are
+        appended as chunks finish.
+    overwrite : bool
+        Discard an existing checkpoint instead of resuming.
+    track_name : str, optional
+        Recorded in the checkpoint's meta file.
+    progress : callable, optional
+        progress(n_done, n_total) after every chunk.
+
+    Returns
+    -------
+    list[dict] — all rows (resumed + new), in setup order.
+    """
+    names = sorted({k for s in setups for k in s})
+    fields = names + RESULT_FIELDS
+
+    done = {}
+    if out_path:
+        _ensure_dir(out_path)
+        meta = {
+            "solver": solver,
+            "ds": ds,
+            # Generated tracks can be random: identify them by shape too.
+            "track": f"{track_name or 'track'} ({len(track)} points, "
+                     f"{float(np.sum(np.linalg.norm(np.diff(np.asarray(track, dtype=float), axis=0), axis=1))):.1f} m)",
+            "car_cfg": car_cfg,
+            "params": names,
+            "updated_at": time.time(),
+        }
+        _check_meta(out_path, meta, overwrite)
+        for row in load_sweep_results(out_path):
+            done[setup_key({k: row[k] for k in names})] = row
+
+    keys = [setup_key(s) for s in setups]
+    todo = [s for s, k in zip(setups, keys) if k not in done]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), max(1, chunk_size))]
+
+    writer, f = None, None
+    if out_path:
+        new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        f = open(out_path, "a", newline="")
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+
+    n_done = len(setups) - len(todo)
+
+    def _collect(rows):
+        nonlocal n_done
+        for row in rows:
+            done[setup_key({k: row[k] for k in names})] = row
+        if writer:
+            writer.writerows(rows)
+            f.flush()
+        n_done += len(rows)
+        if progress:
+            progress(n_done, len(setups))
+
+    try:
+        if n_jobs <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                _collect(evaluate_setups(track, car_cfg, chunk, solver=solver, ds=ds))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(track, car_cfg, solver, ds)) as pool:
+                futures = [pool.submit(_evaluate_chunk, chunk) for chunk in chunks]
+                for fut in as_completed(futures):
+                    _collect(fut.result())
+    finally:
+        if f:
+            f.close()
+
+    return [done[k] for k in keys if k in done]
+
+
+# ---------------------------------------------------------------------------
+#  PARETO
+# ---------------------------------------------------------------------------
+
+def pareto_front(rows: list, objectives: tuple = ("lap_time_s", "fuel_kg")) -> list:
+    """
+    Non-dominated rows when every objective is minimised (prefix a name
+    with "-" to maximise it). Rows with errors or missing objectives are
+    ignored. Sorted by the first objective.
+    """
+    signs = np.array([-1.0 if o.startswith("-") else 1.0 for o in objectives])
+    cols = [o.lstrip("-") for o in objectives]
+    valid = [r for r in rows if not r.get("error") and all(r.get(c) is not None for c in cols)]
+    if not valid:
+        return []
+
+    X = np.array([[r[c] for c in cols] for r in valid], dtype=float) * signs
+    keep = np.ones(len(X), dtype=bool)
+    for i in range(len(X)):
+        if not keep[i]:
+            continue
+        dominated_by = np.all(X <= X[i], axis=1) & np.any(X < X[i], axis=1)
+        if dominated_by.any():
+            keep[i] = False
+        else:
+            # i dominates these
+            keep &= ~(np.all(X[i] <= X, axis=1) & np.any(X[i] < X, axis=1))
+    front = [r for r, k in zip(valid, keep) if k]
+    return sorted(front, key=lambda r: r[cols[0]] * signs[0])
+
+
+# ---------------------------------------------------------------------------
+#  CLI
+# ---------------------------------------------------------------------------
+
+def _load_track(args):
+    from simulator.track_loader import (
+        generate_oval_track, generate_fia_style_track, generate_realistic_track,
+        load_track_csv, generate_custom_track,
+    )
+    if args.track:
+        return load_track_csv(args.track), os.path.basename(args.track)
+    if args.track_type == "custom":
+        return generate_custom_track(n_left=6, n_right=6), "custom"
+    if args.track_type == "realistic":
+        return generate_realistic_track(), "realistic"
+    if args.track_type == "fia":
+        return generate_fia_style_track(), "fia"
+    return generate_oval_track(), "oval"
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Parallel car setup sweep (DoE) on LapTimeSimulator")
+    parser.add_argument("--param", type=str, action="append", required=True,
+                        help="name=lo:hi:n | name=lo:hi | name=a,b,c (repeatable)")
+    parser.add_argument("--design", type=str, default="grid", choices=["grid", "lhs"])
+    parser.add_argument("--samples", type=int, default=50, help="Latin hypercube sample count")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--track", type=str, default=None, help="Track CSV file path")
+    parser.add_argument("--track-type", type=str, default="oval", choices=["oval", "custom", "realistic", "fia"])
+    parser.add_argument("--car-config", type=str, default=None, help="Base car YAML config")
+    parser.add_argument("--solver", type=str, default="qss", choices=["qss", "segments"])
+    parser.add_argument("--ds", type=float, default=1.0, help="QSS station spacing (m)")
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--out", type=str, default=None,
+                        help="Results CSV (default: data/sweeps/sweep_<design>.csv)")
+    parser.add_argument("--overwrite", action="store_true", help="Start over instead of resuming")
+    parser.add_argument("--pareto", action="store_true", help="Print the lap time vs fuel Pareto front")
+    args = parser.parse_args()
+
+    car_cfg = load_yaml(args.car_config or os.path.join(ROOT, "configs", "car_simple.yaml"))
+    specs = dict(parse_param_spec(p) for p in args.param)
+    unknown = [n for n in specs if n not in car_cfg]
+    if unknown:
+        parser.error(f"Unknown car parameter(s): {unknown}")
+
+    if args.design == "grid":
+        missing = [n for n, s in specs.items() if "values" not in s]
+        if missing:
+            parser.error(f"Grid needs lo:hi:n or explicit values for: {missing}")
+        setups = full_factorial({n: s["values"] for n, s in specs.items()})
+    else:
+        bounds = {n: s.get("range") or (min(s["values"]), max(s["values"])) for n, s in specs.items()}
+        setups = latin_hypercube(bounds, args.samples, seed=args.seed)
+
+    track, track_name = _load_track(args)
+    out = args.out or os.path.join(SWEEP_DIR, f"sweep_{args.design}.csv")
+
+    print(f"🔧 {len(setups)} setups ({args.design}) on {track_name}, solver={args.solver}, "
+          f"{args.n_jobs} process(es) → {out}")
+
+    t0 = time.perf_counter()
+
+    def _progress(n_done, n_total):
+        print(f"\r  {n_done}/{n_total} setups ({time.perf_counter() - t0:.1f}s)", end="", flush=True)
+
+    rows = run_sweep(track, car_cfg, setups, solver=args.solver, ds=args.ds,
+                     n_jobs=args.n_jobs, chunk_size=args.chunk_size, out_path=out,
+                     overwrite=args.overwrite, track_name=track_name, progress=_progress)
+    print()
+
+    ok = [r for r in rows if not r.get("error")]
+    print(f"✅ {len(ok)}/{len(rows)} setups evaluated in {time.perf_counter() - t0:.1f}s")
+    names = list(specs)
+    for r in sorted(ok, key=lambda r: r["lap_time_s"])[:5]:
+        setup = ", ".join(f"{n}={r[n]:g}" for n in names)
+        print(f"  {r['lap_time_s']:.3f}s  fuel {r['fuel_kg']:.3f}kg  top {r['top_speed_kmh']:.1f}km/h  ({setup})")
+
+    if args.pareto:
+        front = pareto_front(ok, ("lap_time_s", "fuel_kg"))
+        print(f"\n  Pareto front (lap time vs fuel), {len(front)} setups:")
+        for r in front:
+            aero = f"Cd={r.get('drag_coeff', car_cfg['drag_coeff']):g} Cl={r.get('downforce_coeff', car_cfg['downforce_coeff']):g}"
+            print(f"    {r['lap_time_s']:.3f}s  {r['fuel_kg']:.3f}kg  {aero}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -12,11 +12,24 @@ Metrics:
   - Steering RMSE
   - Correlation metrics (Pearson, Spearman)
   - Statistical confidence intervals (bootstrapped)
+
+validate_lap() first puts both laps on a common track-distance grid
+(simulator.lap_alignment), so laps logged at different rates or with
+different time spent in a corner are compared at the same place on
+track. align="sample" keeps the old truncate-to-shorter comparison.
 """
 
+import os
+import sys
 import numpy as np
 import math
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from simulator.lap_alignment import align_traces, lap_columns, lap_distance
+
 try:
     from scipy.stats import pearsonr, spearmanr, ttest_rel
     SCIPY_AVAILABLE = True
@@ -90,19 +103,28 @@ def compute_sector_errors(sim_speeds: np.ndarray, real_speeds: np.ndarray, n_sec
 #  ACCELERATION METRICS
 # ---------------------------------------------------------------------------
 
-def compute_acceleration(speeds_kmh: np.ndarray, dt: float = 0.1) -> np.ndarray:
-    """Compute longitudinal acceleration from speed trace."""
+def compute_acceleration(speeds_kmh: np.ndarray, dt: float = 0.1, t: np.ndarray = None) -> np.ndarray:
+    """
+    Compute longitudinal acceleration from speed trace.
+
+    With `t` (sample times, e.g. a distance-resampled lap) the step is
+    taken from t instead of the fixed dt.
+    """
     speeds_ms = speeds_kmh / 3.6
-    accel = np.diff(speeds_ms) / dt
+    step = np.maximum(np.diff(t), 1e-6) if t is not None else dt
+    accel = np.diff(speeds_ms) / step
     return np.concatenate([accel, [0.0]])
 
 
-def compute_acceleration_rmse(sim_speeds: np.ndarray, real_speeds: np.ndarray, dt: float = 0.1) -> float:
+def compute_acceleration_rmse(
+    sim_speeds: np.ndarray, real_speeds: np.ndarray, dt: float = 0.1,
+    sim_t: np.ndarray = None, real_t: np.ndarray = None,
+) -> float:
     n = min(len(sim_speeds), len(real_speeds))
     if n < 2:
         return float("nan")
-    sim_accel = compute_acceleration(sim_speeds[:n], dt)
-    real_accel = compute_acceleration(real_speeds[:n], dt)
+    sim_accel = compute_acceleration(sim_speeds[:n], dt, None if sim_t is None else sim_t[:n])
+    real_accel = compute_acceleration(real_speeds[:n], dt, None if real_t is None else real_t[:n])
     return float(np.sqrt(np.mean((sim_accel - real_accel) ** 2)))
 
 
@@ -124,9 +146,14 @@ def detect_braking_points(brake_trace: np.ndarray, threshold: float = 0.1) -> li
 
 
 def compute_braking_point_error(
-    sim_brakes: np.ndarray, real_brakes: np.ndarray, threshold: float = 0.1
+    sim_brakes: np.ndarray, real_brakes: np.ndarray, threshold: float = 0.1, spacing: float = 1.0
 ) -> dict:
-    """Compare braking point locations between sim and real."""
+    """
+    Compare braking point locations between sim and real.
+
+    Errors are in samples times `spacing` (pass the grid step to get
+    metres for distance-aligned traces).
+    """
     sim_points = detect_braking_points(sim_brakes, threshold)
     real_points = detect_braking_points(real_brakes, threshold)
 
@@ -134,7 +161,7 @@ def compute_braking_point_error(
     if n == 0:
         return {"braking_point_count_error": abs(len(sim_points) - len(real_points))}
 
-    errors = np.array(sim_points[:n]) - np.array(real_points[:n])
+    errors = (np.array(sim_points[:n]) - np.array(real_points[:n])) * spacing
     return {
         "braking_point_mae": float(np.mean(np.abs(errors))),
         "braking_point_rmse": float(np.sqrt(np.mean(errors ** 2))),
@@ -322,6 +349,8 @@ def validate_lap(
     real_packets: list,
     dt: float = 0.1,
     compute_cis: bool = False,
+    align: str = "distance",
+    step_m: float = 2.0,
 ) -> dict:
     """
     Comprehensive validation of a simulated lap against real telemetry.
@@ -333,42 +362,47 @@ def validate_lap(
     real_packets : list[dict]
         Real telemetry packets (same format).
     dt : float
-        Simulation timestep.
+        Simulation timestep (used for acceleration with align="sample").
     compute_cis : bool
         If True, compute bootstrap confidence intervals.
+    align : str
+        "distance" — resample both laps onto a shared distance grid
+        (lengths normalised, braking point errors in metres);
+        "sample" — compare sample i with sample i, truncated to the
+        shorter lap.
+    step_m : float
+        Distance grid spacing for align="distance".
 
     Returns
     -------
     dict with all validation metrics.
     """
-    # Extract traces
-    sim_speed = np.array([p["true"]["speed_kmh"] for p in sim_packets])
-    real_speed = np.array([p["true"]["speed_kmh"] for p in real_packets])
-    sim_brake = np.array([p["true"]["brake_cmd"] for p in sim_packets if "true" in p])
-    real_brake = np.array([p["true"]["brake_cmd"] for p in real_packets if "true" in p])
-    sim_yaw = np.array([p["true"]["yaw_deg"] for p in sim_packets if "true" in p])
-    real_yaw = np.array([p["true"]["yaw_deg"] for p in real_packets if "true" in p])
-
-    # GPS for line deviation
-    sim_gps = np.array([(p.get("gps", {}) or {}).get("x", 0) for p in sim_packets])
-    sim_gps_y = np.array([(p.get("gps", {}) or {}).get("y", 0) for p in sim_packets])
-    real_gps = np.array([(p.get("gps", {}) or {}).get("x", 0) for p in real_packets])
-    real_gps_y = np.array([(p.get("gps", {}) or {}).get("y", 0) for p in real_packets])
-
-    sim_gps_xy = np.column_stack([sim_gps, sim_gps_y])
-    real_gps_xy = np.column_stack([real_gps, real_gps_y])
-
-    # Steering
-    sim_steering = np.array([
-        p.get("true", {}).get("steering", 0) for p in sim_packets
-    ])
-    real_steering = np.array([
-        p.get("true", {}).get("steering", 0) for p in real_packets
-    ])
-
-    n = min(len(sim_speed), len(real_speed))
-    sim_speed = sim_speed[:n]
-    real_speed = real_speed[:n]
+    channels = ("t", "speed_kmh", "brake_cmd", "yaw_deg", "steering", "gps_x", "gps_y")
+    sim_cols = lap_columns(sim_packets)
+    real_cols = lap_columns(real_packets)
+
+    if align == "distance":
+        _, sim, real = align_traces(
+            lap_distance(sim_cols), {c: sim_cols[c] for c in channels},
+            lap_distance(real_cols), {c: real_cols[c] for c in channels},
+            step_m=step_m,
+        )
+        spacing, sim_t, real_t = step_m, sim["t"], real["t"]
+    elif align == "sample":
+        n = min(len(sim_packets), len(real_packets))
+        sim = {c: np.nan_to_num(sim_cols[c][:n], nan=0.0) for c in channels}
+        real = {c: np.nan_to_num(real_cols[c][:n], nan=0.0) for c in channels}
+        spacing, sim_t, real_t = 1.0, None, None
+    else:
+        raise ValueError(f"Unknown align: {align}. Choose 'distance' or 'sample'")
+
+    sim_speed, real_speed = sim["speed_kmh"], real["speed_kmh"]
+    sim_brake, real_brake = sim["brake_cmd"], real["brake_cmd"]
+    sim_yaw, real_yaw = sim["yaw_deg"], real["yaw_deg"]
+    sim_steering, real_steering = sim["steering"], real["steering"]
+    sim_gps_xy = np.column_stack([sim["gps_x"], sim["gps_y"]])
+    real_gps_xy = np.column_stack([real["gps_x"], real["gps_y"]])
+    n = len(sim_speed)
 
     # Speed metrics
     metrics = {
@@ -377,16 +411,17 @@ def validate_lap(
         "max_error_kmh": compute_speed_max_error(sim_speed, real_speed),
         "mape_pct": compute_speed_mape(sim_speed, real_speed) * 100 if not np.isnan(compute_speed_mape(sim_speed, real_speed)) else None,
         "n_samples": n,
+        "aligned_on": align,
     }
 
     # Sector errors
     metrics.update(compute_sector_errors(sim_speed, real_speed))
 
     # Acceleration RMSE
-    metrics["acceleration_rmse_ms2"] = compute_acceleration_rmse(sim_speed, real_speed, dt)
+    metrics["acceleration_rmse_ms2"] = compute_acceleration_rmse(sim_speed, real_speed, dt, sim_t, real_t)
 
     # Braking points
-    metrics.update(compute_braking_point_error(sim_brake, real_brake))
+    metrics.update(compute_braking_point_error(sim_brake, real_brake, spacing=spacing))
 
     # Corner speed errors
     metrics.update(compute_corner_speed_errors(sim_speed, real_speed, sim_yaw, real_yaw))
@@ -412,6 +447,7 @@ def validate_multi_lap(
     sim_packets: list,
     real_packets: list,
     dt: float = 0.1,
+    align: str = "distance",
 ) -> dict:
     """Run validation per lap and aggregate results."""
     sim_laps = {}
@@ -428,7 +464,7 @@ def validate_multi_lap(
     all_metrics = []
 
     for ln in set(sim_laps) & set(real_laps):
-        result = validate_lap(sim_laps[ln], real_laps[ln], dt)
+        result = validate_lap(sim_laps[ln], real_laps[ln], dt, align=align)
         per_lap[ln] = result
         all_metrics.append(result)
 
@@ -489,6 +525,8 @@ def cli():
     parser.add_argument("--real-file", type=str, required=True, help="Real telemetry session log")
     parser.add_argument("--dt", type=float, default=0.1)
     parser.add_argument("--ci", action="store_true", help="Compute confidence intervals")
+    parser.add_argument("--align", type=str, default="distance", choices=["distance", "sample"])
+    parser.add_argument("--step-m", type=float, default=2.0, help="Distance grid spacing (m)")
     parser.add_argument("--output", type=str, default=None, help="Save report as JSON")
 
     args = parser.parse_args()
@@ -498,7 +536,7 @@ def cli():
     sim = load_lap_file(args.sim_file)
     real = load_lap_file(args.real_file)
 
-    metrics = validate_lap(sim, real, dt=args.dt, compute_cis=args.ci)
+    metrics = validate_lap(sim, real, dt=args.dt, compute_cis=args.ci, align=args.align, step_m=args.step_m)
     print_validation_report(metrics, f"Validation: {args.sim_file} vs {args.real_file}")
 
     if args.output:
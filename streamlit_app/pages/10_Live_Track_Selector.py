@@ -1,6 +1,6 @@
 # streamlit_app/pages/8_Track_Selector.py
 
-import sys, os, json, time
+import sys, os
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(ROOT)
 
@@ -8,6 +8,8 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 from simulator.track_loader import load_track_csv
+from utils.telemetry_bus import TelemetrySubscriber
+from utils.telemetry_ring import chart_history
 
 TRACK_DIR = os.path.join(ROOT, "data", "tracks")
 DATA_DIR = os.path.join(ROOT, "data")
@@ -137,20 +139,21 @@ telemetry_history = {
 
 
 def draw_graphs():
-    t = telemetry_history["t"]
+    history = chart_history(st.session_state, telemetry_history)
+    t = history["t"]
 
     fig, axes = plt.subplots(4, 1, figsize=(6, 8), sharex=True)
 
-    axes[0].plot(t, telemetry_history["speed"])
+    axes[0].plot(t, history["speed"])
     axes[0].set_ylabel("Speed")
 
-    axes[1].plot(t, telemetry_history["brake"], color="green")
+    axes[1].plot(t, history["brake"], color="green")
     axes[1].set_ylabel("Brake")
 
-    axes[2].plot(t, telemetry_history["coolant"], color="red")
+    axes[2].plot(t, history["coolant"], color="red")
     axes[2].set_ylabel("Coolant")
 
-    axes[3].plot(t, telemetry_history["yaw"], color="purple")
+    axes[3].plot(t, history["yaw"], color="purple")
     axes[3].set_ylabel("Yaw")
     axes[3].set_xlabel("Time (s)")
 
@@ -164,18 +167,22 @@ def draw_graphs():
 # LIVE LOOP
 # ------------------------------------------------------
 if st.session_state.sim_running:
-    while st.session_state.sim_running:
-        if os.path.exists(REALTIME_FILE):
-            with open(REALTIME_FILE, "r") as f:
-                packet = json.load(f)
-
-            t = packet["timestamp"]
+    if "telemetry_sub" not in st.session_state:
+        st.session_state.telemetry_sub = TelemetrySubscriber(fallback_path=REALTIME_FILE)
 
-            telemetry_history["t"].append(t)
-            telemetry_history["speed"].append(packet["true"]["speed_kmh"])
-            telemetry_history["brake"].append(packet["sensors"]["brake_pressure"])
-            telemetry_history["coolant"].append(packet["true"]["coolant_temp"])
-            telemetry_history["yaw"].append(packet["true"]["yaw_deg"])
+    while st.session_state.sim_running:
+        # Telemetry bus (realtime.json fallback): wakes as soon as packets arrive
+        packets = st.session_state.telemetry_sub.drain(timeout=0.5)
+        if packets:
+            packet = packets[-1]
+
+            if st.session_state.get("telemetry_ring") is None:
+                for p in packets:
+                    telemetry_history["t"].append(p["timestamp"])
+                    telemetry_history["speed"].append(p["true"]["speed_kmh"])
+                    telemetry_history["brake"].append(p["sensors"]["brake_pressure"])
+                    telemetry_history["coolant"].append(p["true"]["coolant_temp"])
+                    telemetry_history["yaw"].append(p["true"]["yaw_deg"])
 
             # show UI
             metrics_placeholder.empty()
@@ -185,7 +192,5 @@ if st.session_state.sim_running:
             track_placeholder.pyplot(draw_track(packet))
             graph_placeholder.pyplot(draw_graphs())
 
-        time.sleep(0.1)
-
 else:
     st.info("Simulation not running.")
@@ -15,6 +15,7 @@ from simulator.driver_features import (
     load_session,
     compute_driver_metrics,
 )
+from utils.session_log import list_session_files
 
 LOG_DIR = os.path.join(ROOT, "data", "logs")
 
@@ -29,7 +30,7 @@ if not os.path.exists(LOG_DIR):
     st.error(f"Log directory not found: {LOG_DIR}")
     st.stop()
 
-files = sorted([f for f in os.listdir(LOG_DIR) if f.endswith(".json")])
+files = list_session_files(LOG_DIR)
 
 if not files:
     st.warning("No log files found in data/logs/. Run a simulation first.")
@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(ROOT)
@@ -9,6 +8,7 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import numpy as np
 
+from utils.telemetry_bus import TelemetrySubscriber
 from simulator.live_recommendation import (
     build_segment_reference,
     recommend_for_packet,
@@ -23,9 +23,11 @@ st.title("🧠 Live Driving Assistant (Segment-Based Recommendations)")
 
 
 # -------------------------------------------------
-# Cached reference table from history
+# Reference table from history
+# (persisted in data/store/segment_reference.npz; new logs are folded in,
+#  so the short TTL only re-checks the log folder)
 # -------------------------------------------------
-@st.cache_data
+@st.cache_data(ttl=30)
 def get_segment_reference(limit_sessions: int | None = None, min_samples: int = 5):
     return build_segment_reference(
         limit_sessions=limit_sessions,
@@ -63,18 +65,16 @@ st.sidebar.write(f"Segments with reference: **{len(seg_ref)}**")
 
 
 # -------------------------------------------------
-# Load current realtime packet
+# Current packet (telemetry bus, realtime.json fallback)
 # -------------------------------------------------
-if not os.path.exists(REALTIME_FILE):
-    st.error(f"Realtime telemetry file not found: `{REALTIME_FILE}`")
-    st.stop()
+if "telemetry_sub" not in st.session_state:
+    st.session_state.telemetry_sub = TelemetrySubscriber(fallback_path=REALTIME_FILE)
 
-try:
-    with open(REALTIME_FILE, "r") as f:
-        packet = json.load(f)
-except Exception as e:
-    st.error(f"Failed to read realtime.json: {e}")
+packet = st.session_state.telemetry_sub.latest(timeout=1.0) or st.session_state.get("last_packet")
+if packet is None:
+    st.error(f"No live telemetry: start the simulator (or write `{REALTIME_FILE}`).")
     st.stop()
+st.session_state.last_packet = packet
 
 true = packet.get("true", {})
 sensors = packet.get("sensors", {})
@@ -16,6 +16,8 @@ from simulator.track_loader import (
     estimate_turns,
     compute_difficulty,
 )
+from utils.telemetry_bus import TelemetrySubscriber
+from utils.telemetry_ring import chart_history
 from simulator.live_recommendation import (
     build_segment_reference,
     recommend_for_packet,
@@ -179,7 +181,6 @@ progress_bar = st.progress(0.0)
 telemetry_history = st.session_state.telemetry_history
 segment_ref = st.session_state.segment_ref
 
-
 # ------------------------------------------------------
 # Drawing helpers
 # ------------------------------------------------------
@@ -215,8 +216,9 @@ def draw_track(packet):
 
 
 def draw_graphs():
-    t = telemetry_history["t"]
-    if not t:
+    history = chart_history(st.session_state, telemetry_history)
+    t = history["t"]
+    if not len(t):
         fig, ax = plt.subplots(figsize=(5, 4))
         ax.text(0.5, 0.5, "No telemetry yet", ha="center", va="center")
         ax.axis("off")
@@ -224,16 +226,16 @@ def draw_graphs():
 
     fig, axes = plt.subplots(4, 1, figsize=(6, 8), sharex=True)
 
-    axes[0].plot(t, telemetry_history["speed"])
+    axes[0].plot(t, history["speed"])
     axes[0].set_ylabel("Speed")
 
-    axes[1].plot(t, telemetry_history["brake"], color="green")
+    axes[1].plot(t, history["brake"], color="green")
     axes[1].set_ylabel("Brake")
 
-    axes[2].plot(t, telemetry_history["coolant"], color="red")
+    axes[2].plot(t, history["coolant"], color="red")
     axes[2].set_ylabel("Coolant")
 
-    axes[3].plot(t, telemetry_history["yaw"], color="purple")
+    axes[3].plot(t, history["yaw"], color="purple")
     axes[3].set_ylabel("Yaw")
     axes[3].set_xlabel("Timestamp")
 
@@ -287,6 +289,9 @@ def update_progress():
 # LIVE LOOP
 # ------------------------------------------------------
 if st.session_state.sim_running:
+    if "telemetry_sub" not in st.session_state:
+        st.session_state.telemetry_sub = TelemetrySubscriber(fallback_path=REALTIME_FILE)
+
     while st.session_state.sim_running:
         # Stop signal?
         if os.path.exists(STOP_FILE):
@@ -297,22 +302,19 @@ if st.session_state.sim_running:
         # Progress bar from sim_progress.json
         update_progress()
 
-        # Read realtime packet
-        if os.path.exists(REALTIME_FILE):
-            try:
-                with open(REALTIME_FILE, "r") as f:
-                    packet = json.load(f)
-            except Exception:
-                time.sleep(0.1)
-                continue
-
-            # Update history
-            t = packet.get("timestamp", time.time())
-            telemetry_history["t"].append(t)
-            telemetry_history["speed"].append(packet["true"]["speed_kmh"])
-            telemetry_history["brake"].append(packet["sensors"]["brake_pressure"])
-            telemetry_history["coolant"].append(packet["true"]["coolant_temp"])
-            telemetry_history["yaw"].append(packet["true"]["yaw_deg"])
+        # Realtime packets from the telemetry bus (realtime.json fallback)
+        packets = st.session_state.telemetry_sub.drain(timeout=0.5)
+        if packets:
+            packet = packets[-1]
+
+            # Update history (only needed without the simulator's ring)
+            if st.session_state.get("telemetry_ring") is None:
+                for p in packets:
+                    telemetry_history["t"].append(p.get("timestamp", time.time()))
+                    telemetry_history["speed"].append(p["true"]["speed_kmh"])
+                    telemetry_history["brake"].append(p["sensors"]["brake_pressure"])
+                    telemetry_history["coolant"].append(p["true"]["coolant_temp"])
+                    telemetry_history["yaw"].append(p["true"]["yaw_deg"])
 
             # Numeric metrics
             metrics_placeholder.empty()
@@ -326,7 +328,5 @@ if st.session_state.sim_running:
             # Coaching
             draw_coaching(packet)
 
-        time.sleep(0.1)
-
 else:
     st.info("Simulation not running. Start it to see live telemetry and coaching.")
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import sys
 import json
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,6 +9,11 @@ import numpy as np
 st.set_page_config(layout="wide")
 st.title("📊 Lap Visualization + Recommendation Analysis")
 
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(ROOT)
+
+from utils.session_log import list_session_files, load_session_packets, session_stem
+
 LOG_DIR = os.path.join("data", "logs")
 
 # ------------------------------------------------------
@@ -17,7 +23,7 @@ if not os.path.exists(LOG_DIR):
     st.error("❌ Logs folder not found.")
     st.stop()
 
-files = [f for f in os.listdir(LOG_DIR) if f.startswith("session_") and f.endswith(".json")]
+files = [f for f in list_session_files(LOG_DIR) if f.startswith("session_")]
 
 if not files:
     st.warning("⚠ No session logs found.")
@@ -27,15 +33,14 @@ selected_file = st.selectbox("Select a session:", files)
 session_path = os.path.join(LOG_DIR, selected_file)
 
 # Matching recommendation file
-recommendation_file = selected_file.replace("session_", "recommendations_")
+recommendation_file = session_stem(selected_file).replace("session_", "recommendations_") + ".json"
 recommendation_path = os.path.join(LOG_DIR, recommendation_file)
 
 # ------------------------------------------------------
 # Load session JSON
 # ------------------------------------------------------
 try:
-    with open(session_path, "r") as f:
-        raw = json.load(f)
+    raw = load_session_packets(session_path)
 except Exception as e:
     st.error(f"Failed to read log file: {e}")
     st.stop()
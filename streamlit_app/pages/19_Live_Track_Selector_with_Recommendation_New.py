@@ -16,6 +16,7 @@ from simulator.track_loader import (
     estimate_turns,
     compute_difficulty,
 )
+from utils.telemetry_bus import TelemetrySubscriber
 from simulator.live_recommendation import (
     build_segment_reference,
     recommend_for_packet,
@@ -216,6 +217,9 @@ def save_recommendations_to_file():
 # PROGRESS + LIVE LOOP
 # ------------------------------------------------------
 if st.session_state.sim_running:
+    if "telemetry_sub" not in st.session_state:
+        st.session_state.telemetry_sub = TelemetrySubscriber(fallback_path=REALTIME_FILE)
+
     while st.session_state.sim_running:
         # detect stop
         if os.path.exists(STOP_FILE):
@@ -232,11 +236,9 @@ if st.session_state.sim_running:
             progress_bar.progress(min(lap / max(target, 1), 1.0))
             progress_placeholder.write(f"Lap {lap}/{target}")
 
-        # realtime packet
-        if os.path.exists(REALTIME_FILE):
-            with open(REALTIME_FILE) as f:
-                packet = json.load(f)
-
+        # realtime packet (telemetry bus, realtime.json fallback)
+        packet = st.session_state.telemetry_sub.latest(timeout=0.5)
+        if packet is not None:
             # numeric + track + graphs
             metrics_placeholder.empty()
             with metrics_placeholder.container():
@@ -248,7 +250,5 @@ if st.session_state.sim_running:
             # coaching
             draw_coaching(packet)
 
-        time.sleep(0.1)
-
 else:
     st.info("Simulation not running.")
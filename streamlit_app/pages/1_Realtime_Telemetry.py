@@ -1,12 +1,14 @@
 # streamlit_app/pages/1_Realtime_Telemetry.py
 
-import sys, os, time, json
+import sys, os
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(ROOT)
 
 import streamlit as st
 import pandas as pd
 
+from utils.telemetry_bus import TelemetrySubscriber
+
 DATA_DIR = os.path.join(ROOT, "data")
 REALTIME_FILE = os.path.join(DATA_DIR, "realtime.json")
 
@@ -14,44 +16,43 @@ st.set_page_config(layout="wide")
 st.title("📡 Realtime Telemetry Viewer")
 
 st.markdown(
-    "This page reads `data/realtime.json` written by the simulator "
-    "and shows the latest packet plus a tiny rolling history."
+    "This page subscribes to the simulator's telemetry bus (falling back to "
+    "`data/realtime.json`) and shows the latest packet plus a tiny rolling history."
 )
 
 # Rolling history in session state
 if "rt_history" not in st.session_state:
     st.session_state["rt_history"] = []
+if "rt_sub" not in st.session_state:
+    st.session_state["rt_sub"] = TelemetrySubscriber(fallback_path=REALTIME_FILE)
+sub = st.session_state["rt_sub"]
 
 placeholder_header = st.empty()
 placeholder_metrics = st.empty()
 placeholder_table = st.empty()
 
-refresh_interval = st.slider("Refresh interval (seconds)", 0.1, 2.0, 0.3)
+refresh_interval = st.slider("Max wait per update (seconds)", 0.1, 2.0, 0.3)
 
 if st.button("Start live view"):
     # Simple live loop – this page will block until stopped,
     # which is okay for a dedicated realtime viewer tab.
     try:
         while True:
-            if not os.path.exists(REALTIME_FILE):
-                placeholder_header.error("❌ No realtime.json yet. Start simulator first.")
-                time.sleep(refresh_interval)
-                continue
-
-            try:
-                with open(REALTIME_FILE, "r") as f:
-                    pkt = json.load(f)
-            except Exception as e:
-                placeholder_header.error(f"Failed to read realtime.json: {e}")
-                time.sleep(refresh_interval)
+            # Blocks until the next packet arrives (or the wait times out)
+            packets = sub.drain(timeout=refresh_interval)
+            if not packets:
+                if sub.source is None:
+                    placeholder_header.error("❌ No telemetry yet. Start simulator first.")
                 continue
+            pkt = packets[-1]
 
-            st.session_state["rt_history"].append(pkt)
+            st.session_state["rt_history"].extend(packets)
             # limit history to last 200 samples
             st.session_state["rt_history"] = st.session_state["rt_history"][-200:]
 
             placeholder_header.markdown(
-                f"### Latest packet — t = {pkt.get('t', 0):.2f}s, lap = {pkt.get('lap', 0)}"
+                f"### Latest packet — t = {pkt.get('t', 0):.2f}s, lap = {pkt.get('lap', 0)} "
+                f"({'bus' if sub.source == 'bus' else 'realtime.json'})"
             )
 
             col1, col2, col3 = placeholder_metrics.columns(3) if hasattr(placeholder_metrics, "columns") else st.columns(3)
@@ -63,7 +64,5 @@ if st.button("Start live view"):
             df = pd.json_normalize(st.session_state["rt_history"])
             placeholder_table.dataframe(df.tail(20), use_container_width=True)
 
-            time.sleep(refresh_interval)
-
     except KeyboardInterrupt:
         st.info("Live view stopped.")
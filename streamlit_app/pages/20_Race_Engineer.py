@@ -10,16 +10,24 @@ Provides:
   - Root cause analysis (Stage 10) — plain English explanation
   - Next lap prediction (Stage 11)
   - Telemetry deep-dive (speed, throttle, brake, derived metrics)
+  - Cross-session comparison: laps from several sessions/drivers aligned
+    on distance (delta-time trace + per-corner deltas)
+  - Live mode: follows a log while it is being written, pushing only the
+    new packets into the engineer on each refresh
 """
 
 import streamlit as st
-import sys, os, json, glob, math
+import sys, os, json, math, time
 import numpy as np
+import pandas as pd
 
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(ROOT)
 
-from simulator.race_engineer import RaceEngineer
+from simulator.race_engineer import RaceEngineer, load_session_laps
+from utils.session_log import session_stem, tail_session_packets
+from utils.session_catalog import SessionCatalog
+from utils.analysis_cache import AnalysisCache
 
 st.set_page_config(page_title="Race Engineer", layout="wide")
 st.title("🏎️ Race Engineer")
@@ -31,16 +39,28 @@ st.title("🏎️ Race Engineer")
 st.sidebar.header("Session Data")
 
 log_dir = os.path.join(ROOT, "data", "logs")
-log_files = sorted(glob.glob(os.path.join(log_dir, "*.json")))
-log_names = [os.path.basename(f) for f in log_files]
+with SessionCatalog(log_dir) as catalog:
+    catalog.update()
+    sessions = {r["filename"]: r for r in catalog.list()}
+log_names = list(sessions)
+
+
+def _session_label(name):
+    r = sessions[name]
+    best = f" · best {r['best_lap_s']:.1f}s" if r["best_lap_s"] is not None else ""
+    return f"{session_stem(name)} · {r['driver_id'] or '?'} · {r['n_laps']} laps{best}"
+
 
 selected_log = st.sidebar.selectbox(
     "Session Log", log_names,
-    format_func=lambda x: x.replace(".json", ""),
+    format_func=_session_label,
     index=len(log_names) - 1 if log_names else 0,
 )
 
 load_btn = st.sidebar.button("Load & Analyze", type="primary", use_container_width=True)
+live = st.sidebar.checkbox("Follow live session", value=False,
+                           help="Re-read only the packets appended since the last refresh")
+refresh_s = st.sidebar.slider("Refresh (s)", 0.5, 10.0, 2.0, 0.5) if live else None
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Comparison")
@@ -51,12 +71,28 @@ lap_b = st.sidebar.number_input("Lap B", min_value=1, value=2)
 #  MAIN — Analysis
 # ------------------------------------------------------------------
 
-if load_btn or "engineer" in st.session_state:
-    if load_btn or "engineer" not in st.session_state:
+if live and selected_log:
+    if st.session_state.get("live_log") != selected_log:
+        st.session_state.engineer = RaceEngineer()
+        st.session_state.log_name = selected_log
+        st.session_state.live_log = selected_log
+        st.session_state.live_offset = 0
+    prev_offset = st.session_state.live_offset
+    new_packets, st.session_state.live_offset = tail_session_packets(
+        os.path.join(log_dir, selected_log), prev_offset)
+    if st.session_state.live_offset < prev_offset:
+        # Log was truncated or replaced: it is re-read from the start.
+        st.session_state.engineer = RaceEngineer()
+    st.session_state.engineer.push_many(new_packets)
+elif st.session_state.pop("live_log", None) is not None:
+    # Leaving live mode: the next load re-analyzes the whole file.
+    st.session_state.pop("engineer", None)
+
+if live or load_btn or "engineer" in st.session_state:
+    if not live and (load_btn or "engineer" not in st.session_state):
         with st.spinner("Analyzing session..."):
-            engineer = RaceEngineer()
-            engineer.load_from_file(os.path.join(log_dir, selected_log))
-            engineer.analyze()
+            with AnalysisCache() as cache:
+                engineer = RaceEngineer.from_file(os.path.join(log_dir, selected_log), cache=cache)
             st.session_state.engineer = engineer
             st.session_state.log_name = selected_log
     else:
@@ -64,8 +100,19 @@ if load_btn or "engineer" in st.session_state:
 
     st.caption(f"Session: {st.session_state.log_name}")
 
-    tab_multi, tab_compare, tab_telemetry, tab_predict = st.tabs([
-        "📊 Multi-Lap", "🔍 Lap Comparison", "📈 Telemetry", "🔮 Prediction"
+    if live:
+        current = engineer.current_lap_summary()
+        prediction = engineer.latest_prediction or {}
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Current Lap", engineer.live_lap if engineer.live_lap is not None else "—")
+        c2.metric("Elapsed", f'{current["lap_time"]:.1f}s' if current else "—")
+        c3.metric("Completed Laps", len([ln for ln in engineer.lap_summaries if ln != engineer.live_lap]))
+        c4.metric("Predicted Next", f'{prediction["predicted_lap_time"]:.2f}s' if "predicted_lap_time" in prediction else "—")
+        if engineer.latest_comparison and "root_cause" in engineer.latest_comparison:
+            st.info(engineer.latest_comparison["root_cause"])
+
+    tab_multi, tab_compare, tab_telemetry, tab_predict, tab_cross = st.tabs([
+        "📊 Multi-Lap", "🔍 Lap Comparison", "📈 Telemetry", "🔮 Prediction", "🧭 Cross-Session"
     ])
 
     table = engineer.get_multi_lap_table()
@@ -229,7 +276,7 @@ if load_btn or "engineer" in st.session_state:
             index=min(len(table) - 1, 1),
         )
 
-        packets = engineer.lap_data.get(lap_choice, [])
+        packets = engineer.lap_packets(lap_choice)
         if packets:
             enriched = engineer.compute_derived(packets)
             n = len(enriched)
@@ -325,6 +372,50 @@ if load_btn or "engineer" in st.session_state:
         else:
             st.warning("Need at least 3 laps to make a prediction.")
 
+    # ================================================================
+    # TAB 5 — CROSS-SESSION COMPARISON
+    # ================================================================
+    with tab_cross:
+        st.subheader("Cross-Session Comparison (aligned on distance)")
+
+        cross_logs = st.multiselect(
+            "Sessions", log_names, default=[st.session_state.log_name] if st.session_state.log_name in log_names else [],
+            format_func=_session_label,
+        )
+        which = st.radio("Laps", ["Best lap", "All completed laps"], horizontal=True)
+
+        laps = {}
+        for name in cross_logs:
+            best = sessions[name]["best_lap"]
+            wanted = [best] if which == "Best lap" and best is not None else None
+            for ln, pk in load_session_laps(os.path.join(log_dir, name), laps=wanted).items():
+                laps[f"{session_stem(name)} L{ln}"] = pk
+
+        if len(laps) >= 2:
+            cmp = engineer.compare_laps_across(laps)
+            st.caption(f"Reference: {cmp['reference']} · {len(laps)} laps · "
+                       f"{cmp['distance_m'][-1]:.0f} m")
+
+            st.markdown("**Delta time vs reference (s)**")
+            st.line_chart(pd.DataFrame(cmp["delta_s"].T, index=cmp["distance_m"], columns=cmp["labels"]),
+                          height=300)
+
+            if cmp["corners"]:
+                st.markdown("**Time lost per corner vs reference (s)**")
+                st.dataframe(
+                    pd.DataFrame(cmp["corner_delta_s"], index=cmp["labels"],
+                                 columns=[f"T{c['corner']} ({c['apex_m']:.0f} m)" for c in cmp["corners"]]).round(3),
+                    use_container_width=True,
+                )
+                st.markdown("**Apex speed (km/h)**")
+                st.dataframe(
+                    pd.DataFrame(cmp["apex_speed_kmh"], index=cmp["labels"],
+                                 columns=[f"T{c['corner']}" for c in cmp["corners"]]).round(1),
+                    use_container_width=True,
+                )
+        else:
+            st.info("Pick sessions with at least two laps between them.")
+
 else:
     st.info("Select a session log from the sidebar and click **Load & Analyze**.")
     st.markdown("""
@@ -344,3 +435,7 @@ else:
     6. **Root cause** — which sector, corner, or factor caused the delta
     7. **Prediction** — next lap time based on tire/fuel trends
     """)
+
+if live:
+    time.sleep(refresh_s)
+    st.rerun()
@@ -0,0 +1,98 @@
+"""
+Setup Sweep Explorer.
+
+Browses result tables written by simulator/setup_sweep.py:
+  - sortable results table (lap time, corner speeds, fuel per lap)
+  - drag vs downforce map coloured by lap time
+  - lap time vs fuel with the Pareto front highlighted
+"""
+
+import streamlit as st
+import sys, os
+import pandas as pd
+import matplotlib.pyplot as plt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(ROOT)
+
+from simulator.setup_sweep import SWEEP_DIR, RESULT_FIELDS, load_sweep_results, pareto_front
+
+st.set_page_config(page_title="Setup Sweep", layout="wide")
+st.title("🔧 Setup Sweep Explorer")
+
+# ------------------------------------------------------------------
+#  SIDEBAR — Sweep Selection
+# ------------------------------------------------------------------
+
+sweeps = sorted(f for f in os.listdir(SWEEP_DIR) if f.endswith(".csv")) if os.path.isdir(SWEEP_DIR) else []
+if not sweeps:
+    st.info("No sweeps yet. Run e.g. `python -m simulator.setup_sweep "
+            "--param downforce_coeff=0.6:2.0:5 --param drag_coeff=0.6:1.2:4`")
+    st.stop()
+
+selected = st.sidebar.selectbox("Sweep", sweeps, index=len(sweeps) - 1)
+rows = load_sweep_results(os.path.join(SWEEP_DIR, selected))
+ok = [r for r in rows if not r.get("error")]
+if not ok:
+    st.warning("This sweep has no successful setups yet.")
+    st.stop()
+
+params = [k for k in ok[0] if k not in RESULT_FIELDS]
+objective_b = st.sidebar.selectbox("Trade-off against lap time", ["fuel_kg", "-top_speed_kmh", "-min_corner_kmh"])
+
+front = pareto_front(ok, ("lap_time_s", objective_b))
+front_ids = {id(r) for r in front}
+
+df = pd.DataFrame(ok)
+df["pareto"] = [id(r) in front_ids for r in ok]
+
+c1, c2, c3 = st.columns(3)
+best = min(ok, key=lambda r: r["lap_time_s"])
+c1.metric("Setups", f"{len(ok)} / {len(rows)}")
+c2.metric("Best lap", f"{best['lap_time_s']:.3f} s")
+c3.metric("Pareto setups", len(front))
+
+# ------------------------------------------------------------------
+#  DRAG vs DOWNFORCE
+# ------------------------------------------------------------------
+
+col_a, col_b = st.columns(2)
+
+with col_a:
+    st.subheader("Drag vs Downforce")
+    if "drag_coeff" in df and "downforce_coeff" in df:
+        fig, ax = plt.subplots(figsize=(6, 5))
+        sc = ax.scatter(df["drag_coeff"], df["downforce_coeff"], c=df["lap_time_s"], cmap="viridis_r", s=40)
+        pf = df[df["pareto"]]
+        ax.scatter(pf["drag_coeff"], pf["downforce_coeff"], facecolors="none", edgecolors="red", s=120,
+                   label="Pareto")
+        ax.set_xlabel("drag_coeff")
+        ax.set_ylabel("downforce_coeff")
+        ax.legend()
+        fig.colorbar(sc, ax=ax, label="Lap time (s)")
+        st.pyplot(fig)
+    else:
+        st.caption("Sweep drag_coeff and downforce_coeff to see the aero map.")
+
+with col_b:
+    st.subheader(f"Lap Time vs {objective_b.lstrip('-')}")
+    y = objective_b.lstrip("-")
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ax.scatter(df["lap_time_s"], df[y], s=30, alpha=0.6, label="Setups")
+    pf = df[df["pareto"]].sort_values("lap_time_s")
+    ax.plot(pf["lap_time_s"], pf[y], "r-o", label="Pareto front")
+    ax.set_xlabel("Lap time (s)")
+    ax.set_ylabel(y)
+    ax.legend()
+    st.pyplot(fig)
+
+# ------------------------------------------------------------------
+#  TABLES
+# ------------------------------------------------------------------
+
+st.subheader("Pareto Setups")
+st.dataframe(pd.DataFrame(front)[params + ["lap_time_s", "fuel_kg", "top_speed_kmh", "min_corner_kmh"]],
+             use_container_width=True, hide_index=True)
+
+st.subheader("All Results")
+st.dataframe(df.sort_values("lap_time_s"), use_container_width=True, hide_index=True)
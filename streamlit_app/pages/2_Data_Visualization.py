@@ -1,6 +1,6 @@
 import streamlit as st
 import os
-import json
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
@@ -12,13 +12,16 @@ st.title("📊 FSAE Telemetry — Data Visualization (Matplotlib)")
 # 1. Load session files
 # -----------------------------------
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(ROOT)
 LOG_DIR = os.path.join(ROOT, "data", "logs")
 
+from utils.session_log import list_session_files, load_session_packets
+
 if not os.path.exists(LOG_DIR):
     st.error("❌ Logs folder not found. Make sure /data/logs exists.")
     st.stop()
 
-files = [f for f in os.listdir(LOG_DIR) if f.endswith(".json")]
+files = list_session_files(LOG_DIR)
 
 if not files:
     st.warning("⚠️ No logs found yet. Run the simulator first.")
@@ -32,8 +35,7 @@ selected_file = st.selectbox("Select a session:", files)
 file_path = os.path.join(LOG_DIR, selected_file)
 
 try:
-    with open(file_path, "r") as f:
-        raw = json.load(f)
+    raw = load_session_packets(file_path)
 except Exception as e:
     st.error(f"Failed to read log file: {e}")
     st.stop()
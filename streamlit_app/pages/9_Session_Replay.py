@@ -493,9 +493,7 @@
 
 import os
 import sys
-import json
 import time
-import numpy as np
 
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(ROOT)
@@ -503,6 +501,8 @@ sys.path.append(ROOT)
 import streamlit as st
 import matplotlib.pyplot as plt
 from simulator.track_loader import load_track_csv
+from utils.session_log import list_session_files
+from utils.session_reader import SessionReader
 
 # -----------------------------------
 # Streamlit Setup
@@ -516,7 +516,7 @@ TRACK_DIR = os.path.join(ROOT, "data", "tracks")
 # -----------------------------------
 # Load Logs
 # -----------------------------------
-files = sorted([f for f in os.listdir(LOG_DIR) if f.endswith(".json")])
+files = list_session_files(LOG_DIR)
 if not files:
     st.error("❌ No session logs found.")
     st.stop()
@@ -524,25 +524,21 @@ if not files:
 file_name = st.selectbox("Select Session:", files)
 file_path = os.path.join(LOG_DIR, file_name)
 
-with open(file_path, "r") as f:
-    raw = json.load(f)
+# Memory-mapped columnar reader: converted once per log version, then
+# reopened in O(1) on every rerun / playback frame.
+@st.cache_resource
+def open_reader(path, mtime):
+    return SessionReader.open(path)
 
-# Remove corrupt GPS rows
-data = [r for r in raw if "gps" in r and isinstance(r["gps"], dict)]
-
-# Extract columns
-xs = np.array([r["gps"]["x"] for r in data])
-ys = np.array([r["gps"]["y"] for r in data])
-ts = np.array([r["t"] for r in data])
-laps = np.array([r.get("lap", 0) for r in data])
+reader = open_reader(file_path, os.path.getmtime(file_path))
+if len(reader) == 0:
+    st.error("❌ Selected session is empty.")
+    st.stop()
 
-speed = np.array([r["true"]["speed_kmh"] for r in data])
-coolant = np.array([r["true"]["coolant_temp"] for r in data])
-brake = np.array([r["sensors"]["brake_pressure"] for r in data])
-yaw = np.array([r["sensors"]["imu"]["yaw"] if r["sensors"].get("imu") else 0 for r in data])
-throttle = np.array([r["true"]["throttle"] for r in data])
+FRAME_CHANNELS = ["speed", "throttle", "brake", "coolant", "yaw", "lap"]
+MAX_PLOT_POINTS = 2000
 
-min_t, max_t = ts.min(), ts.max()
+min_t, max_t = reader.time_range
 
 # -----------------------------------
 # Track Selection
@@ -587,50 +583,37 @@ with colA:
 # Helpers
 # -----------------------------------
 def get_frame(time_t):
-    idx = np.searchsorted(ts, time_t)
-
-    if idx <= 0:
-        idx = 0
-    elif idx >= len(ts):
-        idx = len(ts) - 1
-
-    # Linear interpolation
-    if idx == 0:
-        return idx, xs[0], ys[0]
-    t0, t1 = ts[idx-1], ts[idx]
-    r = (time_t - t0) / (t1 - t0 + 1e-9)
-    x = xs[idx-1] + r * (xs[idx] - xs[idx-1])
-    y = ys[idx-1] + r * (ys[idx] - ys[idx-1])
-    return idx, x, y
+    return reader.frame(time_t, FRAME_CHANNELS)
 
 # -----------------------------------
 # Top Row Numeric Telemetry
 # -----------------------------------
-def show_numeric(idx):
+def show_numeric(frame):
     c1, c2, c3, c4, c5, c6 = st.columns(6)
-    c1.metric("Speed (km/h)", f"{speed[idx]:.1f}")
-    c2.metric("Throttle", f"{throttle[idx]:.2f}")
-    c3.metric("Brake (bar)", f"{brake[idx]:.1f}")
-    c4.metric("Coolant (°C)", f"{coolant[idx]:.1f}")
-    c5.metric("Yaw (deg)", f"{yaw[idx]:.3f}")
-    c6.metric("Lap", int(laps[idx]))
+    c1.metric("Speed (km/h)", f"{frame['speed']:.1f}")
+    c2.metric("Throttle", f"{frame['throttle']:.2f}")
+    c3.metric("Brake (bar)", f"{frame['brake']:.1f}")
+    c4.metric("Coolant (°C)", f"{frame['coolant']:.1f}")
+    c5.metric("Yaw (deg)", f"{frame['yaw']:.3f}")
+    c6.metric("Lap", int(frame["lap"]))
 
 # -----------------------------------
 # Telemetry Graphs
 # -----------------------------------
 def plot_graphs(idx):
     fig, axes = plt.subplots(4, 1, figsize=(6, 8), sharex=True)
+    t_now = reader.t[idx]
 
-    axes[0].plot(ts, speed); axes[0].axvline(ts[idx], color="red")
+    axes[0].plot(*reader.decimated("speed", MAX_PLOT_POINTS)); axes[0].axvline(t_now, color="red")
     axes[0].set_ylabel("Speed")
 
-    axes[1].plot(ts, brake, color="green"); axes[1].axvline(ts[idx], color="red")
+    axes[1].plot(*reader.decimated("brake", MAX_PLOT_POINTS), color="green"); axes[1].axvline(t_now, color="red")
     axes[1].set_ylabel("Brake")
 
-    axes[2].plot(ts, coolant, color="red"); axes[2].axvline(ts[idx], color="red")
+    axes[2].plot(*reader.decimated("coolant", MAX_PLOT_POINTS), color="red"); axes[2].axvline(t_now, color="red")
     axes[2].set_ylabel("Coolant")
 
-    axes[3].plot(ts, yaw, color="purple"); axes[3].axvline(ts[idx], color="red")
+    axes[3].plot(*reader.decimated("yaw", MAX_PLOT_POINTS), color="purple"); axes[3].axvline(t_now, color="red")
     axes[3].set_ylabel("Yaw")
     axes[3].set_xlabel("Time (s)")
 
@@ -642,18 +625,20 @@ def plot_graphs(idx):
 # -----------------------------------
 # Track Visualization
 # -----------------------------------
-def plot_track(idx, x, y):
+def plot_track(frame):
     fig, ax = plt.subplots(figsize=(7, 7))
 
     if len(track_x) > 0:
         ax.plot(track_x, track_y, color="lightgray")
 
+    _, xs = reader.decimated("gps.x", MAX_PLOT_POINTS)
+    _, ys = reader.decimated("gps.y", MAX_PLOT_POINTS)
     ax.plot(xs, ys, alpha=0.35, color="blue")
-    ax.scatter([x], [y], color="red", s=80)
+    ax.scatter([frame["x"]], [frame["y"]], color="red", s=80)
 
     ax.set_aspect("equal")
     ax.grid(True)
-    ax.set_title(f"Time: {st.session_state.timeline_t:.2f}s | Lap {int(laps[idx])}")
+    ax.set_title(f"Time: {st.session_state.timeline_t:.2f}s | Lap {int(frame['lap'])}")
 
     return fig
 
@@ -671,16 +656,16 @@ with right_col:
 
 
 def render():
-    idx, x, y = get_frame(st.session_state.timeline_t)
+    frame = get_frame(st.session_state.timeline_t)
 
     # --- FIX: Proper clearing of numeric metrics ---
     numeric_placeholder.empty()
     with numeric_placeholder.container():
-        show_numeric(idx)
+        show_numeric(frame)
 
     # Track + graphs
-    track_area.pyplot(plot_track(idx, x, y))
-    graph_area.pyplot(plot_graphs(idx))
+    track_area.pyplot(plot_track(frame))
+    graph_area.pyplot(plot_graphs(frame["index"]))
 
 
 # -----------------------------------
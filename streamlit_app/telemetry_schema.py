@@ -23,6 +23,7 @@ class NormalizedRow:
     true_brake_cmd: Optional[float]
     true_throttle: Optional[float]
     true_yaw_deg: Optional[float]
+    true_steering: Optional[float]
 
     # Sensor-style values.
     wheel_speed: Optional[float]
@@ -99,6 +100,7 @@ def normalize_session_rows(rows: Iterable[Dict[str, Any]]) -> List[NormalizedRow
                 true_brake_cmd=true.get("brake_cmd"),
                 true_throttle=true.get("throttle"),
                 true_yaw_deg=true.get("yaw_deg"),
+                true_steering=true.get("steering"),
                 wheel_speed=wheel_speed,
                 brake_pressure=brake_pressure,
                 coolant_temp=coolant_temp,
@@ -0,0 +1,175 @@
+# utils/analysis_cache.py
+"""
+Persistent LRU cache of race engineer analyses (SQLite).
+
+Opening a session on the Race Engineer page used to re-parse the log and
+re-run RaceEngineer.analyze() every time. AnalysisCache stores the lap
+summaries (including corner metrics) of each analysed log, keyed by
+
+    (file fingerprint, analysis version)
+
+so an unchanged log is never re-analysed, an appended or rewritten log
+misses (its fingerprint changes), and bumping
+simulator.race_engineer.ANALYSIS_VERSION invalidates every entry at once.
+
+Entries are evicted least-recently-used first once the cache holds more
+than `max_entries` analyses or `max_mb` of JSON.
+
+The database lives in data/cache/analysis_cache.sqlite.
+
+Usage:
+    python -m utils.analysis_cache              # stats
+    python -m utils.analysis_cache --clear
+
+    from simulator.race_engineer import RaceEngineer
+    from utils.analysis_cache import AnalysisCache
+    with AnalysisCache() as cache:
+        engineer = RaceEngineer.from_file(path, cache=cache)
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.session_catalog import file_fingerprint
+
+CACHE_DIR = os.path.join(ROOT, "data", "cache")
+CACHE_NAME = "analysis_cache.sqlite"
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS analyses (
+    fingerprint  TEXT NOT NULL,
+    version      INTEGER NOT NULL,
+    filename     TEXT,
+    n_laps       INTEGER,
+    payload      TEXT NOT NULL,
+    size_bytes   INTEGER NOT NULL,
+    created_at   REAL NOT NULL,
+    last_used    REAL NOT NULL,
+    PRIMARY KEY (fingerprint, version)
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_last_used ON analyses (last_used);
+"""
+
+
+class AnalysisCache:
+    def __init__(self, db_path: str = None, max_entries: int = 200, max_mb: float = 256.0):
+        """
+        Parameters
+        ----------
+        db_path : str, optional
+            SQLite file (default: data/cache/analysis_cache.sqlite).
+        max_entries : int
+            Maximum number of cached analyses.
+        max_mb : float
+            Maximum total payload size (MB).
+        """
+        self.db_path = db_path or os.path.join(CACHE_DIR, CACHE_NAME)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=10)
+        self.conn.executescript(_SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    #  GET / PUT
+    # ------------------------------------------------------------------
+
+    def get(self, path: str, version: int, fingerprint: str = None):
+        """
+        Cached lap summaries for a log, or None.
+
+        Returns
+        -------
+        dict — {lap_number: summary} as produced by RaceEngineer.analyze()
+        """
+        fingerprint = fingerprint or file_fingerprint(path)
+        row = self.conn.execute(
+            "SELECT payload FROM analyses WHERE fingerprint = ? AND version = ?",
+            (fingerprint, version),
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE analyses SET last_used = ? WHERE fingerprint = ? AND version = ?",
+            (time.time(), fingerprint, version),
+        )
+        self.conn.commit()
+        return {int(lap): summary for lap, summary in json.loads(row[0]).items()}
+
+    def put(self, path: str, version: int, lap_summaries: dict, fingerprint: str = None):
+        """Store the lap summaries of a log, then evict down to the limits."""
+        fingerprint = fingerprint or file_fingerprint(path)
+        payload = json.dumps({str(lap): s for lap, s in lap_summaries.items()}, separators=(",", ":"))
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analyses "
+            "(fingerprint, version, filename, n_laps, payload, size_bytes, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, version, os.path.basename(path), len(lap_summaries),
+             payload, len(payload), now, now),
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        rows = self.conn.execute(
+            "SELECT fingerprint, version, size_bytes FROM analyses ORDER BY last_used DESC"
+        ).fetchall()
+        total = 0
+        for i, (fingerprint, version, size) in enumerate(rows):
+            total += size
+            if i >= self.max_entries or (i > 0 and total > self.max_bytes):
+                self.conn.execute(
+                    "DELETE FROM analyses WHERE fingerprint = ? AND version = ?",
+                    (fingerprint, version),
+                )
+
+    # ------------------------------------------------------------------
+    #  MAINTENANCE
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        n, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM analyses"
+        ).fetchone()
+        return {"entries": n, "size_mb": round(size / 1024 / 1024, 2), "path": self.db_path}
+
+    def clear(self):
+        self.conn.execute("DELETE FROM analyses")
+        self.conn.commit()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Inspect or clear the race engineer analysis cache")
+    parser.add_argument("--db", type=str, default=None)
+    parser.add_argument("--clear", action="store_true", help="Delete every cached analysis")
+    args = parser.parse_args()
+
+    with AnalysisCache(args.db) as cache:
+        if args.clear:
+            cache.clear()
+            print("🧹 Cache cleared")
+        s = cache.stats()
+        print(f"{s['entries']} analyses, {s['size_mb']} MB → {s['path']}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,431 @@
+# utils/session_catalog.py
+"""
+Persistent session catalog (SQLite) for data/logs.
+
+Listing sessions used to mean opening and parsing every log just to find
+its driver or lap count. SessionCatalog keeps one row per log file:
+
+    filename, size, mtime_ns, fingerprint,
+    driver_id, track, track_points, schema, n_packets, n_laps,
+    duration_s, best_lap, best_lap_s, error
+
+update() compares each file's size and mtime against the catalog and only
+re-reads files that are new or changed (removed files are dropped). A
+changed mtime with an identical content fingerprint only refreshes the
+stat fields. Closed NDJSON logs are summarised from their footer plus the
+first and last line of each lap; other logs are flattened through the
+columnar store. The last lap only counts towards best_lap when it ran the
+full distance (sessions stopped mid-lap leave it partial).
+
+The database lives next to the logs (data/logs/session_catalog.sqlite),
+so each log directory has its own catalog.
+
+Usage:
+    python -m utils.session_catalog                  # update + list
+    python -m utils.session_catalog --driver driver_fast --min-laps 3
+    python -m utils.session_catalog --rebuild
+
+    from utils.session_catalog import SessionCatalog
+    with SessionCatalog() as cat:
+        cat.update()
+        rows = cat.list(driver_id="driver_fast")
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.session_log import list_session_files, load_session_packets, read_session_footer
+from utils.session_store import packets_to_columns
+
+LOG_DIR = os.path.join(ROOT, "data", "logs")
+CATALOG_NAME = "session_catalog.sqlite"
+
+# Bump when the summary logic changes; rows with an older version are re-indexed.
+CATALOG_VERSION = 2
+
+_COLUMNS = (
+    "filename", "size", "mtime_ns", "fingerprint", "version",
+    "driver_id", "track", "track_points", "schema", "n_packets", "n_laps",
+    "duration_s", "best_lap", "best_lap_s", "error",
+)
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    filename     TEXT PRIMARY KEY,
+    size         INTEGER NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    version      INTEGER NOT NULL,
+    driver_id    TEXT,
+    track        TEXT,
+    track_points INTEGER,
+    schema       TEXT,
+    n_packets    INTEGER,
+    n_laps       INTEGER,
+    duration_s   REAL,
+    best_lap     INTEGER,
+    best_lap_s   REAL,
+    error        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_driver ON sessions (driver_id);
+"""
+
+
+# ---------------------------------------------------------------------------
+#  PER-FILE SUMMARY
+# ---------------------------------------------------------------------------
+
+def file_fingerprint(path: str, chunk: int = 65536) -> str:
+    """blake2b of size + first and last 64 KB (cheap, catches appends and rewrites)."""
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(chunk))
+        if size > chunk:
+            f.seek(max(chunk, size - chunk))
+            h.update(f.read(chunk))
+    return h.hexdigest()
+
+
+def detect_schema(packet: dict) -> str:
+    """Log schema of a packet: stage1 / f1 / openf1 / stage0 / unknown."""
+    if not isinstance(packet, dict):
+        return "unknown"
+    if "f1_telemetry" in packet:
+        return "f1"
+    if "openf1" in packet:
+        return "openf1"
+    if "true" in packet:
+        return "stage1"
+    if "coolant_temp" in packet or "wheel_speed" in packet:
+        return "stage0"
+    return "unknown"
+
+
+def _track_name(packet: dict):
+    for key in ("track", "track_name", "circuit"):
+        if isinstance(packet, dict) and packet.get(key):
+            return str(packet[key])
+    return None
+
+
+# The last lap counts as complete when it reaches this fraction of the
+# other laps' distance (track index) or, without track indices, duration.
+FULL_LAP_FRACTION = 0.95
+
+
+def _last_lap_complete(lap_times: dict, lap_ends: dict) -> bool:
+    """
+    Whether the highest lap number ran a full lap. A session stopped
+    mid-lap leaves it short of the others: its last track index (from
+    `lap_ends`, lap → track index of its last packet) is compared against
+    the furthest the other laps reached, else its duration against their
+    median.
+    """
+    laps = sorted(lap_times)
+    if len(laps) < 2:
+        return True
+    last, others = laps[-1], laps[:-1]
+    reach = [lap_ends[k] for k in others if lap_ends.get(k) is not None]
+    if lap_ends.get(last) is not None and reach:
+        return lap_ends[last] >= FULL_LAP_FRACTION * max(reach)
+    return lap_times[last] >= FULL_LAP_FRACTION * float(np.median([lap_times[k] for k in others]))
+
+
+def _best_lap(lap_times: dict, lap_ends: dict = None):
+    """
+    Best (lap, seconds) among completed laps. The highest lap number is
+    dropped when it is partial (see _last_lap_complete).
+    """
+    if not _last_lap_complete(lap_times, lap_ends or {}):
+        lap_times = {k: v for k, v in lap_times.items() if k != max(lap_times)}
+    lap_times = {k: v for k, v in lap_times.items() if v > 0}
+    if not lap_times:
+        return None, None
+    lap = min(lap_times, key=lap_times.get)
+    return int(lap), float(lap_times[lap])
+
+
+def _lap_times(starts: dict, t_end) -> dict:
+    """Lap durations from each lap's first timestamp (start to next start)."""
+    laps = sorted(starts)
+    times = {a: starts[b] - starts[a] for a, b in zip(laps, laps[1:])}
+    if laps and t_end is not None:
+        times[laps[-1]] = t_end - starts[laps[-1]]
+    return times
+
+
+def _line_before(f, end: int, chunk: int = 65536) -> bytes:
+    """The complete line that ends at byte `end`."""
+    f.seek(max(0, end - chunk))
+    return f.read(end - max(0, end - chunk)).rstrip(b"\n").rsplit(b"\n", 1)[-1]
+
+
+def _summarise_footer(path: str, footer: dict) -> dict:
+    # The footer indexes each lap's first packet, so lap start and end
+    # packets are one seek + one line each; the payload is never parsed
+    # in full.
+    starts, lap_ends = {}, {}
+    index = sorted((offset, int(lap)) for lap, (offset, _count) in footer.get("laps", {}).items())
+    with open(path, "rb") as f:
+        first = json.loads(f.readline())
+        f.seek(0, os.SEEK_END)
+        footer_start = f.tell() - len(_line_before(f, f.tell())) - 1
+        ends = [offset for offset, _lap in index[1:]] + [footer_start]
+        for (offset, lap), end in zip(index, ends):
+            f.seek(offset)
+            t = json.loads(f.readline()).get("t")
+            if t is not None:
+                starts[lap] = t
+            ti = json.loads(_line_before(f, end)).get("track_index")
+            if ti is not None:
+                lap_ends[lap] = ti
+    lap_times = _lap_times(starts, footer.get("t_end"))
+    laps = sorted(footer.get("laps", {}))
+
+    best_lap, best_lap_s = _best_lap(lap_times, lap_ends)
+    t_start, t_end = footer.get("t_start"), footer.get("t_end")
+    return {
+        "driver_id": first.get("driver_id"),
+        "track": _track_name(first),
+        "track_points": None,
+        "schema": detect_schema(first),
+        "n_packets": footer.get("n_packets"),
+        "n_laps": len(laps),
+        "duration_s": (t_end - t_start) if t_start is not None and t_end is not None else None,
+        "best_lap": best_lap,
+        "best_lap_s": best_lap_s,
+    }
+
+
+def summarise_session(path: str) -> dict:
+    """Catalog fields for one session log (parses the file)."""
+    footer = read_session_footer(path)
+    if footer is not None and footer.get("n_packets"):
+        return _summarise_footer(path, footer)
+
+    packets = load_session_packets(path)
+    if not isinstance(packets, list):
+        raise ValueError(f"Session {path} is not a list of packets.")
+    if not packets:
+        raise ValueError(f"Session {path} has no readable packets.")
+    first = packets[0]
+    driver_id = next((p["driver_id"] for p in packets if isinstance(p, dict) and "driver_id" in p), None)
+
+    cols = packets_to_columns(packets)
+    t = cols["t"]
+    if len(t) and np.isnan(t).all():
+        t = cols["timestamp"] - cols["timestamp"][0]
+    lap = cols["lap"]
+    ti = cols["track_index"]
+    valid = ~np.isnan(t)
+    t, lap, lap_ti = t[valid], lap[valid], ti[valid]
+
+    lap_ids, first_idx = np.unique(lap, return_index=True)
+    starts = {int(ln): float(t[i]) for ln, i in zip(lap_ids, first_idx) if ln >= 0}
+    last_ids, last_idx = np.unique(lap[::-1], return_index=True)
+    lap_ends = {int(ln): int(lap_ti[len(lap) - 1 - i]) for ln, i in zip(last_ids, last_idx)
+                if ln >= 0 and lap_ti[len(lap) - 1 - i] >= 0}
+    best_lap, best_lap_s = _best_lap(_lap_times(starts, float(t[-1]) if t.size else None), lap_ends)
+
+    return {
+        "driver_id": driver_id,
+        "track": _track_name(first),
+        "track_points": int(ti.max()) + 1 if ti.max() >= 0 else None,
+        "schema": detect_schema(first),
+        "n_packets": len(packets),
+        "n_laps": len(starts),
+        "duration_s": float(t[-1] - t[0]) if t.size else None,
+        "best_lap": best_lap,
+        "best_lap_s": best_lap_s,
+    }
+
+
+# ---------------------------------------------------------------------------
+#  CATALOG
+# ---------------------------------------------------------------------------
+
+class SessionCatalog:
+    def __init__(self, log_dir: str = LOG_DIR, db_path: str = None):
+        """
+        Parameters
+        ----------
+        log_dir : str
+            Directory of session logs to index.
+        db_path : str, optional
+            SQLite file (default: <log_dir>/session_catalog.sqlite).
+        """
+        self.log_dir = log_dir
+        self.db_path = db_path or os.path.join(log_dir, CATALOG_NAME)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    #  UPDATE
+    # ------------------------------------------------------------------
+
+    def update(self, rebuild: bool = False) -> dict:
+        """
+        Sync the catalog with log_dir.
+
+        Returns
+        -------
+        dict — counts of added / updated / unchanged / removed / failed files
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        if rebuild:
+            self.conn.execute("DELETE FROM sessions")
+
+        known = {
+            r["filename"]: r
+            for r in self.conn.execute("SELECT filename, size, mtime_ns, fingerprint, version FROM sessions")
+        }
+        on_disk = set(list_session_files(self.log_dir))
+
+        for fn in sorted(set(known) - on_disk):
+            self.conn.execute("DELETE FROM sessions WHERE filename = ?", (fn,))
+            counts["removed"] += 1
+
+        for fn in sorted(on_disk):
+            path = os.path.join(self.log_dir, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            row = known.get(fn)
+            if row is not None and row["version"] == CATALOG_VERSION \
+                    and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns:
+                counts["unchanged"] += 1
+                continue
+
+            fingerprint = file_fingerprint(path)
+            if row is not None and row["version"] == CATALOG_VERSION and row["fingerprint"] == fingerprint:
+                self.conn.execute(
+                    "UPDATE sessions SET size = ?, mtime_ns = ? WHERE filename = ?",
+                    (st.st_size, st.st_mtime_ns, fn),
+                )
+                counts["unchanged"] += 1
+                continue
+
+            record = dict.fromkeys(_COLUMNS)
+            record.update(filename=fn, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                          fingerprint=fingerprint, version=CATALOG_VERSION)
+            try:
+                record.update(summarise_session(path))
+            except Exception as e:
+                record["error"] = str(e)[:200]
+                counts["failed"] += 1
+
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(record[c] for c in _COLUMNS),
+            )
+            if record["error"] is None:
+                counts["updated" if row is not None else "added"] += 1
+
+        self.conn.commit()
+        return counts
+
+    # ------------------------------------------------------------------
+    #  QUERIES
+    # ------------------------------------------------------------------
+
+    def list(
+        self,
+        driver_id: str = None,
+        schema: str = None,
+        track: str = None,
+        min_laps: int = None,
+        include_errors: bool = False,
+        order_by: str = "filename",
+    ) -> list:
+        """
+        Catalog rows matching the filters, as dicts with an added "path".
+
+        order_by : one of filename, driver_id, n_laps, duration_s, best_lap_s
+        """
+        if order_by not in ("filename", "driver_id", "n_laps", "duration_s", "best_lap_s"):
+            raise ValueError(f"Cannot order by {order_by}")
+
+        where, args = [], []
+        if driver_id is not None:
+            where.append("driver_id = ?"); args.append(driver_id)
+        if schema is not None:
+            where.append("schema = ?"); args.append(schema)
+        if track is not None:
+            where.append("track = ?"); args.append(track)
+        if min_laps is not None:
+            where.append("n_laps >= ?"); args.append(min_laps)
+        if not include_errors:
+            where.append("error IS NULL")
+
+        sql = "SELECT * FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_by}, filename"
+
+        rows = []
+        for r in self.conn.execute(sql, args):
+            d = dict(r)
+            d["path"] = os.path.join(self.log_dir, d["filename"])
+            rows.append(d)
+        return rows
+
+    def get(self, filename: str):
+        r = self.conn.execute("SELECT * FROM sessions WHERE filename = ?", (filename,)).fetchone()
+        return dict(r) if r is not None else None
+
+    def drivers(self) -> dict:
+        """{driver_id: [session_path, ...]} — sessions without a driver go to "unknown_driver"."""
+        mapping = {}
+        for r in self.list():
+            mapping.setdefault(r["driver_id"] or "unknown_driver", []).append(r["path"])
+        return mapping
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Session catalog for data/logs")
+    parser.add_argument("--log-dir", type=str, default=LOG_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="Drop and re-index every session")
+    parser.add_argument("--driver", type=str, default=None)
+    parser.add_argument("--schema", type=str, default=None)
+    parser.add_argument("--min-laps", type=int, default=None)
+    parser.add_argument("--order-by", type=str, default="filename")
+    args = parser.parse_args()
+
+    with SessionCatalog(args.log_dir) as cat:
+        counts = cat.update(rebuild=args.rebuild)
+        print("📚 Catalog: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+        for r in cat.list(driver_id=args.driver, schema=args.schema,
+                          min_laps=args.min_laps, order_by=args.order_by):
+            best = f"{r['best_lap_s']:.2f}s (lap {r['best_lap']})" if r["best_lap_s"] is not None else "—"
+            dur = f"{r['duration_s']:.1f}s" if r["duration_s"] is not None else "—"
+            print(f"  {r['filename']:<42} {str(r['driver_id']):<18} {r['schema']:<7} "
+                  f"laps={r['n_laps']:<3} dur={dur:<9} best={best}")
+
+
+if __name__ == "__main__":
+    cli()
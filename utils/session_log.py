@@ -0,0 +1,273 @@
+# utils/session_log.py
+"""
+Append-only streaming session logs (NDJSON).
+
+write_session_log() rewrites the whole packet list on every tick, which
+makes a session O(n²) in packets. SessionLogWriter instead appends one
+compact JSON line per packet:
+
+    {"timestamp": ..., "t": 0.0, "lap": 0, ...}
+    {"timestamp": ..., "t": 0.1, "lap": 0, ...}
+    ...
+    {"__footer__": {"format": "fsae-ndjson", "n_packets": 3514, "laps": {"1": [offset, count]}, ...}}
+
+  - lines are buffered and written every `flush_every` packets
+  - the file is fsync'd at most every `fsync_interval` seconds
+  - close() appends a footer with packet count, time span and a
+    per-lap byte-offset index
+  - the file must not exist yet: the footer only indexes packets written
+    by this writer, so appending to an older log would hide its laps
+
+A crash loses at most the unflushed buffer: every complete line is still
+a valid packet, and readers ignore a truncated last line and a missing
+footer.
+
+load_session_packets() reads both this format and legacy JSON arrays,
+so every consumer can switch to it without caring how a log was written;
+tail_session_packets() returns only the lines appended since a byte
+offset, for pages that follow a session while it is being recorded.
+"""
+
+import os
+import json
+import time
+
+from utils.json_writer import _ensure_dir
+
+FORMAT_NAME = "fsae-ndjson"
+FORMAT_VERSION = 1
+FOOTER_KEY = "__footer__"
+
+# Extensions recognised as session logs in data/logs.
+SESSION_EXTENSIONS = (".json", ".ndjson")
+
+
+def is_session_file(name: str) -> bool:
+    return name.endswith(SESSION_EXTENSIONS) and not name.endswith(".tmp")
+
+
+def list_session_files(log_dir: str) -> list:
+    """Sorted session log filenames (legacy .json and streaming .ndjson)."""
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(f for f in os.listdir(log_dir) if is_session_file(f))
+
+
+def session_stem(name: str) -> str:
+    """Filename without its session log extension."""
+    for ext in SESSION_EXTENSIONS:
+        if name.endswith(ext):
+            return name[: -len(ext)]
+    return name
+
+
+# ---------------------------------------------------------------------------
+#  WRITER
+# ---------------------------------------------------------------------------
+
+class SessionLogWriter:
+    """
+    Buffered, append-only NDJSON session log.
+
+    Raises FileExistsError if `path` already exists.
+
+    Usage:
+        with SessionLogWriter(path) as log:
+            for packet in packets:
+                log.append(packet)
+    """
+
+    def __init__(self, path: str, flush_every: int = 10, fsync_interval: float = 1.0):
+        _ensure_dir(path)
+        self.path = path
+        self.flush_every = max(1, int(flush_every))
+        self.fsync_interval = fsync_interval
+
+        self._f = open(path, "xb")
+        self._offset = 0
+        self._buffer = []
+        self._last_fsync = time.monotonic()
+
+        self.n_packets = 0
+        self.t_start = None
+        self.t_end = None
+        self.laps = {}          # lap → [byte_offset_of_first_packet, count]
+        self.closed = False
+
+    def append(self, packet: dict):
+        """Queue one packet; flushes every `flush_every` packets."""
+        line = (json.dumps(packet, separators=(",", ":")) + "\n").encode("utf-8")
+
+        lap = packet.get("lap")
+        if lap is not None:
+            entry = self.laps.setdefault(str(lap), [self._offset, 0])
+            entry[1] += 1
+        t = packet.get("t")
+        if t is not None:
+            if self.t_start is None:
+                self.t_start = t
+            self.t_end = t
+
+        self._buffer.append(line)
+        self._offset += len(line)
+        self.n_packets += 1
+
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self, fsync: bool = False):
+        """Write buffered lines; fsync if forced or the interval has elapsed."""
+        if self._buffer:
+            self._f.write(b"".join(self._buffer))
+            self._buffer = []
+        self._f.flush()
+
+        now = time.monotonic()
+        if fsync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._f.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        """Flush remaining packets and append the footer/index line."""
+        if self.closed:
+            return
+        self.flush()
+        footer = {
+            FOOTER_KEY: {
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "n_packets": self.n_packets,
+                "t_start": self.t_start,
+                "t_end": self.t_end,
+                "laps": self.laps,
+                "closed_at": time.time(),
+            }
+        }
+        self._f.write((json.dumps(footer, separators=(",", ":")) + "\n").encode("utf-8"))
+        self.flush(fsync=True)
+        self._f.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ---------------------------------------------------------------------------
+#  READERS
+# ---------------------------------------------------------------------------
+
+def _is_ndjson(path: str) -> bool:
+    if path.endswith(".ndjson"):
+        return True
+    with open(path, "rb") as f:
+        head = f.read(64).lstrip()
+    # Legacy logs are a single JSON array.
+    return not head.startswith(b"[")
+
+
+def read_session_footer(path: str):
+    """Return the footer dict of a closed NDJSON log, or None."""
+    if not _is_ndjson(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 65536))
+        tail = f.read().rstrip(b"\n")
+    last = tail.rsplit(b"\n", 1)[-1]
+    try:
+        obj = json.loads(last)
+    except ValueError:
+        return None
+    if isinstance(obj, dict) and FOOTER_KEY in obj:
+        return obj[FOOTER_KEY]
+    return None
+
+
+def _parse_lines(lines) -> list:
+    packets = []
+    for raw in lines:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            obj = json.loads(raw)
+        except ValueError:
+            # Truncated line from an interrupted write.
+            continue
+        if isinstance(obj, dict) and FOOTER_KEY in obj:
+            continue
+        packets.append(obj)
+    return packets
+
+
+def load_session_packets(path: str, laps: list = None):
+    """
+    Load a session log as a list of packets.
+
+    Works for legacy JSON arrays and streaming NDJSON logs (closed or
+    still being written). With `laps`, only those laps are returned; for a
+    closed NDJSON log this seeks straight to them via the footer index.
+    """
+    if not _is_ndjson(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        if laps is not None and isinstance(data, list):
+            wanted = set(laps)
+            data = [p for p in data if p.get("lap") in wanted]
+        return data
+
+    footer = read_session_footer(path) if laps is not None else None
+    if footer is not None:
+        packets = []
+        with open(path, "rb") as f:
+            for lap in laps:
+                entry = footer.get("laps", {}).get(str(lap))
+                if not entry:
+                    continue
+                f.seek(entry[0])
+                packets.extend(_parse_lines(f.readline() for _ in range(entry[1])))
+        return packets
+
+    with open(path, "rb") as f:
+        packets = _parse_lines(f)
+    if laps is not None:
+        wanted = set(laps)
+        packets = [p for p in packets if p.get("lap") in wanted]
+    return packets
+
+
+def tail_session_packets(path: str, offset: int = 0):
+    """
+    Packets appended to a log since byte `offset`, for following a live
+    session.
+
+    Only complete lines are consumed, so a line still being written is
+    picked up on the next call. Legacy JSON arrays cannot be tailed: they
+    are returned whole when offset is 0 and yield nothing afterwards.
+
+    Returns
+    -------
+    (packets, new_offset)
+    """
+    size = os.path.getsize(path)
+    if not _is_ndjson(path):
+        if offset:
+            return [], offset
+        data = load_session_packets(path)
+        return (data if isinstance(data, list) else []), size
+
+    if size < offset:
+        # File was replaced or truncated: start over.
+        offset = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(size - offset)
+    end = chunk.rfind(b"\n") + 1
+    if end == 0:
+        return [], offset
+    return _parse_lines(chunk[:end].split(b"\n")), offset + end
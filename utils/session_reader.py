@@ -0,0 +1,228 @@
+# utils/session_reader.py
+"""
+Memory-mapped, lazy session reader on top of the columnar store.
+
+SessionReader opens a data/store/*.npz file (see utils.session_store)
+without reading it. Each channel is memory-mapped the first time it is
+used, so opening a session and fetching one frame cost the same whether
+it has 500 packets or a multi-hour F1 import.
+
+  - reader["speed"], reader["gps.x"], reader.t       lazy np.memmap channels
+  - reader.index_at(t)                                searchsorted on t
+  - reader.frame(t)                                   one sample, GPS interpolated
+  - reader.window(t0, t1, channels)                   zero-copy slices
+  - reader.decimated(channel, max_points)             strided view for plotting
+
+Usage:
+    from utils.session_reader import SessionReader
+
+    reader = SessionReader.open("data/logs/race_session_20251205_150657.json")
+    t0, t1 = reader.time_range
+    frame = reader.frame(42.0)
+    speed = reader.window(40.0, 50.0, ["speed"])["speed"]
+"""
+
+import json
+import zipfile
+
+import numpy as np
+
+from utils.session_store import (
+    CHANNELS, META_KEY, STORE_DIR,
+    convert_session, is_store_fresh, store_path_for,
+)
+
+# Short / packet-style names → store channels.
+ALIASES = {
+    "speed": "true_speed_kmh",
+    "throttle": "true_throttle",
+    "brake": "brake_pressure",
+    "brake_cmd": "true_brake_cmd",
+    "coolant": "true_coolant_temp",
+    "yaw": "imu_yaw",
+    "steering": "true_steering",
+    "gps.x": "gps_x",
+    "gps.y": "gps_y",
+    "true.speed_kmh": "true_speed_kmh",
+    "true.coolant_temp": "true_coolant_temp",
+    "true.brake_cmd": "true_brake_cmd",
+    "true.throttle": "true_throttle",
+    "true.yaw_deg": "true_yaw_deg",
+    "true.steering": "true_steering",
+    "sensors.wheel_speed": "wheel_speed",
+    "sensors.brake_pressure": "brake_pressure",
+    "sensors.coolant_temp": "coolant_temp",
+    "sensors.imu.ax": "imu_ax",
+    "sensors.imu.ay": "imu_ay",
+    "sensors.imu.yaw": "imu_yaw",
+}
+
+
+def resolve_channel(name: str) -> str:
+    """Map an alias or packet-style path to a store channel name."""
+    name = ALIASES.get(name, name)
+    if name not in CHANNELS:
+        raise KeyError(f"Unknown channel: {name}. Choose from {list(CHANNELS)} or {list(ALIASES)}")
+    return name
+
+
+def _npz_member_layout(path: str) -> dict:
+    """
+    Locate every array in an uncompressed .npz without reading its data.
+
+    Returns
+    -------
+    dict — {name: (dtype, shape, fortran_order, data_offset)}
+    """
+    layout = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if not info.filename.endswith(".npy"):
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {info.filename} is compressed, cannot memory-map")
+
+            # Local file header: 30 fixed bytes + filename + extra field.
+            f.seek(info.header_offset + 26)
+            name_len = int.from_bytes(f.read(2), "little")
+            extra_len = int.from_bytes(f.read(2), "little")
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            layout[info.filename[:-4]] = (dtype, shape, fortran, f.tell())
+    return layout
+
+
+class SessionReader:
+    def __init__(self, store_path: str):
+        """
+        Parameters
+        ----------
+        store_path : str
+            Path to an uncompressed .npz written by utils.session_store.
+        """
+        self.path = store_path
+        self._layout = _npz_member_layout(store_path)
+        self._cache = {}
+        self._t = None
+
+        meta = {}
+        if META_KEY in self._layout:
+            with np.load(store_path, allow_pickle=False) as z:
+                meta = json.loads(str(z[META_KEY]))
+        self.meta = meta
+
+        shape = self._layout.get("t", (None, (0,)))[1]
+        self.n = int(shape[0]) if shape else 0
+
+    @classmethod
+    def open(cls, path: str, store_dir: str = STORE_DIR) -> "SessionReader":
+        """
+        Open a store, or the store for a session log (converting the log
+        first if its store is missing or stale).
+        """
+        if path.endswith(".npz"):
+            return cls(path)
+        store_path = store_path_for(path, store_dir)
+        if not is_store_fresh(path, store_path):
+            convert_session(path, store_path)
+        return cls(store_path)
+
+    def __len__(self) -> int:
+        return self.n
+
+    # ------------------------------------------------------------------
+    #  CHANNELS
+    # ------------------------------------------------------------------
+
+    def channel(self, name: str) -> np.ndarray:
+        """Memory-mapped, read-only array for one channel (mapped on first use)."""
+        name = resolve_channel(name)
+        arr = self._cache.get(name)
+        if arr is None:
+            if name not in self._layout:
+                raise KeyError(f"Channel {name} not in store {self.path}")
+            dtype, shape, fortran, offset = self._layout[name]
+            if self.n == 0:
+                arr = np.empty(shape, dtype=dtype)
+            else:
+                arr = np.memmap(self.path, dtype=dtype, mode="r", offset=offset,
+                                shape=shape, order="F" if fortran else "C")
+            self._cache[name] = arr
+        return arr
+
+    __getitem__ = channel
+
+    @property
+    def t(self) -> np.ndarray:
+        """Session time (s). Falls back to timestamp - timestamp[0] if t is missing."""
+        if self._t is None:
+            t = self.channel("t")
+            if self.n and np.isnan(t[0]):
+                ts = np.asarray(self.channel("timestamp"), dtype=float)
+                t = ts - ts[0]
+            self._t = t
+        return self._t
+
+    @property
+    def time_range(self) -> tuple:
+        if self.n == 0:
+            return 0.0, 0.0
+        t = self.t
+        return float(t[0]), float(t[-1])
+
+    # ------------------------------------------------------------------
+    #  TIME INDEXING
+    # ------------------------------------------------------------------
+
+    def index_at(self, time_t: float) -> int:
+        """Index of the first sample at or after time_t (clamped)."""
+        idx = int(np.searchsorted(self.t, time_t))
+        return min(max(idx, 0), self.n - 1)
+
+    def frame(self, time_t: float, channels: list = None) -> dict:
+        """
+        One sample at time_t.
+
+        Returns
+        -------
+        dict — {"index", "x", "y", <channel>: value, ...}; x/y are linearly
+        interpolated between the surrounding GPS samples.
+        """
+        idx = self.index_at(time_t)
+        xs, ys, t = self.channel("gps_x"), self.channel("gps_y"), self.t
+
+        if idx == 0:
+            x, y = float(xs[0]), float(ys[0])
+        else:
+            t0, t1 = t[idx - 1], t[idx]
+            r = (time_t - t0) / (t1 - t0 + 1e-9)
+            x = float(xs[idx - 1] + r * (xs[idx] - xs[idx - 1]))
+            y = float(ys[idx - 1] + r * (ys[idx] - ys[idx - 1]))
+
+        out = {"index": idx, "x": x, "y": y}
+        for name in channels or []:
+            out[name] = self.channel(name)[idx].item()
+        return out
+
+    def window(self, t0: float, t1: float, channels: list) -> dict:
+        """Zero-copy slices of `channels` covering t0 ≤ t ≤ t1 (plus "t")."""
+        t = self.t
+        i0 = int(np.searchsorted(t, t0, side="left"))
+        i1 = int(np.searchsorted(t, t1, side="right"))
+        out = {"t": t[i0:i1]}
+        for name in channels:
+            out[name] = self.channel(name)[i0:i1]
+        return out
+
+    def decimated(self, name: str, max_points: int = 2000) -> tuple:
+        """
+        (t, values) strided down to at most ~max_points samples, for plotting
+        whole-session traces without touching every sample.
+        """
+        step = max(1, self.n // max(1, max_points))
+        return self.t[::step], self.channel(name)[::step]
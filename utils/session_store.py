@@ -0,0 +1,248 @@
+# utils/session_store.py
+"""
+Columnar session store (NumPy .npz).
+
+Session logs are nested JSON: every consumer re-parses them into dicts
+and then rebuilds arrays field by field. This module flattens a log once
+through telemetry_schema.normalize_session_rows() and saves one typed
+array per channel in an uncompressed .npz. Loading is then a single
+read per channel, with no JSON parsing or per-packet Python objects.
+
+  - float channels are float64, missing values are NaN
+  - integer channels (lap, track_index) are int32, missing values are -1
+  - "__meta__" holds a JSON string (driver_id, n_packets, source file, ...)
+
+Stores live in data/store/<session stem>.npz. A store is stale when its
+source log has changed size or mtime since conversion.
+
+Usage:
+    # convert every log in data/logs (skips stores that are up to date)
+    python -m utils.session_store
+    python -m utils.session_store --log-dir data/logs --store-dir data/store --overwrite
+
+    from utils.session_store import load_session_columns
+    cols = load_session_columns("data/logs/race_session_20251205_150657.json")
+    cols["true_speed_kmh"], cols["lap"]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from streamlit_app.telemetry_schema import normalize_session_rows
+from utils.json_writer import _ensure_dir
+from utils.session_log import list_session_files, load_session_packets, session_stem
+
+LOG_DIR = os.path.join(ROOT, "data", "logs")
+STORE_DIR = os.path.join(ROOT, "data", "store")
+
+STORE_VERSION = 1
+META_KEY = "__meta__"
+
+# Channel name → dtype. Names match NormalizedRow fields.
+CHANNELS = {
+    "timestamp": np.float64,
+    "t": np.float64,
+    "lap": np.int32,
+    "lap_progress": np.float64,
+    "track_index": np.int32,
+    "gps_x": np.float64,
+    "gps_y": np.float64,
+    "true_speed_kmh": np.float64,
+    "true_coolant_temp": np.float64,
+    "true_brake_cmd": np.float64,
+    "true_throttle": np.float64,
+    "true_yaw_deg": np.float64,
+    "true_steering": np.float64,
+    "wheel_speed": np.float64,
+    "brake_pressure": np.float64,
+    "coolant_temp": np.float64,
+    "imu_ax": np.float64,
+    "imu_ay": np.float64,
+    "imu_yaw": np.float64,
+}
+
+INT_MISSING = -1
+
+
+# ---------------------------------------------------------------------------
+#  PACKETS → COLUMNS
+# ---------------------------------------------------------------------------
+
+def _column(values: list, dtype) -> np.ndarray:
+    missing = INT_MISSING if np.issubdtype(dtype, np.integer) else np.nan
+    out = np.empty(len(values), dtype=dtype)
+    for i, v in enumerate(values):
+        try:
+            out[i] = missing if v is None else v
+        except (TypeError, ValueError):
+            out[i] = missing
+    return out
+
+
+def packets_to_columns(packets: list) -> dict:
+    """Flatten packets (any supported log schema) into typed channel arrays."""
+    rows = normalize_session_rows(packets)
+    return {
+        name: _column([getattr(r, name) for r in rows], dtype)
+        for name, dtype in CHANNELS.items()
+    }
+
+
+def _session_meta(packets: list, source: str = None) -> dict:
+    driver_id = next((p["driver_id"] for p in packets if isinstance(p, dict) and "driver_id" in p), None)
+    meta = {
+        "version": STORE_VERSION,
+        "n_packets": len(packets),
+        "driver_id": driver_id,
+        "source": None,
+        "source_size": None,
+        "source_mtime": None,
+    }
+    if source is not None:
+        st = os.stat(source)
+        meta.update(source=os.path.basename(source), source_size=st.st_size, source_mtime=st.st_mtime)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+#  WRITE
+# ---------------------------------------------------------------------------
+
+def write_session_store(path: str, columns: dict, meta: dict = None):
+    """
+    Save channel arrays to an uncompressed .npz (written to .tmp, then replaced).
+
+    Uncompressed members are stored contiguously in the zip, which keeps
+    loading to a plain read (and lets SessionReader memory-map them).
+    """
+    _ensure_dir(path)
+    tmp = path + ".tmp"
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in columns.items()}
+    arrays[META_KEY] = np.array(json.dumps(meta or {}))
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def store_path_for(log_path: str, store_dir: str = STORE_DIR) -> str:
+    """data/logs/<stem>.json|.ndjson → data/store/<stem>.npz"""
+    return os.path.join(store_dir, session_stem(os.path.basename(log_path)) + ".npz")
+
+
+def convert_session(log_path: str, store_path: str = None) -> str:
+    """Convert one session log to a columnar store. Returns the store path."""
+    if store_path is None:
+        store_path = store_path_for(log_path)
+    packets = load_session_packets(log_path)
+    if not isinstance(packets, list):
+        raise ValueError(f"Session {log_path} is not a list of packets.")
+    write_session_store(store_path, packets_to_columns(packets), _session_meta(packets, log_path))
+    return store_path
+
+
+# ---------------------------------------------------------------------------
+#  READ
+# ---------------------------------------------------------------------------
+
+def read_store_meta(store_path: str) -> dict:
+    with np.load(store_path, allow_pickle=False) as z:
+        return json.loads(str(z[META_KEY])) if META_KEY in z.files else {}
+
+
+def is_store_fresh(log_path: str, store_path: str) -> bool:
+    """True if store_path exists and was converted from the current log_path."""
+    if not os.path.exists(store_path):
+        return False
+    try:
+        meta = read_store_meta(store_path)
+    except Exception:
+        return False
+    st = os.stat(log_path)
+    return (
+        meta.get("version") == STORE_VERSION
+        and meta.get("source_size") == st.st_size
+        and meta.get("source_mtime") == st.st_mtime
+    )
+
+
+def load_session_columns(path: str, channels: list = None, store_dir: str = STORE_DIR) -> dict:
+    """
+    Load a session as {channel: np.ndarray}.
+
+    Parameters
+    ----------
+    path : str
+        A .npz store, or a session log (.json / .ndjson). For a log, an up
+        to date store in `store_dir` is used if there is one; otherwise
+        the log is parsed and flattened in memory.
+    channels : list[str], optional
+        Subset of CHANNELS to load (default: all).
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+    """
+    names = list(channels) if channels is not None else list(CHANNELS)
+
+    if not path.endswith(".npz"):
+        store_path = store_path_for(path, store_dir)
+        if not is_store_fresh(path, store_path):
+            cols = packets_to_columns(load_session_packets(path))
+            return {name: cols[name] for name in names}
+        path = store_path
+
+    with np.load(path, allow_pickle=False) as z:
+        return {name: z[name] for name in names if name in z.files}
+
+
+# ---------------------------------------------------------------------------
+#  BULK CONVERTER
+# ---------------------------------------------------------------------------
+
+def convert_logs(log_dir: str = LOG_DIR, store_dir: str = STORE_DIR, overwrite: bool = False) -> dict:
+    """
+    Convert every session log in log_dir.
+
+    Returns
+    -------
+    dict — {filename: "converted" | "up-to-date" | "failed: <reason>"}
+    """
+    results = {}
+    for fn in list_session_files(log_dir):
+        log_path = os.path.join(log_dir, fn)
+        store_path = store_path_for(log_path, store_dir)
+        if not overwrite and is_store_fresh(log_path, store_path):
+            results[fn] = "up-to-date"
+            continue
+        try:
+            convert_session(log_path, store_path)
+            results[fn] = "converted"
+        except Exception as e:
+            results[fn] = f"failed: {e}"
+    return results
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Convert session logs to columnar .npz stores")
+    parser.add_argument("--log-dir", type=str, default=LOG_DIR)
+    parser.add_argument("--store-dir", type=str, default=STORE_DIR)
+    parser.add_argument("--overwrite", action="store_true", help="Reconvert stores that are up to date")
+    args = parser.parse_args()
+
+    results = convert_logs(args.log_dir, args.store_dir, overwrite=args.overwrite)
+    for fn, status in results.items():
+        print(f"  {fn}: {status}")
+    n_conv = sum(1 for s in results.values() if s == "converted")
+    print(f"✅ {n_conv} converted, {len(results) - n_conv} skipped/failed → {args.store_dir}")
+
+
+if __name__ == "__main__":
+    cli()
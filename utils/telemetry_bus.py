@@ -0,0 +1,356 @@
+# utils/telemetry_bus.py
+"""
+Local publish/subscribe telemetry bus (Unix domain socket).
+
+The simulators used to publish every packet by rewriting data/realtime.json
+(tmp write + fsync + replace, every tick), and each live page polled that
+file in a sleep(0.1) loop. The bus replaces both ends:
+
+  - TelemetryPublisher   the simulator binds a Unix stream socket and sends
+                         each packet to every connected subscriber as one
+                         compact JSON line — no disk I/O, no fsync
+  - TelemetrySubscriber  a page connects and blocks in select() until the
+                         next packet arrives, instead of sleeping and re-reading
+
+realtime.json stays available as a fallback sink: the publisher writes it
+when given `fallback_path` (or when the socket cannot be bound), and a
+subscriber reads it whenever no publisher is listening, e.g. for a
+simulator started without the bus or the OpenF1 bridge.
+
+A subscriber that stops reading is dropped once `max_backlog` bytes are
+queued for it, so a stalled page never slows the simulator down.
+
+Usage:
+    # simulator
+    with TelemetryPublisher(fallback_path=None) as bus:
+        bus.publish(packet)
+
+    # dashboard
+    sub = TelemetrySubscriber()
+    packet = sub.latest(timeout=0.5)     # newest packet, or None if nothing new
+    packets = sub.drain(timeout=0.5)     # every packet since the last call
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import select
+import hashlib
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from utils.json_writer import write_realtime_json, _ensure_dir
+
+DATA_DIR = os.path.join(ROOT, "data")
+REALTIME_FILE = os.path.join(DATA_DIR, "realtime.json")
+
+BUS_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+# sun_path is limited to ~104 bytes (macOS) / 108 (Linux).
+_MAX_SOCKET_PATH = 100
+
+
+def default_bus_path() -> str:
+    """
+    $FSAE_TELEMETRY_SOCK, else data/telemetry.sock, else (if that path is
+    too long for a Unix socket) a per-checkout path in the temp dir.
+    """
+    path = os.environ.get("FSAE_TELEMETRY_SOCK")
+    if path:
+        return path
+    path = os.path.join(DATA_DIR, "telemetry.sock")
+    if len(path) < _MAX_SOCKET_PATH:
+        return path
+    tag = hashlib.sha1(ROOT.encode()).hexdigest()[:10]
+    return os.path.join(tempfile.gettempdir(), f"fsae_telemetry_{tag}.sock")
+
+
+def _encode(packet: dict) -> bytes:
+    return (json.dumps(packet, separators=(",", ":")) + "\n").encode()
+
+
+# ---------------------------------------------------------------------------
+#  PUBLISHER
+# ---------------------------------------------------------------------------
+
+class TelemetryPublisher:
+    def __init__(self, path: str = None, fallback_path: str = None, max_backlog: int = 1 << 20):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Socket path (default: default_bus_path()).
+        fallback_path : str, optional
+            Also write every packet to this realtime.json. Always used when
+            the socket cannot be bound.
+        max_backlog : int
+            Bytes queued for one subscriber before it is disconnected.
+        """
+        self.path = path or default_bus_path()
+        self.fallback_path = fallback_path
+        self.max_backlog = max_backlog
+        self.sock = None
+        self._clients = {}          # socket → pending bytes
+        self.published = 0
+        self.dropped = 0
+        self._bind()
+
+    def _bind(self):
+        if not BUS_AVAILABLE:
+            return
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                print(f"⚠ Telemetry bus {self.path} already has a publisher — using the file sink only.")
+                probe.close()
+                return
+            except OSError:
+                probe.close()
+                os.unlink(self.path)        # stale socket from a crashed run
+        try:
+            _ensure_dir(self.path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.path)
+            sock.listen(16)
+            sock.setblocking(False)
+            self.sock = sock
+        except OSError as e:
+            print(f"⚠ Telemetry bus unavailable ({e}) — using the file sink only.")
+            self.sock = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._clients)
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            conn.setblocking(False)
+            self._clients[conn] = bytearray()
+
+    def _drop(self, conn):
+        self._clients.pop(conn, None)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def publish(self, packet: dict):
+        """Send one packet to every subscriber (and the fallback file, if any)."""
+        self.published += 1
+        if self.sock is not None:
+            self._accept()
+            if self._clients:
+                data = _encode(packet)
+                for conn, pending in list(self._clients.items()):
+                    pending += data
+                    try:
+                        sent = conn.send(pending)
+                        del pending[:sent]
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                    except OSError:
+                        self._drop(conn)
+                        continue
+                    if len(pending) > self.max_backlog:
+                        self.dropped += 1
+                        self._drop(conn)
+        if self.fallback_path or self.sock is None:
+            write_realtime_json(self.fallback_path or REALTIME_FILE, packet)
+
+    def close(self):
+        for conn in list(self._clients):
+            self._drop(conn)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ---------------------------------------------------------------------------
+#  SUBSCRIBER
+# ---------------------------------------------------------------------------
+
+class TelemetrySubscriber:
+    def __init__(self, path: str = None, fallback_path: str = REALTIME_FILE, retry_interval: float = 0.5):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Socket path (default: default_bus_path()).
+        fallback_path : str, optional
+            realtime.json to read while no publisher is listening (None: bus only).
+        retry_interval : float
+            Seconds between reconnection attempts.
+        """
+        self.path = path or default_bus_path()
+        self.fallback_path = fallback_path
+        self.retry_interval = retry_interval
+        self.sock = None
+        self._buf = bytearray()
+        self._next_retry = 0.0
+        self._file_mtime = None
+        self.source = None          # "bus", "file" or None (nothing received yet)
+
+    @property
+    def connected(self) -> bool:
+        return self.sock is not None
+
+    def _connect(self) -> bool:
+        if self.sock is not None:
+            return True
+        if not BUS_AVAILABLE or time.monotonic() < self._next_retry:
+            return False
+        self._next_retry = time.monotonic() + self.retry_interval
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            return False
+        sock.setblocking(False)
+        self.sock = sock
+        self._buf.clear()
+        return True
+
+    def _disconnect(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        self._buf.clear()
+
+    def _read_bus(self, timeout: float) -> list:
+        """Packets that arrive within `timeout` (returns as soon as any are complete)."""
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            ready, _, _ = select.select([self.sock], [], [], max(deadline - time.monotonic(), 0.0))
+            if ready:
+                try:
+                    chunk = self.sock.recv(1 << 16)
+                except (BlockingIOError, InterruptedError):
+                    chunk = None
+                except OSError:
+                    chunk = b""
+                if chunk == b"":
+                    # Publisher closed (or dropped us): keep the complete lines already received.
+                    packets = self._split_lines()
+                    self._disconnect()
+                    return packets
+                if chunk:
+                    self._buf += chunk
+                    # Keep reading whatever is already queued without blocking.
+                    if b"\n" in chunk and not select.select([self.sock], [], [], 0)[0]:
+                        break
+                    continue
+            if time.monotonic() >= deadline:
+                break
+        return self._split_lines()
+
+    def _split_lines(self) -> list:
+        """Decode and remove every complete line in the receive buffer."""
+        end = self._buf.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = bytes(self._buf[:end]).split(b"\n")
+        del self._buf[:end + 1]
+        packets = []
+        for line in lines:
+            try:
+                packets.append(json.loads(line))
+            except ValueError:
+                continue
+        return packets
+
+    def _read_file(self, timeout: float) -> list:
+        """The fallback file's packet if it changed since the last read."""
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            try:
+                mtime = os.stat(self.fallback_path).st_mtime_ns
+                if mtime != self._file_mtime:
+                    with open(self.fallback_path, "r") as f:
+                        packet = json.load(f)
+                    self._file_mtime = mtime
+                    return [packet]
+            except (OSError, ValueError):
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._connect():
+                return []
+            time.sleep(min(0.05, remaining))
+
+    def drain(self, timeout: float = 0.0) -> list:
+        """
+        Every packet received since the last call, waiting up to `timeout`
+        seconds for the first one.
+        """
+        if self._connect():
+            packets = self._read_bus(timeout)
+            if packets:
+                self.source = "bus"
+            return packets
+        if self.fallback_path:
+            packets = self._read_file(timeout)
+            if packets:
+                self.source = "file"
+            return packets
+        time.sleep(max(timeout, 0.0))
+        return []
+
+    def latest(self, timeout: float = 0.0):
+        """Newest packet received within `timeout`, or None if nothing new arrived."""
+        packets = self.drain(timeout)
+        return packets[-1] if packets else None
+
+    def close(self):
+        self._disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def cli():
+    import argparse
+    parser = argparse.ArgumentParser(description="Print packets from the telemetry bus")
+    parser.add_argument("--path", type=str, default=None)
+    parser.add_argument("--count", type=int, default=0, help="Stop after this many packets (0 = forever)")
+    args = parser.parse_args()
+
+    n = 0
+    with TelemetrySubscriber(args.path, fallback_path=None) as sub:
+        print(f"📡 Listening on {sub.path}…")
+        while not args.count or n < args.count:
+            for packet in sub.drain(timeout=1.0):
+                n += 1
+                true = packet.get("true", {})
+                print(f"t={packet.get('t', 0):8.2f}  lap={packet.get('lap')}  "
+                      f"speed={true.get('speed_kmh', 0):6.1f} km/h  idx={packet.get('track_index')}")
+
+
+if __name__ == "__main__":
+    cli()
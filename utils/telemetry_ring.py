@@ -0,0 +1,294 @@
+# utils/telemetry_ring.py
+"""
+Shared-memory ring buffer of recent telemetry (multiprocessing.shared_memory).
+
+The live pages each kept their own Python lists of packet history, which
+grew for the whole stint and were rebuilt separately in every browser
+session. The simulator now writes each packet's numeric channels into one
+fixed-size float64 ring in shared memory. Any number of dashboard
+processes attach to it and read the last N samples as NumPy arrays, with
+no JSON parsing and no per-session history. Memory stays at
+(capacity + 1) × channels × 8 bytes however long the stint runs.
+
+Layout of the segment:
+
+    header  int64[8]                   magic, version, capacity, n_channels,
+                                       count (rows written so far), closed,
+                                       session_start (first row of the current session)
+    data    float64[capacity + 1, C]   row i of the stint lives at i % (capacity + 1)
+
+Single writer, lock-free readers. The writer fills a row and then
+publishes it by bumping `count`. A reader copies its window and checks
+`count` again, then drops any rows the writer may have overwritten during
+the copy. The result is always a consistent, gap-free window. The spare
+slot is the one the writer may be filling, so a full window still holds
+`capacity` rows.
+
+A writer that runs several sessions into one ring (batch_run) calls
+start_session() before each. Readers never return rows from before it,
+so the previous session's tail, whose `t` clock ran on past the new
+one's, does not leak into a `seconds=` window.
+
+Usage:
+    # simulator
+    ring = TelemetryRing.create(capacity=1200)    # 120 s at dt = 0.1
+    ring.start_session()                          # optional, when several sessions share the ring
+    ring.push(packet)
+    ring.close()                                  # marks it closed, unlinks
+
+    # dashboard
+    ring = TelemetryRing.attach()                 # None if no simulator is running
+    w = ring.window(seconds=30)                   # {"t": (n,), "speed_kmh": (n,), ...}
+    ring = reattach(ring)                         # follow the next run once this one closes
+    history = chart_history(st.session_state, telemetry_history)   # live page charts
+"""
+
+import sys
+
+import numpy as np
+from multiprocessing import shared_memory
+
+RING_NAME = "fsae_telemetry_ring"
+
+# Numeric channels copied from each packet (NaN when missing).
+CHANNELS = (
+    "t", "timestamp", "lap", "track_index",
+    "speed_kmh", "throttle", "brake_cmd", "steering", "yaw_deg", "coolant_temp",
+    "brake_pressure", "gps_x", "gps_y",
+)
+
+# Seconds of history shown by the live pages' charts.
+CHART_WINDOW_S = 60.0
+
+_MAGIC = 0x46534145524E4731        # "FSAERNG1"
+_VERSION = 3
+_HEADER = 8
+_H_MAGIC, _H_VERSION, _H_CAPACITY, _H_CHANNELS, _H_COUNT, _H_CLOSED, _H_SESSION = range(7)
+
+
+def packet_row(packet: dict) -> list:
+    """One packet → values in CHANNELS order."""
+    true = packet.get("true") or {}
+    gps = packet.get("gps") or {}
+    sensors = packet.get("sensors") or {}
+    nan = float("nan")
+    brake_pressure = sensors.get("brake_pressure")
+    return [
+        packet.get("t", nan), packet.get("timestamp", nan), packet.get("lap", nan), packet.get("track_index", nan),
+        true.get("speed_kmh", nan), true.get("throttle", nan), true.get("brake_cmd", nan),
+        true.get("steering", nan), true.get("yaw_deg", nan), true.get("coolant_temp", nan),
+        brake_pressure if isinstance(brake_pressure, (int, float)) else nan,
+        gps.get("x", nan), gps.get("y", nan),
+    ]
+
+
+def _open_untracked(name: str):
+    """
+    Attach to an existing segment without letting this process's resource
+    tracker unlink it when the (reader) process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    _untrack(shm)
+    return shm
+
+
+def _untrack(shm):
+    """Unregister a segment from the resource tracker (Python < 3.13)."""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class TelemetryRing:
+    def __init__(self, shm, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[_H_CAPACITY])
+        self.n_channels = int(self.header[_H_CHANNELS])
+        self.slots = self.capacity + 1
+        self.data = np.ndarray((self.slots, self.n_channels), dtype=np.float64,
+                               buffer=shm.buf, offset=_HEADER * 8)
+
+    # ------------------------------------------------------------------
+    #  OPEN
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def create(cls, capacity: int = 1200, name: str = RING_NAME) -> "TelemetryRing":
+        """New ring owned by this (writer) process; replaces a leftover one."""
+        size = _HEADER * 8 + (int(capacity) + 1) * len(CHANNELS) * 8
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_H_CAPACITY] = capacity
+        header[_H_CHANNELS] = len(CHANNELS)
+        header[_H_VERSION] = _VERSION
+        header[_H_MAGIC] = _MAGIC          # last: readers check it
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = RING_NAME):
+        """The running simulator's ring, or None if there is none."""
+        try:
+            shm = _open_untracked(name)
+        except (FileNotFoundError, ValueError):
+            return None
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        ok = (header[_H_MAGIC] == _MAGIC and header[_H_VERSION] == _VERSION
+              and header[_H_CHANNELS] == len(CHANNELS))
+        del header
+        if not ok:
+            shm.close()
+            return None
+        return cls(shm, owner=False)
+
+    # ------------------------------------------------------------------
+    #  WRITE
+    # ------------------------------------------------------------------
+
+    def push(self, packet: dict):
+        self.push_row(packet_row(packet))
+
+    def push_row(self, values):
+        """Append one row of CHANNELS values (writer only)."""
+        count = int(self.header[_H_COUNT])
+        self.data[count % self.slots] = values
+        self.header[_H_COUNT] = count + 1
+
+    def start_session(self):
+        """Hide every row written so far from readers (writer only)."""
+        self.header[_H_SESSION] = self.header[_H_COUNT]
+
+    # ------------------------------------------------------------------
+    #  READ
+    # ------------------------------------------------------------------
+
+    @property
+    def count(self) -> int:
+        """Rows written since the ring was created."""
+        return int(self.header[_H_COUNT])
+
+    @property
+    def closed(self) -> bool:
+        """True once the writer has finished (readers should re-attach later)."""
+        return bool(self.header[_H_CLOSED])
+
+    @property
+    def session_start(self) -> int:
+        """Row index of the current session's first row."""
+        return int(self.header[_H_SESSION])
+
+    def latest(self) -> dict:
+        """The newest row as {channel: float}, or None if the ring is empty."""
+        w = self.window(n=1)
+        return {k: float(v[0]) for k, v in w.items()} if len(w["t"]) else None
+
+    def window(self, n: int = None, seconds: float = None, channels=CHANNELS) -> dict:
+        """
+        A consistent copy of the most recent rows.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of rows (default: everything the ring holds for the
+            current session).
+        seconds : float, optional
+            Keep only rows within this many seconds of the newest `t`.
+            Rows from earlier sessions are never included, so `t` is one
+            continuous clock.
+        channels : tuple[str]
+            Channels to return.
+
+        Returns
+        -------
+        dict[str, np.ndarray] — oldest → newest.
+        """
+        names = tuple(channels) + (("t",) if seconds is not None and "t" not in channels else ())
+        cols = [CHANNELS.index(c) for c in names]
+        for _ in range(5):
+            end = self.count
+            start = max(end - min(n or self.capacity, self.capacity), self.session_start, 0)
+            rows = self.data[np.arange(start, end) % self.slots][:, cols]
+            # Drop rows the writer may have overwritten while we copied
+            # (including the slot it may be filling right now).
+            lost = (self.count + 1 - self.slots) - start
+            if lost < len(rows):
+                rows = rows[max(lost, 0):]
+                break
+        else:
+            rows = rows[:0]
+
+        if seconds is not None and len(rows):
+            t = rows[:, names.index("t")]
+            rows = rows[t >= t[-1] - seconds]
+        return {c: rows[:, i] for i, c in enumerate(channels)}
+
+    # ------------------------------------------------------------------
+    #  CLOSE
+    # ------------------------------------------------------------------
+
+    def close(self):
+        """Detach; the writer also marks the ring closed and unlinks it."""
+        if self.shm is None:
+            return
+        if self.owner:
+            self.header[_H_CLOSED] = 1
+        del self.header, self.data
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def reattach(ring: TelemetryRing = None, name: str = RING_NAME):
+    """`ring` while its writer is running, else the current ring (or None)."""
+    if ring is not None and not ring.closed:
+        return ring
+    if ring is not None:
+        ring.close()
+    return TelemetryRing.attach(name)
+
+
+def chart_history(state, fallback: dict, seconds: float = CHART_WINDOW_S) -> dict:
+    """
+    Recent history for the live pages' speed / brake / coolant / yaw charts.
+
+    Reads the simulator's ring when it has one (bounded, shared by every
+    browser session), else returns `fallback`, the page's own lists. The
+    attached ring is kept in `state["telemetry_ring"]` (st.session_state)
+    so it is re-used across reruns.
+
+    Returns
+    -------
+    dict with keys "t" (wall-clock timestamp), "speed", "brake", "coolant", "yaw".
+    """
+    ring = reattach(state.get("telemetry_ring"))
+    state["telemetry_ring"] = ring
+    if ring is None:
+        return fallback
+    w = ring.window(seconds=seconds,
+                    channels=("timestamp", "speed_kmh", "brake_pressure", "coolant_temp", "yaw_deg"))
+    return {"t": w["timestamp"], "speed": w["speed_kmh"], "brake": w["brake_pressure"],
+            "coolant": w["coolant_temp"], "yaw": w["yaw_deg"]}